@@ -4,8 +4,14 @@
 
 import os
 import json
+import threading
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None
+
 # 项目根目录
 ROOT_DIR = Path(__file__).parent.parent
 
@@ -21,20 +27,44 @@ LOG_DIR = ROOT_DIR / 'logs'
 for dir_path in [RAW_DATA_DIR, PROCESSED_DATA_DIR, LOG_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
+# 已解析的配置缓存: 路径 -> ((st_mtime_ns, st_size, st_ino), 配置数据)
+# 返回的配置对象在调用方之间共享，调用方不得修改
+_cfg_cache = {}
+_cfg_lock = threading.Lock()
+
+def _load_json_config(config_file):
+    """读取JSON配置文件，文件未变化时直接返回缓存结果，文件不存在时返回None"""
+    try:
+        st = os.stat(config_file)
+    except FileNotFoundError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _cfg_lock:
+        cached = _cfg_cache.get(config_file)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if orjson is not None:
+            with open(config_file, 'rb') as f:
+                config = orjson.loads(f.read())
+        else:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        _cfg_cache[config_file] = (signature, config)
+        return config
+
 # 数据源配置
 def load_sources_config():
-    config_file = ROOT_DIR / 'config' / 'sources.json'
-    if config_file.exists():
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    config = _load_json_config(ROOT_DIR / 'config' / 'sources.json')
+    if config is not None:
+        return config
     return {}
 
 # 日志配置
 def load_logging_config():
-    config_file = ROOT_DIR / 'config' / 'logging.json'
-    if config_file.exists():
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    config = _load_json_config(ROOT_DIR / 'config' / 'logging.json')
+    if config is not None:
+        return config
     return {
         'version': 1,
         'disable_existing_loggers': False,
@@ -68,4 +98,12 @@ def load_logging_config():
 
 # 加载配置
 SOURCES_CONFIG = load_sources_config()
-LOGGING_CONFIG = load_logging_config() 
\ No newline at end of file
+LOGGING_CONFIG = load_logging_config()
+
+# 清空缓存并重新加载配置
+def reload_config():
+    global SOURCES_CONFIG, LOGGING_CONFIG
+    with _cfg_lock:
+        _cfg_cache.clear()
+    SOURCES_CONFIG = load_sources_config()
+    LOGGING_CONFIG = load_logging_config()
@@ -8,18 +8,28 @@
 - RedHat: RedHat安全公告
 """
 
-from .base import BaseVulnerabilityCollector
-from .nvd import NVDCollector
-from .debian import DebianCollector
-from .github import GitHubCollector
-from .redhat import RedHatCollector
-from .factory import VulnerabilityCollectorFactory
+import importlib
 
-__all__ = [
-    'BaseVulnerabilityCollector',
-    'NVDCollector',
-    'DebianCollector',
-    'GitHubCollector',
-    'RedHatCollector',
-    'VulnerabilityCollectorFactory'
-] 
\ No newline at end of file
+# 导出名称到所在子模块的映射，子模块在首次访问时才导入（PEP 562）
+_LAZY_IMPORTS = {
+    'BaseVulnerabilityCollector': '.base',
+    'NVDCollector': '.nvd',
+    'DebianCollector': '.debian',
+    'GitHubCollector': '.github',
+    'RedHatCollector': '.redhat',
+    'VulnerabilityCollectorFactory': '.factory'
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # 缓存到包命名空间，后续访问不再经过__getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -9,13 +9,22 @@
 """
 
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from collections import deque
+from itertools import islice
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, AsyncIterator, Callable, Iterable
+import asyncio
 import logging
+import threading
 import time
+import aiohttp
+import orjson
+import requests
 
-from ..utils.http import make_request, handle_rate_limit
-from ..utils.logger import setup_logger
+from ..models.entities import CVSSMetrics, Vulnerability
+from ..utils.http import (
+    HTTPClient, OrjsonClientResponse, TokenBucket, get_shared_session, handle_rate_limit
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +47,11 @@ class BaseVulnerabilityCollector(ABC):
                 - delay_between_requests: 请求间隔时间（秒）
                 - max_retries: 最大重试次数
                 - timeout: 请求超时时间（秒）
+                - max_concurrency: 并发请求的最大数量
+                - burst: 允许连续发送而不等待的请求数
+                - keep_raw: 清理后的记录中是否保留原始数据（默认不保留）；
+                  为"bytes"时保存为raw_data_bytes中的JSON字节串
+                - progress_log_interval: 分页进度日志的最小间隔（秒，默认5）
         """
         self.config = config
         self.url = config.get('url', '')
@@ -45,9 +59,30 @@ class BaseVulnerabilityCollector(ABC):
         self.delay = config.get('delay_between_requests', 6)
         self.max_retries = config.get('max_retries', 3)
         self.timeout = config.get('timeout', 30)
+        self.max_concurrency = config.get('max_concurrency', 4)
+        self.keep_raw = config.get('keep_raw', False)
+        self.progress_log_interval = config.get('progress_log_interval', 5.0)
         
-        # 设置日志
-        setup_logger()
+        # 上次输出进度日志的时间，分页线程共用
+        self._last_log_ts = 0.0
+        self._log_lock = threading.Lock()
+        
+        # 按请求间隔换算的令牌桶，根据服务端限流响应头动态调整
+        self._bucket = TokenBucket(
+            rate=1 / self.delay if self.delay else 0,
+            capacity=config.get('burst', 1)
+        )
+        
+        # 所有采集器共用同一个连接池，在请求和采集器之间复用TCP/TLS连接
+        self._client = HTTPClient(
+            headers={'Authorization': f'Bearer {self.api_key}'} if self.api_key else None,
+            timeout=self.timeout,
+            session=get_shared_session(self.max_retries)
+        )
+        
+        # 异步会话和并发信号量在事件循环中按需创建
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
     @abstractmethod
     def fetch_data(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
@@ -88,6 +123,164 @@ class BaseVulnerabilityCollector(ABC):
         Raises:
             RequestError: 请求失败时抛出
         """
+        response = self._send_request(method, endpoint, params, headers, data)
+        # 直接用orjson解析响应字节，跳过requests的文本解码和标准库json
+        return orjson.loads(response.content)
+    
+    def open_api_stream(self,
+                       endpoint: str,
+                       method: str = "GET",
+                       params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        发送API请求并以流的形式返回响应
+        
+        响应体不会被一次性读入内存，调用方通过response.raw增量读取，
+        并负责关闭响应（可以用作上下文管理器）。
+        
+        Args:
+            endpoint: API端点
+            method: 请求方法，默认为"GET"
+            params: 查询参数
+            headers: 请求头
+            
+        Returns:
+            未读取响应体的响应对象
+        """
+        response = self._send_request(method, endpoint, params, headers, None, stream=True)
+        # 由urllib3透明解压gzip等编码的响应体
+        response.raw.decode_content = True
+        return response
+    
+    def _send_request(self,
+                     method: str,
+                     endpoint: str,
+                     params: Optional[Dict[str, Any]],
+                     headers: Optional[Dict[str, str]],
+                     data: Optional[Dict[str, Any]],
+                     stream: bool = False) -> requests.Response:
+        """通过持久会话发送限速请求，认证头已在客户端中设置"""
+        # 等待限速令牌
+        self._bucket.acquire()
+        
+        # 子类可能在初始化后修改self.url，因此每次按当前地址构建完整URL
+        url = f"{self.url.rstrip('/')}/{endpoint.lstrip('/')}" if endpoint else self.url
+        
+        response = self._client.request(
+            method,
+            url,
+            params=params,
+            headers=headers or {},
+            json=data,
+            stream=stream
+        )
+        
+        # 根据响应头处理限流
+        handle_rate_limit(response, self._bucket)
+        
+        return response
+    
+    async def fetch_data_async(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """
+        异步获取指定时间范围内的漏洞数据
+        
+        默认在线程池中运行同步的fetch_data，使多个数据源的采集可以并行；
+        子类可以基于make_api_request_async重写此方法。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            包含漏洞信息的字典列表
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.fetch_data, start_date, end_date)
+    
+    async def iter_data(self,
+                        start_date: datetime,
+                        end_date: datetime,
+                        batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按批次异步产出指定时间范围内的漏洞数据
+        
+        默认获取全部数据后按batch_size切分，调用方可以边接收边写入；
+        支持分页的子类可以重写此方法，每获取一页即产出一批。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            batch_size: 每批的记录数
+            
+        Yields:
+            漏洞信息字典列表
+        """
+        data = await self.fetch_data_async(start_date, end_date)
+        for start in range(0, len(data), batch_size):
+            yield data[start:start + batch_size]
+    
+    async def _iter_pages(self,
+                          fetch_page: Callable[[Any], List[Dict[str, Any]]],
+                          page_keys: Iterable[Any],
+                          batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按页的顺序分批产出各页清理后的数据
+        
+        每页在线程池中获取，最多同时请求max_concurrency页；调用方处理当前批次时，
+        后续页的请求仍在进行，内存中最多保留max_concurrency页的数据。
+        
+        Args:
+            fetch_page: 获取并清理一页数据的函数，参数为页的标识（页码或起始位置）
+            page_keys: 各页的标识
+            batch_size: 每批的记录数
+            
+        Yields:
+            漏洞信息字典列表
+        """
+        keys = iter(page_keys)
+        pending = deque()
+        
+        def fill() -> None:
+            for key in islice(keys, self.max_concurrency - len(pending)):
+                pending.append(asyncio.ensure_future(asyncio.to_thread(fetch_page, key)))
+        
+        fill()
+        try:
+            while pending:
+                items = await pending.popleft()
+                fill()
+                for start in range(0, len(items), batch_size):
+                    yield items[start:start + batch_size]
+        finally:
+            # 调用方提前结束或出错时不再等待剩余的页
+            for task in pending:
+                task.cancel()
+    
+    async def make_api_request_async(self,
+                                   endpoint: str,
+                                   method: str = "GET",
+                                   params: Optional[Dict[str, Any]] = None,
+                                   headers: Optional[Dict[str, str]] = None,
+                                   data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        异步发送API请求
+        
+        复用采集器持有的aiohttp会话，并通过信号量限制同一数据源的并发请求数。
+        与同步请求共用同一个令牌桶限速，并同样根据Retry-After和X-RateLimit响应头调整。
+        
+        Args:
+            endpoint: API端点
+            method: 请求方法，默认为"GET"
+            params: 查询参数
+            headers: 请求头
+            data: 请求体数据
+            
+        Returns:
+            API响应数据
+            
+        Raises:
+            aiohttp.ClientError: 请求失败时抛出
+        """
         # 构建完整URL
         url = f"{self.url.rstrip('/')}/{endpoint.lstrip('/')}"
         
@@ -97,24 +290,50 @@ class BaseVulnerabilityCollector(ABC):
         if self.api_key:
             headers['Authorization'] = f'Bearer {self.api_key}'
             
-        # 发送请求
-        response = make_request(
-            url=url,
-            method=method,
-            params=params,
-            headers=headers,
-            data=data,
-            timeout=self.timeout,
-            max_retries=self.max_retries
-        )
-        
-        # 处理限流
-        handle_rate_limit(response)
-        
-        # 请求间隔
-        time.sleep(self.delay)
-        
-        return response.json()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                response_class=OrjsonClientResponse
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                # 令牌桶的等待在线程中进行，不阻塞事件循环
+                await asyncio.to_thread(self._bucket.acquire)
+                try:
+                    async with self._session.request(
+                        method,
+                        url,
+                        params=params,
+                        headers=headers,
+                        json=data
+                    ) as response:
+                        # 先按响应头处理限流，429等错误响应的Retry-After对下一次重试同样生效
+                        handle_rate_limit(response, self._bucket)
+                        response.raise_for_status()
+                        result = await response.json()
+                    break
+                except aiohttp.ClientError:
+                    if attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+            
+        return result
+    
+    async def close(self) -> None:
+        """关闭同步和异步会话"""
+        self._client.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def __enter__(self) -> 'BaseVulnerabilityCollector':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._client.close()
     
     def validate_date_range(self, start_date: datetime, end_date: datetime) -> None:
         """
@@ -133,7 +352,12 @@ class BaseVulnerabilityCollector(ABC):
         if start_date > end_date:
             raise ValueError("开始日期不能晚于结束日期")
             
-        if end_date > datetime.now():
+        # 同步时间和增量采集的结束时间是不带时区的UTC时间，调用方也可能传入本地时间，
+        # 两者中较晚的一个视为当前时间，避免时区差导致刚同步的时间被判为未来时间
+        now = datetime.now(timezone.utc)
+        if end_date.tzinfo is None:
+            now = max(now.replace(tzinfo=None), datetime.now())
+        if end_date > now:
             raise ValueError("结束日期不能晚于当前时间")
     
     def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -149,6 +373,118 @@ class BaseVulnerabilityCollector(ABC):
         # 基础实现，子类可以重写此方法进行特定的数据清理
         return data
     
+    def to_vulnerability(self, data: Dict[str, Any]) -> Vulnerability:
+        """
+        将clean_data清理后的记录转换为通用漏洞模型
+        
+        Args:
+            data: 清理后的数据
+            
+        Returns:
+            漏洞实体
+            
+        Raises:
+            NotImplementedError: 子类必须实现此方法
+        """
+        raise NotImplementedError
+    
+    @staticmethod
+    def _parse_date(value: Any) -> Optional[datetime]:
+        """
+        解析各数据源的ISO格式时间
+        
+        带时区的时间统一转换为UTC并去掉时区，与数据库中的时间保持一致；
+        无法解析时返回None。
+        
+        Args:
+            value: 时间字符串或datetime
+            
+        Returns:
+            不带时区的datetime
+        """
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            parsed = value
+        else:
+            try:
+                parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    @staticmethod
+    def _to_cvss(metrics: Optional[Dict[str, Any]]) -> Optional[CVSSMetrics]:
+        """
+        将清理后的CVSS字典转换为CVSSMetrics，没有评分时返回None
+        
+        Args:
+            metrics: clean_data中的cvss_v3或cvss_v2字典
+            
+        Returns:
+            CVSS评分信息
+        """
+        if not metrics or metrics.get('base_score') is None:
+            return None
+        get = metrics.get
+        return CVSSMetrics(
+            version=get('version'),
+            vector_string=get('vector_string'),
+            base_score=float(get('base_score')),
+            base_severity=get('base_severity') or get('severity'),
+            exploitability_score=get('exploitability_score'),
+            impact_score=get('impact_score'),
+            status=get('status')
+        )
+    
+    @staticmethod
+    def _raw_data(data: Dict[str, Any]) -> Dict[str, Any]:
+        """取出按keep_raw配置附加的原始数据，未保留时返回空字典"""
+        raw = data.get('raw_data_bytes')
+        if raw is not None:
+            return orjson.loads(raw)
+        return data.get('raw_data') or {}
+    
+    def attach_raw_data(self, cleaned: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """
+        按keep_raw配置将原始数据附加到清理后的记录
+        
+        默认不保留，避免结果中同时驻留清理前后两份数据；
+        keep_raw为"bytes"时只序列化一次，保存紧凑的JSON字节串，
+        下游写出原始数据时可以直接使用，无需再次遍历整个字典。
+        
+        Args:
+            cleaned: 清理后的数据
+            data: 原始数据
+        """
+        if self.keep_raw == 'bytes':
+            cleaned['raw_data_bytes'] = orjson.dumps(data)
+        elif self.keep_raw:
+            cleaned['raw_data'] = data
+    
+    def _maybe_log(self, msg: str, *args: Any, interval: Optional[float] = None) -> None:
+        """
+        按时间间隔限流输出进度日志
+        
+        分页循环中每页都会调用，距上次输出不足interval秒时直接丢弃，
+        避免日志后端较慢时拖慢采集。
+        
+        Args:
+            msg: 日志格式字符串
+            *args: 格式化参数
+            interval: 最小输出间隔（秒），默认使用progress_log_interval配置
+        """
+        if interval is None:
+            interval = self.progress_log_interval
+        now = time.monotonic()
+        with self._log_lock:
+            if now - self._last_log_ts < interval:
+                return
+            self._last_log_ts = now
+        logger.info(msg, *args)
+    
     def handle_error(self, error: Exception, context: str = "") -> None:
         """
         处理异常
@@ -8,16 +8,66 @@ Debian漏洞数据采集器模块
 数据源：https://security-tracker.debian.org/tracker/
 """
 
-from datetime import datetime
-from typing import Dict, List, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, AsyncIterator, Tuple
+import asyncio
 import logging
 import json
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+from lxml import etree
+import lxml.html
 
 from .base import BaseVulnerabilityCollector
+from ..models.entities import Package, Reference, Version, Vulnerability
+from ..utils.jsonstream import ijson_backend as _ijson
 
 logger = logging.getLogger(__name__)
 
+# 按class查找第一个匹配的div，与BeautifulSoup的class_匹配规则一致
+_DIV_XPATH = "(//div[contains(concat(' ', normalize-space(@class), ' '), ' {} ')])[1]"
+
+# 预编译的XPath表达式，详情页每个字段只需一次C层面的查找
+_XP_DESCRIPTION = etree.XPath(f"string({_DIV_XPATH.format('description')})")
+_XP_REFERENCE_LINKS = etree.XPath(_DIV_XPATH.format('references') + "//a[@href]")
+_XP_PATCH_LINKS = etree.XPath(_DIV_XPATH.format('patches') + "//a[@href]")
+_XP_NOTE_PARAGRAPHS = etree.XPath(_DIV_XPATH.format('notes') + "//p")
+
+# 参考链接主机名到类型的映射
+_REFERENCE_TYPES = {
+    'cve.mitre.org': 'CVE',
+    'bugs.debian.org': 'Debian Bug',
+    'security-tracker.debian.org': 'Debian Security Tracker',
+    'github.com': 'GitHub'
+}
+
+@lru_cache(maxsize=65536)
+def _reference_type(url: str) -> str:
+    """
+    根据URL的主机名判断参考链接类型
+    
+    同一漏洞的参考链接会在多个发行版和软件包下重复出现，结果按URL缓存。
+    
+    Args:
+        url: 参考链接
+        
+    Returns:
+        参考链接类型，无法识别时为'Other'
+    """
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return 'Other'
+        
+    # 从完整主机名开始逐级去掉子域名查表，子域名归入其上级域名的类型
+    while host:
+        ref_type = _REFERENCE_TYPES.get(host)
+        if ref_type:
+            return ref_type
+        host = host.partition('.')[2]
+    return 'Other'
+
 class DebianCollector(BaseVulnerabilityCollector):
     """
     Debian漏洞数据采集器
@@ -33,9 +83,11 @@ class DebianCollector(BaseVulnerabilityCollector):
         Args:
             config: 配置信息，除基类配置外，还可包含：
                 - releases: 要获取的Debian版本列表（默认为["buster", "bullseye", "bookworm"]）
+                - fetch_details: 是否获取漏洞详情页中的描述、参考链接、补丁和注释（默认获取）
         """
         super().__init__(config)
         self.releases = config.get('releases', ["buster", "bullseye", "bookworm"])
+        self.fetch_details = config.get('fetch_details', True)
         
     def fetch_data(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """
@@ -58,165 +110,337 @@ class DebianCollector(BaseVulnerabilityCollector):
         all_vulnerabilities = []
         
         try:
-            # 获取JSON格式的漏洞数据
-            response_data = self.make_api_request(
+            # 流式获取JSON格式的漏洞数据，按发行版逐个解析，不在内存中保留整个数据文件
+            release_order = {release: index for index, release in enumerate(self.releases)}
+            start_day, end_day = self._date_bounds(start_date, end_date)
+            todo = []
+            with self.open_api_stream(
                 endpoint='json',
                 headers={'Accept': 'application/json'}
-            )
-            
-            # 处理每个发行版的数据
-            for release in self.releases:
-                release_data = response_data.get(release, {})
-                for pkg_name, pkg_data in release_data.items():
-                    # 提取漏洞信息
-                    for vuln_id, vuln_data in pkg_data.get('vulnerabilities', {}).items():
-                        # 检查时间范围
-                        if not self._is_in_date_range(vuln_data, start_date, end_date):
-                            continue
+            ) as response:
+                for release, release_data in _ijson.kvitems(response.raw, '', use_float=True):
+                    if release not in release_order:
+                        continue
+                    for pkg_name, pkg_data in release_data.items():
+                        # 提取漏洞信息
+                        for vuln_id, vuln_data in pkg_data.get('vulnerabilities', {}).items():
+                            # 检查时间范围
+                            if not self._is_in_date_range(vuln_data, start_day, end_day):
+                                continue
+                            todo.append((release, pkg_name, vuln_id, vuln_data))
                             
-                        # 获取详细信息
-                        detailed_data = self._fetch_vulnerability_details(vuln_id)
-                        
-                        # 合并数据
-                        merged_data = {
-                            'release': release,
-                            'package': pkg_name,
-                            **vuln_data,
-                            **detailed_data
-                        }
-                        
-                        # 清理数据
-                        cleaned_data = self.clean_data(merged_data)
-                        all_vulnerabilities.append(cleaned_data)
+            # 按配置的发行版顺序输出结果
+            todo.sort(key=lambda item: release_order[item[0]])
+            
+            # 同一漏洞会出现在多个发行版和软件包下，详细信息只获取一次
+            details = {}
+            if self.fetch_details:
+                vuln_ids = list(dict.fromkeys(vuln_id for _, _, vuln_id, _ in todo))
+                
+                # 详细信息请求是I/O密集型操作，使用线程池重叠网络等待
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                    details = dict(zip(
+                        vuln_ids,
+                        executor.map(self._fetch_vulnerability_details, vuln_ids)
+                    ))
+                    
+            for release, pkg_name, vuln_id, vuln_data in todo:
+                # 直接传入各部分数据，不再逐条合并成新字典
+                cleaned_data = self.clean_data(
+                    vuln_data,
+                    details.get(vuln_id, {}),
+                    release,
+                    pkg_name,
+                    vuln_id
+                )
+                all_vulnerabilities.append(cleaned_data)
                         
-            logger.info(f"Debian数据采集完成，共获取 {len(all_vulnerabilities)} 条漏洞数据")
+            logger.info("Debian数据采集完成，共获取 %d 条漏洞数据", len(all_vulnerabilities))
             return all_vulnerabilities
             
         except Exception as e:
             self.handle_error(e, "获取Debian数据失败")
             return []
             
-    def _is_in_date_range(self, data: Dict[str, Any], start_date: datetime, end_date: datetime) -> bool:
+    def _date_bounds(self, start_date: datetime, end_date: datetime) -> Tuple[str, str]:
+        """
+        将时间范围换算为YYYY-MM-DD格式的日期字符串边界
+        
+        漏洞日期按当天零点计算，起始时间不是零点时从下一天开始计入，
+        换算后可以直接对日期字符串做字典序比较。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (起始日期字符串, 结束日期字符串)，均为闭区间
+        """
+        first_day = start_date.date()
+        if start_date > datetime.combine(first_day, datetime.min.time(), start_date.tzinfo):
+            first_day += timedelta(days=1)
+        return first_day.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        
+    def _is_in_date_range(self, data: Dict[str, Any], start_day: str, end_day: str) -> bool:
         """检查漏洞是否在指定时间范围内"""
         # 获取漏洞的发布时间或最后修改时间
         vuln_date = data.get('last_modified') or data.get('discovered')
-        if not vuln_date:
+        if not isinstance(vuln_date, str):
             return False
             
-        try:
-            vuln_datetime = datetime.strptime(vuln_date, '%Y-%m-%d')
-            return start_date <= vuln_datetime <= end_date
-        except ValueError:
-            return False
+        # 非零填充等非标准格式回退到strptime解析
+        if len(vuln_date) != 10:
+            try:
+                vuln_date = datetime.strptime(vuln_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+            except ValueError:
+                return False
+                
+        # 定长的ISO日期字符串按字典序比较即按日期比较
+        return start_day <= vuln_date <= end_day
             
     def _fetch_vulnerability_details(self, vuln_id: str) -> Dict[str, Any]:
         """获取漏洞的详细信息"""
         try:
-            # 获取HTML格式的详细信息
-            response = self.make_api_request(
-                endpoint=f'data/{vuln_id}',
-                headers={'Accept': 'text/html'}
-            )
+            # 获取HTML格式的详细信息，详情页不是JSON，直接取响应字节交给lxml解析
+            content = self._send_request(
+                'GET', f'data/{vuln_id}', None, {'Accept': 'text/html'}, None
+            ).content
             
-            # 解析HTML内容
-            soup = BeautifulSoup(response.get('content', ''), 'html.parser')
+            # 空页面不包含任何详细信息
+            if not content:
+                return {'description': '', 'references': [], 'patches': [], 'notes': []}
+            root = lxml.html.fromstring(content)
             
             # 提取详细信息
             details = {
-                'description': self._extract_description(soup),
-                'references': self._extract_references(soup),
-                'patches': self._extract_patches(soup),
-                'notes': self._extract_notes(soup)
+                'description': self._extract_description(root),
+                'references': self._extract_references(root),
+                'patches': self._extract_patches(root),
+                'notes': self._extract_notes(root)
             }
             
             return details
             
         except Exception as e:
-            logger.warning(f"获取漏洞 {vuln_id} 的详细信息失败: {str(e)}")
+            logger.warning("获取漏洞 %s 的详细信息失败: %s", vuln_id, e)
             return {}
             
-    def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def clean_data(self, vuln_data: Dict[str, Any],
+                   detailed_data: Dict[str, Any] = None,
+                   release: str = None,
+                   pkg_name: str = None,
+                   vuln_id: str = None) -> Dict[str, Any]:
         """
         清理和标准化Debian漏洞数据
         
         Args:
-            data: 原始Debian数据
+            vuln_data: Security Tracker中的漏洞数据
+            detailed_data: 漏洞详情页中提取的数据
+            release: Debian版本
+            pkg_name: 软件包名称
+            vuln_id: 漏洞ID，未提供时从vuln_data中读取
             
         Returns:
             清理后的数据
         """
         try:
+            details = detailed_data or {}
+            
+            # 详情页字段优先，缺失时回退到漏洞数据
+            def get(key, default=None):
+                value = details.get(key)
+                return vuln_data.get(key, default) if value is None else value
+                
             # 提取基本信息
             cleaned = {
                 'source': 'Debian',
-                'id': data.get('id'),
-                'package': data.get('package'),
-                'release': data.get('release'),
-                'status': data.get('status'),
-                'urgency': data.get('urgency'),
-                'discovered_date': data.get('discovered'),
-                'modified_date': data.get('last_modified'),
+                'id': vuln_id or vuln_data.get('id'),
+                'package': pkg_name or vuln_data.get('package'),
+                'release': release or vuln_data.get('release'),
+                'status': get('status'),
+                'urgency': get('urgency'),
+                'discovered_date': get('discovered'),
+                'modified_date': get('last_modified'),
                 
                 # 提取描述和影响
-                'description': data.get('description'),
-                'scope': data.get('scope'),
+                'description': get('description'),
+                'scope': get('scope'),
                 
                 # 提取版本信息
-                'fixed_version': data.get('fixed_version'),
-                'affected_versions': self._extract_affected_versions(data),
+                'fixed_version': get('fixed_version'),
+                'affected_versions': self._extract_affected_versions(vuln_data),
                 
                 # 提取参考信息
-                'references': data.get('references', []),
-                'patches': data.get('patches', []),
-                'notes': data.get('notes', []),
-                
-                # 原始数据
-                'raw_data': data
+                'references': get('references', []),
+                'patches': get('patches', []),
+                'notes': get('notes', [])
             }
             
+            # 按配置保留原始数据
+            self.attach_raw_data(cleaned, {
+                'release': release,
+                'package': pkg_name,
+                'vuln': vuln_data,
+                'details': details
+            })
+            
             return cleaned
             
         except Exception as e:
-            logger.error(f"清理Debian数据失败: {str(e)}")
-            return data
+            logger.error("清理Debian数据失败: %s", e)
+            return vuln_data
+            
+    async def iter_data(self,
+                        start_date: datetime,
+                        end_date: datetime,
+                        batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按批次异步产出指定时间范围内的Debian漏洞数据
+        
+        同一漏洞在每个发行版的每个软件包下各有一条记录，按漏洞ID写入数据库时
+        后写入的记录会覆盖之前的记录。因此在切分批次之前按漏洞ID合并，
+        同一漏洞的全部软件包只出现在一条记录中，不会分散到不同批次。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            batch_size: 每批的记录数
             
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+        Yields:
+            按漏洞ID合并后的漏洞信息字典列表
+        """
+        data = await self.fetch_data_async(start_date, end_date)
+        merged = await asyncio.to_thread(self._group_by_vulnerability, data)
+        for start in range(0, len(merged), batch_size):
+            yield merged[start:start + batch_size]
+            
+    def _group_by_vulnerability(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        按漏洞ID合并clean_data返回的记录
+        
+        合并后的记录保留第一条记录的漏洞级字段，修改时间取各记录中最新的，
+        各发行版和软件包的记录按原顺序放在packages中。
+        
+        Args:
+            records: clean_data返回的数据列表
+            
+        Returns:
+            每个漏洞一条的记录列表，顺序与各漏洞首次出现的顺序一致
+        """
+        groups = {}
+        for record in records:
+            group = groups.get(record.get('id'))
+            if group is None:
+                groups[record.get('id')] = {**record, 'packages': [record]}
+                continue
+            group['packages'].append(record)
+            modified = record.get('modified_date')
+            if modified and (not group.get('modified_date') or modified > group['modified_date']):
+                group['modified_date'] = modified
+        return list(groups.values())
+        
+    def to_vulnerability(self, data: Dict[str, Any]) -> Vulnerability:
+        """
+        将清理后的Debian记录转换为通用漏洞模型
+        
+        data可以是_group_by_vulnerability合并后的记录，也可以是单个发行版中单个软件包的记录。
+        同名软件包合并为一个Package，各发行版的受影响版本和修复版本
+        以带release的Version保存，platform为涉及的发行版列表。
+        
+        Args:
+            data: clean_data返回或按漏洞ID合并后的数据
+            
+        Returns:
+            漏洞实体
+        """
+        packages = {}
+        releases = {}
+        for record in data.get('packages') or [data]:
+            name = record.get('package')
+            if not name:
+                continue
+            release = record.get('release')
+            fixed_version = record.get('fixed_version')
+            package = packages.get(name)
+            if package is None:
+                package = packages[name] = Package(name=name, ecosystem='debian')
+                releases[name] = []
+            if release and release not in releases[name]:
+                releases[name].append(release)
+                
+            for v in record.get('affected_versions') or []:
+                if not v.get('version'):
+                    continue
+                package.versions.append(Version(
+                    version=v['version'],
+                    release=release,
+                    architecture=','.join(v.get('architectures') or []) or None,
+                    status='affected',
+                    repositories=v.get('repositories') or []
+                ))
+                if v['version'] not in package.affected_versions:
+                    package.affected_versions.append(v['version'])
+            if fixed_version:
+                package.versions.append(Version(version=fixed_version, release=release, status='fixed'))
+                if fixed_version not in package.fixed_versions:
+                    package.fixed_versions.append(fixed_version)
+                    
+        for name, package in packages.items():
+            package.platform = ', '.join(releases[name]) or None
+        
+        references = []
+        for ref in data.get('references') or []:
+            # 详情页中的参考链接带有类型，漏洞数据中可能只有URL
+            url = ref.get('url') if isinstance(ref, dict) else ref
+            if url:
+                references.append(Reference(
+                    url=url,
+                    source='Debian',
+                    type=ref.get('type') if isinstance(ref, dict) else _reference_type(url)
+                ))
+        
+        return Vulnerability(
+            id=data['id'],
+            source='Debian',
+            description=data.get('description'),
+            published_date=self._parse_date(data.get('discovered_date')),
+            last_modified_date=self._parse_date(data.get('modified_date')),
+            discovered_date=self._parse_date(data.get('discovered_date')),
+            severity=data.get('urgency'),
+            status=data.get('status') or 'unknown',
+            scope=data.get('scope'),
+            affected_packages=list(packages.values()),
+            references=references,
+            patches=data.get('patches') or [],
+            notes=data.get('notes') or [],
+            raw_data=self._raw_data(data)
+        )
+        
+    def _extract_description(self, root: lxml.html.HtmlElement) -> str:
         """从HTML中提取漏洞描述"""
-        desc_elem = soup.find('div', class_='description')
-        return desc_elem.get_text().strip() if desc_elem else ''
+        return _XP_DESCRIPTION(root).strip()
         
-    def _extract_references(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_references(self, root: lxml.html.HtmlElement) -> List[Dict[str, str]]:
         """从HTML中提取参考链接"""
         refs = []
-        ref_list = soup.find('div', class_='references')
-        if ref_list:
-            for link in ref_list.find_all('a'):
-                refs.append({
-                    'type': self._guess_reference_type(link['href']),
-                    'url': link['href']
-                })
+        for link in _XP_REFERENCE_LINKS(root):
+            url = link.get('href')
+            refs.append({
+                'type': self._guess_reference_type(url),
+                'url': url
+            })
         return refs
         
-    def _extract_patches(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_patches(self, root: lxml.html.HtmlElement) -> List[Dict[str, str]]:
         """从HTML中提取补丁信息"""
-        patches = []
-        patch_list = soup.find('div', class_='patches')
-        if patch_list:
-            for link in patch_list.find_all('a'):
-                patches.append({
-                    'name': link.get_text(),
-                    'url': link['href']
-                })
-        return patches
-        
-    def _extract_notes(self, soup: BeautifulSoup) -> List[str]:
+        return [
+            {'name': link.text_content(), 'url': link.get('href')}
+            for link in _XP_PATCH_LINKS(root)
+        ]
+        
+    def _extract_notes(self, root: lxml.html.HtmlElement) -> List[str]:
         """从HTML中提取注释信息"""
-        notes = []
-        notes_elem = soup.find('div', class_='notes')
-        if notes_elem:
-            for note in notes_elem.find_all('p'):
-                notes.append(note.get_text().strip())
-        return notes
+        return [note.text_content().strip() for note in _XP_NOTE_PARAGRAPHS(root)]
         
     def _extract_affected_versions(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """提取受影响的版本信息"""
@@ -230,14 +454,5 @@ class DebianCollector(BaseVulnerabilityCollector):
         return versions
         
     def _guess_reference_type(self, url: str) -> str:
-        """根据URL猜测参考链接类型"""
-        if 'cve.mitre.org' in url:
-            return 'CVE'
-        elif 'bugs.debian.org' in url:
-            return 'Debian Bug'
-        elif 'security-tracker.debian.org' in url:
-            return 'Debian Security Tracker'
-        elif 'github.com' in url:
-            return 'GitHub'
-        else:
-            return 'Other' 
\ No newline at end of file
+        """根据URL的主机名猜测参考链接类型"""
+        return _reference_type(url)
\ No newline at end of file
@@ -9,11 +9,14 @@ GitHub安全公告采集器模块
 API文档：https://docs.github.com/en/graphql
 """
 
-from datetime import datetime
-from typing import Dict, List, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Tuple
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseVulnerabilityCollector
+from ..models.entities import Package, Reference, Vulnerability
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +28,62 @@ class GitHubCollector(BaseVulnerabilityCollector):
     支持按时间范围查询和增量更新。
     """
     
+    # 安全公告查询语句，分页和时间范围通过GraphQL变量传入，查询文本保持不变
+    QUERY = """
+    query($first: Int!, $after: String, $since: DateTime!, $before: DateTime!) {
+      securityAdvisories(first: $first, after: $after
+        orderBy: {field: PUBLISHED_AT, direction: ASC}
+        publishedSince: $since
+        publishedBefore: $before
+      ) {
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+        nodes {
+          ghsaId
+          summary
+          description
+          severity
+          publishedAt
+          updatedAt
+          withdrawnAt
+          references {
+            url
+          }
+          identifiers {
+            type
+            value
+          }
+          vulnerabilities(first: 10) {
+            nodes {
+              package {
+                ecosystem
+                name
+              }
+              firstPatchedVersion {
+                identifier
+              }
+              vulnerableVersionRange
+            }
+          }
+        }
+      }
+    }
+    """
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化GitHub采集器
         
         Args:
             config: 配置信息，除基类配置外，还可包含：
-                - per_page: 每页结果数（默认100）
+                - per_page: 每页结果数（默认100，GraphQL API的上限）
+                - window_days: 并行查询时每个时间窗口的天数（默认7）
         """
         super().__init__(config)
         self.per_page = config.get('per_page', 100)
+        self.window_days = config.get('window_days', 7)
         
         # GraphQL API端点
         self.url = 'https://api.github.com/graphql'
@@ -58,111 +107,108 @@ class GitHubCollector(BaseVulnerabilityCollector):
         self.validate_date_range(start_date, end_date)
         
         all_advisories = []
-        cursor = None
+        
+        # 窗口边界上的公告可能被相邻窗口重复返回，各窗口共享已获取的公告ID集合
+        seen_ids = set()
+        seen_lock = threading.Lock()
+        
+        # 按时间窗口拆分查询，各窗口的分页游标互不依赖，可以并行获取
+        windows = self._split_date_range(start_date, end_date)
         
         try:
-            while True:
-                # 构建GraphQL查询
-                query = self._build_graphql_query(
-                    start_date=start_date,
-                    end_date=end_date,
-                    cursor=cursor,
-                    per_page=self.per_page
-                )
-                
-                # 发送API请求
-                response_data = self.make_api_request(
-                    endpoint='',
-                    method='POST',
-                    headers={'Accept': 'application/vnd.github.v4+json'},
-                    data={'query': query}
-                )
-                
-                # 提取安全公告数据
-                data = response_data.get('data', {})
-                advisories = data.get('securityAdvisories', {}).get('nodes', [])
-                if not advisories:
-                    break
-                    
-                # 清理并添加数据
-                for advisory in advisories:
-                    cleaned_data = self.clean_data(advisory)
-                    all_advisories.append(cleaned_data)
-                
-                # 检查是否还有更多数据
-                page_info = data.get('securityAdvisories', {}).get('pageInfo', {})
-                if not page_info.get('hasNextPage'):
-                    break
-                    
-                cursor = page_info.get('endCursor')
-                logger.info(f"已获取 {len(all_advisories)} 条安全公告数据")
-                
-            logger.info(f"GitHub数据采集完成，共获取 {len(all_advisories)} 条安全公告数据")
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(windows))) as executor:
+                for advisories in executor.map(
+                    lambda window: self._fetch_window(*window, seen_ids, seen_lock),
+                    windows
+                ):
+                    all_advisories.extend(advisories)
+                        
+            logger.info("GitHub数据采集完成，共获取 %d 条安全公告数据", len(all_advisories))
             return all_advisories
             
         except Exception as e:
             self.handle_error(e, "获取GitHub数据失败")
             return []
             
-    def _build_graphql_query(self, start_date: datetime, end_date: datetime, 
-                           cursor: str = None, per_page: int = 100) -> str:
+    def _split_date_range(self, start_date: datetime, end_date: datetime) -> List[Tuple[datetime, datetime]]:
         """
-        构建GraphQL查询语句
+        将时间范围拆分为连续的时间窗口
         
         Args:
             start_date: 开始日期
             end_date: 结束日期
-            cursor: 分页游标
-            per_page: 每页结果数
             
         Returns:
-            GraphQL查询语句
+            按时间顺序排列的(窗口开始, 窗口结束)列表
+        """
+        windows = []
+        step = timedelta(days=self.window_days)
+        window_start = start_date
+        while True:
+            window_end = min(window_start + step, end_date)
+            windows.append((window_start, window_end))
+            if window_end >= end_date:
+                return windows
+            window_start = window_end
+            
+    def _fetch_window(self, start_date: datetime, end_date: datetime,
+                      seen_ids: set, seen_lock: threading.Lock) -> List[Dict[str, Any]]:
+        """
+        获取单个时间窗口内的全部安全公告
+        
+        Args:
+            start_date: 窗口开始日期
+            end_date: 窗口结束日期
+            seen_ids: 各窗口共享的已获取公告ID集合
+            seen_lock: 保护seen_ids的锁
+            
+        Returns:
+            清理后的安全公告列表
         """
-        after = f'after: "{cursor}"' if cursor else ''
-        query = f'''
-        {{
-          securityAdvisories(first: {per_page} {after}
-            orderBy: {{field: PUBLISHED_AT, direction: ASC}}
-            publishedSince: "{start_date.isoformat()}Z"
-            publishedBefore: "{end_date.isoformat()}Z"
-          ) {{
-            pageInfo {{
-              hasNextPage
-              endCursor
-            }}
-            nodes {{
-              ghsaId
-              summary
-              description
-              severity
-              publishedAt
-              updatedAt
-              withdrawnAt
-              references {{
-                url
-              }}
-              identifiers {{
-                type
-                value
-              }}
-              vulnerabilities(first: 10) {{
-                nodes {{
-                  package {{
-                    ecosystem
-                    name
-                  }}
-                  firstPatchedVersion {{
-                    identifier
-                  }}
-                  vulnerableVersionRange
-                }}
-              }}
-            }}
-          }}
-        }}
-        '''
-        return query
+        advisories_in_window = []
+        variables = {
+            'first': self.per_page,
+            'after': None,
+            'since': f"{start_date.isoformat()}Z",
+            'before': f"{end_date.isoformat()}Z"
+        }
         
+        while True:
+            # 发送API请求，只有分页游标随请求变化
+            response_data = self.make_api_request(
+                endpoint='',
+                method='POST',
+                headers={'Accept': 'application/vnd.github.v4+json'},
+                data={'query': self.QUERY, 'variables': variables}
+            )
+            
+            # 提取安全公告数据
+            data = response_data.get('data', {})
+            advisories = data.get('securityAdvisories', {}).get('nodes', [])
+            if not advisories:
+                break
+                
+            # 跳过其他窗口已获取的公告，重复数据不再清理
+            for advisory in advisories:
+                advisory_id = advisory.get('ghsaId')
+                with seen_lock:
+                    if advisory_id in seen_ids:
+                        continue
+                    seen_ids.add(advisory_id)
+                cleaned_data = self.clean_data(advisory)
+                advisories_in_window.append(cleaned_data)
+            
+            # 检查是否还有更多数据
+            page_info = data.get('securityAdvisories', {}).get('pageInfo', {})
+            if not page_info.get('hasNextPage'):
+                break
+                
+            variables = {**variables, 'after': page_info.get('endCursor')}
+            self._maybe_log("已获取 %d 条安全公告数据（%s 至 %s）",
+                            len(advisories_in_window), start_date.date(), end_date.date())
+            
+        return advisories_in_window
+            
     def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         清理和标准化GitHub安全公告数据
@@ -201,18 +247,56 @@ class GitHubCollector(BaseVulnerabilityCollector):
                 ],
                 
                 # 提取受影响的包信息
-                'affected_packages': self._extract_affected_packages(data),
-                
-                # 原始数据
-                'raw_data': data
+                'affected_packages': self._extract_affected_packages(data)
             }
             
+            # 按配置保留原始数据
+            self.attach_raw_data(cleaned, data)
+            
             return cleaned
             
         except Exception as e:
-            logger.error(f"清理GitHub数据失败: {str(e)}")
+            logger.error("清理GitHub数据失败: %s", e)
             return data
             
+    def to_vulnerability(self, data: Dict[str, Any]) -> Vulnerability:
+        """
+        将清理后的GitHub安全公告转换为通用漏洞模型
+        
+        Args:
+            data: clean_data返回的数据
+            
+        Returns:
+            漏洞实体
+        """
+        affected_packages = []
+        for pkg in data.get('affected_packages') or []:
+            version_range = pkg.get('vulnerable_version_range')
+            first_patched = pkg.get('first_patched_version')
+            affected_packages.append(Package(
+                name=pkg.get('name'),
+                ecosystem=pkg.get('ecosystem'),
+                affected_versions=[version_range] if version_range else [],
+                fixed_versions=[first_patched] if first_patched else []
+            ))
+        
+        return Vulnerability(
+            id=data['id'],
+            source='GitHub',
+            title=data.get('summary'),
+            description=data.get('description'),
+            published_date=self._parse_date(data.get('published_date')),
+            last_modified_date=self._parse_date(data.get('updated_date')),
+            severity=data.get('severity'),
+            status='withdrawn' if data.get('withdrawn_date') else 'unknown',
+            affected_packages=affected_packages,
+            references=[
+                Reference(url=ref['url'], source='GitHub')
+                for ref in data.get('references') or [] if ref.get('url')
+            ],
+            raw_data=self._raw_data(data)
+        )
+            
     def _extract_affected_packages(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """提取受影响的包信息"""
         vulnerabilities = data.get('vulnerabilities', {}).get('nodes', [])
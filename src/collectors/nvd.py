@@ -10,10 +10,14 @@ API文档：https://nvd.nist.gov/developers/vulnerabilities
 """
 
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseVulnerabilityCollector
+from ..models.entities import Vulnerability
+from ..models.nvd import NVDData
 
 logger = logging.getLogger(__name__)
 
@@ -55,49 +59,123 @@ class NVDCollector(BaseVulnerabilityCollector):
         self.validate_date_range(start_date, end_date)
         
         all_vulnerabilities = []
-        start_index = 0
+        
+        # 日期参数在整个采集过程中不变，只格式化一次
+        date_params = self._date_params(start_date, end_date)
         
         try:
-            while True:
-                # 构建请求参数
-                params = {
-                    'lastModStartDate': start_date.strftime('%Y-%m-%dT%H:%M:%S.000'),
-                    'lastModEndDate': end_date.strftime('%Y-%m-%dT%H:%M:%S.999'),
-                    'resultsPerPage': self.results_per_page,
-                    'startIndex': start_index
-                }
-                
-                # 发送API请求
-                response_data = self.make_api_request(
-                    endpoint='vulnerabilities',
-                    params=params
-                )
-                
-                # 提取漏洞数据
-                vulnerabilities = response_data.get('vulnerabilities', [])
-                if not vulnerabilities:
-                    break
-                    
-                # 清理并添加数据
-                for vuln in vulnerabilities:
-                    cleaned_data = self.clean_data(vuln)
-                    all_vulnerabilities.append(cleaned_data)
+            # 串行请求第一页，获取结果总数和实际的每页结果数
+            response_data = self._fetch_page(date_params, 0)
+            vulnerabilities = response_data.get('vulnerabilities', [])
+            total_results = response_data.get('totalResults', 0)
+            
+            # 清理并添加数据
+            clean_data = self.clean_data
+            all_vulnerabilities.extend([clean_data(vuln) for vuln in vulnerabilities])
                 
-                # 检查是否还有更多数据
-                total_results = response_data.get('totalResults', 0)
-                if start_index + len(vulnerabilities) >= total_results:
-                    break
-                    
-                start_index += len(vulnerabilities)
-                logger.info(f"已获取 {len(all_vulnerabilities)}/{total_results} 条漏洞数据")
+            # 其余页的起始位置已知且互不依赖，并行请求并按起始位置顺序合并
+            page_size = len(vulnerabilities)
+            if page_size and page_size < total_results:
+                self._maybe_log("已获取 %d/%d 条漏洞数据", len(all_vulnerabilities), total_results)
+                page_starts = range(page_size, total_results, page_size)
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                    pages = executor.map(
+                        lambda start_index: self._fetch_page(date_params, start_index),
+                        page_starts
+                    )
+                    for response_data in pages:
+                        all_vulnerabilities.extend([
+                            clean_data(vuln) for vuln in response_data.get('vulnerabilities', [])
+                        ])
+                        self._maybe_log("已获取 %d/%d 条漏洞数据", len(all_vulnerabilities), total_results)
                 
-            logger.info(f"NVD数据采集完成，共获取 {len(all_vulnerabilities)} 条漏洞数据")
+            logger.info("NVD数据采集完成，共获取 %d 条漏洞数据", len(all_vulnerabilities))
             return all_vulnerabilities
             
         except Exception as e:
             self.handle_error(e, "获取NVD数据失败")
             return []
             
+    async def iter_data(self,
+                        start_date: datetime,
+                        end_date: datetime,
+                        batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按批次异步产出指定时间范围内的NVD漏洞数据
+        
+        每获取并清理一页即产出，调用方写入数据库的同时继续请求后续页。
+        请求失败时异常直接抛出，由调用方决定是否推进同步时间。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            batch_size: 每批的记录数
+            
+        Yields:
+            清理后的漏洞信息字典列表
+        """
+        self.validate_date_range(start_date, end_date)
+        date_params = self._date_params(start_date, end_date)
+        
+        # 第一页确定结果总数和实际的每页结果数
+        response_data = await asyncio.to_thread(self._fetch_page, date_params, 0)
+        total_results = response_data.get('totalResults', 0)
+        page_size = len(response_data.get('vulnerabilities', []))
+        first_page = await asyncio.to_thread(self._clean_page, response_data)
+        del response_data
+        
+        count = 0
+        for start in range(0, len(first_page), batch_size):
+            batch = first_page[start:start + batch_size]
+            count += len(batch)
+            yield batch
+        del first_page
+        
+        if page_size and page_size < total_results:
+            async for batch in self._iter_pages(
+                lambda start_index: self._clean_page(self._fetch_page(date_params, start_index)),
+                range(page_size, total_results, page_size),
+                batch_size
+            ):
+                count += len(batch)
+                self._maybe_log("已获取 %d/%d 条漏洞数据", count, total_results)
+                yield batch
+                
+        logger.info("NVD数据采集完成，共获取 %d 条漏洞数据", count)
+    
+    def _date_params(self, start_date: datetime, end_date: datetime) -> Dict[str, str]:
+        """格式化按最后修改时间查询的日期范围参数"""
+        return {
+            'lastModStartDate': start_date.strftime('%Y-%m-%dT%H:%M:%S.000'),
+            'lastModEndDate': end_date.strftime('%Y-%m-%dT%H:%M:%S.999')
+        }
+    
+    def _clean_page(self, response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """清理一页响应中的漏洞数据"""
+        clean_data = self.clean_data
+        return [clean_data(vuln) for vuln in response_data.get('vulnerabilities', [])]
+            
+    def _fetch_page(self, date_params: Dict[str, str], start_index: int) -> Dict[str, Any]:
+        """
+        获取一页漏洞数据
+        
+        Args:
+            date_params: 日期范围参数
+            start_index: 结果起始位置
+            
+        Returns:
+            API响应数据
+        """
+        params = {
+            **date_params,
+            'resultsPerPage': self.results_per_page,
+            'startIndex': start_index
+        }
+        return self.make_api_request(
+            endpoint='vulnerabilities',
+            params=params
+        )
+        
     def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         清理和标准化NVD漏洞数据
@@ -110,14 +188,15 @@ class NVDCollector(BaseVulnerabilityCollector):
         """
         try:
             cve = data.get('cve', {})
+            get = cve.get
             
             # 提取基本信息
             cleaned = {
                 'source': 'NVD',
-                'id': cve.get('id'),
-                'published_date': cve.get('published'),
-                'last_modified_date': cve.get('lastModified'),
-                'vuln_status': cve.get('vulnStatus'),
+                'id': get('id'),
+                'published_date': get('published'),
+                'last_modified_date': get('lastModified'),
+                'vuln_status': get('vulnStatus'),
                 
                 # 提取描述
                 'descriptions': [
@@ -125,7 +204,7 @@ class NVDCollector(BaseVulnerabilityCollector):
                         'lang': desc.get('lang'),
                         'value': desc.get('value')
                     }
-                    for desc in cve.get('descriptions', [])
+                    for desc in get('descriptions', [])
                 ],
                 
                 # 提取参考链接
@@ -135,7 +214,7 @@ class NVDCollector(BaseVulnerabilityCollector):
                         'source': ref.get('source'),
                         'tags': ref.get('tags', [])
                     }
-                    for ref in cve.get('references', [])
+                    for ref in get('references', [])
                 ],
                 
                 # 提取CVSS评分
@@ -145,50 +224,86 @@ class NVDCollector(BaseVulnerabilityCollector):
                 },
                 
                 # 提取受影响的产品配置
-                'configurations': cve.get('configurations', []),
-                
-                # 原始数据
-                'raw_data': data
+                'configurations': get('configurations', [])
             }
             
+            # 按配置保留原始数据
+            self.attach_raw_data(cleaned, data)
+            
             return cleaned
             
         except Exception as e:
-            logger.error(f"清理NVD数据失败: {str(e)}")
+            logger.error("清理NVD数据失败: %s", e)
             return data
             
+    def to_vulnerability(self, data: Dict[str, Any]) -> Vulnerability:
+        """
+        将清理后的NVD记录转换为通用漏洞模型
+        
+        描述、参考链接、补丁和受影响的包沿用NVDData的提取逻辑，
+        CVSS评分使用clean_data中已经提取的结果。
+        
+        Args:
+            data: clean_data返回的数据
+            
+        Returns:
+            漏洞实体
+        """
+        metrics = data.get('metrics') or {}
+        nvd_data = NVDData(
+            id=data['id'],
+            published=self._parse_date(data.get('published_date')),
+            lastModified=self._parse_date(data.get('last_modified_date')),
+            vulnStatus=data.get('vuln_status') or 'unknown',
+            descriptions=data.get('descriptions') or [],
+            metrics={},
+            references=data.get('references') or [],
+            configurations=data.get('configurations') or [],
+            raw_data=self._raw_data(data)
+        )
+        vuln = nvd_data.to_vulnerability()
+        vuln.cvss_v3 = self._to_cvss(metrics.get('cvss_v3'))
+        vuln.cvss_v2 = self._to_cvss(metrics.get('cvss_v2'))
+        cvss = vuln.cvss_v3 or vuln.cvss_v2
+        if cvss is not None:
+            vuln.severity = cvss.base_severity
+        return vuln
+        
     def _extract_cvss_v3(self, cve: Dict[str, Any]) -> Dict[str, Any]:
         """提取CVSS v3评分信息"""
-        metrics = cve.get('metrics', {})
-        cvss_v3 = metrics.get('cvssMetricV31', [])  # 优先使用v3.1
+        metrics = cve.get('metrics') or {}
+        # 优先使用v3.1
+        cvss_v3 = metrics.get('cvssMetricV31') or metrics.get('cvssMetricV30')
         if not cvss_v3:
-            cvss_v3 = metrics.get('cvssMetricV30', [])
-            
-        if cvss_v3:
-            cvss_data = cvss_v3[0].get('cvssData', {})
-            return {
-                'version': cvss_data.get('version'),
-                'vector_string': cvss_data.get('vectorString'),
-                'base_score': cvss_data.get('baseScore'),
-                'base_severity': cvss_data.get('baseSeverity'),
-                'exploitability_score': cvss_v3[0].get('exploitabilityScore'),
-                'impact_score': cvss_v3[0].get('impactScore')
-            }
-        return {}
+            return {}
+            
+        entry = cvss_v3[0]
+        cvss_data = entry.get('cvssData') or {}
+        get = cvss_data.get
+        return {
+            'version': get('version'),
+            'vector_string': get('vectorString'),
+            'base_score': get('baseScore'),
+            'base_severity': get('baseSeverity'),
+            'exploitability_score': entry.get('exploitabilityScore'),
+            'impact_score': entry.get('impactScore')
+        }
         
     def _extract_cvss_v2(self, cve: Dict[str, Any]) -> Dict[str, Any]:
         """提取CVSS v2评分信息"""
-        metrics = cve.get('metrics', {})
-        cvss_v2 = metrics.get('cvssMetricV2', [])
-        
-        if cvss_v2:
-            cvss_data = cvss_v2[0].get('cvssData', {})
-            return {
-                'version': '2.0',
-                'vector_string': cvss_data.get('vectorString'),
-                'base_score': cvss_data.get('baseScore'),
-                'exploitability_score': cvss_v2[0].get('exploitabilityScore'),
-                'impact_score': cvss_v2[0].get('impactScore'),
-                'severity': cvss_v2[0].get('baseSeverity')
-            }
-        return {} 
\ No newline at end of file
+        metrics = cve.get('metrics') or {}
+        cvss_v2 = metrics.get('cvssMetricV2')
+        if not cvss_v2:
+            return {}
+            
+        entry = cvss_v2[0]
+        cvss_data = entry.get('cvssData') or {}
+        get = entry.get
+        return {
+            'version': '2.0',
+            'vector_string': cvss_data.get('vectorString'),
+            'base_score': cvss_data.get('baseScore'),
+            'exploitability_score': get('exploitabilityScore'),
+            'impact_score': get('impactScore'),
+            'severity': get('baseSeverity')
+        } 
\ No newline at end of file
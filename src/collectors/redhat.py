@@ -9,13 +9,19 @@ API文档：https://access.redhat.com/documentation/en-us/red_hat_security_data_
 """
 
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseVulnerabilityCollector
+from ..models.entities import Package, Reference, Vulnerability
 
 logger = logging.getLogger(__name__)
 
+# 修复记录中的勘误编号前缀（安全公告、缺陷修复、功能增强），可换算为勘误页面地址
+_ERRATA_PREFIXES = ('RHSA-', 'RHBA-', 'RHEA-')
+
 class RedHatCollector(BaseVulnerabilityCollector):
     """
     RedHat漏洞数据采集器
@@ -54,49 +60,120 @@ class RedHatCollector(BaseVulnerabilityCollector):
         self.validate_date_range(start_date, end_date)
         
         all_advisories = []
-        page = 1
+        
+        # 日期参数在整个采集过程中不变，只格式化一次
+        date_params = self._date_params(start_date, end_date)
         
         try:
-            while True:
-                # 构建请求参数
-                params = {
-                    'after': start_date.strftime('%Y-%m-%d'),
-                    'before': end_date.strftime('%Y-%m-%d'),
-                    'per_page': self.per_page,
-                    'page': page
-                }
-                
-                # 发送API请求
-                response_data = self.make_api_request(
-                    endpoint='cves',
-                    params=params
-                )
-                
-                # 提取漏洞数据
-                advisories = response_data.get('data', [])
-                if not advisories:
-                    break
-                    
-                # 清理并添加数据
-                for advisory in advisories:
-                    cleaned_data = self.clean_data(advisory)
-                    all_advisories.append(cleaned_data)
-                
-                # 检查是否还有更多数据
-                total_pages = response_data.get('pages', 1)
-                if page >= total_pages:
-                    break
-                    
-                page += 1
-                logger.info(f"已获取 {len(all_advisories)} 条安全公告数据")
+            # 串行请求第一页，获取总页数
+            response_data = self._fetch_page(date_params, 1)
+            advisories = response_data.get('data', [])
+            
+            # 清理并添加数据
+            clean_data = self.clean_data
+            all_advisories.extend([clean_data(advisory) for advisory in advisories])
+            
+            # 其余页互不依赖，并行请求并按页码顺序合并
+            total_pages = response_data.get('pages', 1)
+            if advisories and total_pages > 1:
+                self._maybe_log("已获取 %d 条安全公告数据", len(all_advisories))
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                    pages = executor.map(
+                        lambda page: self._fetch_page(date_params, page),
+                        range(2, total_pages + 1)
+                    )
+                    for response_data in pages:
+                        all_advisories.extend([
+                            clean_data(advisory) for advisory in response_data.get('data', [])
+                        ])
+                        self._maybe_log("已获取 %d 条安全公告数据", len(all_advisories))
                 
-            logger.info(f"RedHat数据采集完成，共获取 {len(all_advisories)} 条安全公告数据")
+            logger.info("RedHat数据采集完成，共获取 %d 条安全公告数据", len(all_advisories))
             return all_advisories
             
         except Exception as e:
             self.handle_error(e, "获取RedHat数据失败")
             return []
             
+    async def iter_data(self,
+                        start_date: datetime,
+                        end_date: datetime,
+                        batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按批次异步产出指定时间范围内的RedHat安全公告数据
+        
+        每获取并清理一页即产出，调用方写入数据库的同时继续请求后续页。
+        请求失败时异常直接抛出，由调用方决定是否推进同步时间。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            batch_size: 每批的记录数
+            
+        Yields:
+            清理后的安全公告字典列表
+        """
+        self.validate_date_range(start_date, end_date)
+        date_params = self._date_params(start_date, end_date)
+        
+        # 第一页确定总页数
+        response_data = await asyncio.to_thread(self._fetch_page, date_params, 1)
+        total_pages = response_data.get('pages', 1)
+        first_page = await asyncio.to_thread(self._clean_page, response_data)
+        del response_data
+        
+        count = 0
+        for start in range(0, len(first_page), batch_size):
+            batch = first_page[start:start + batch_size]
+            count += len(batch)
+            yield batch
+            
+        if first_page and total_pages > 1:
+            del first_page
+            async for batch in self._iter_pages(
+                lambda page: self._clean_page(self._fetch_page(date_params, page)),
+                range(2, total_pages + 1),
+                batch_size
+            ):
+                count += len(batch)
+                self._maybe_log("已获取 %d 条安全公告数据", count)
+                yield batch
+                
+        logger.info("RedHat数据采集完成，共获取 %d 条安全公告数据", count)
+    
+    def _date_params(self, start_date: datetime, end_date: datetime) -> Dict[str, str]:
+        """格式化查询的日期范围参数"""
+        return {
+            'after': start_date.strftime('%Y-%m-%d'),
+            'before': end_date.strftime('%Y-%m-%d')
+        }
+    
+    def _clean_page(self, response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """清理一页响应中的安全公告数据"""
+        clean_data = self.clean_data
+        return [clean_data(advisory) for advisory in response_data.get('data', [])]
+            
+    def _fetch_page(self, date_params: Dict[str, str], page: int) -> Dict[str, Any]:
+        """
+        获取一页安全公告数据
+        
+        Args:
+            date_params: 日期范围参数
+            page: 页码，从1开始
+            
+        Returns:
+            API响应数据
+        """
+        params = {
+            **date_params,
+            'per_page': self.per_page,
+            'page': page
+        }
+        return self.make_api_request(
+            endpoint='cves',
+            params=params
+        )
+        
     def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         清理和标准化RedHat漏洞数据
@@ -131,18 +208,62 @@ class RedHatCollector(BaseVulnerabilityCollector):
                 'references': self._extract_references(data),
                 
                 # 提取修复信息
-                'fixes': self._extract_fixes(data),
-                
-                # 原始数据
-                'raw_data': data
+                'fixes': self._extract_fixes(data)
             }
             
+            # 按配置保留原始数据
+            self.attach_raw_data(cleaned, data)
+            
             return cleaned
             
         except Exception as e:
-            logger.error(f"清理RedHat数据失败: {str(e)}")
+            logger.error("清理RedHat数据失败: %s", e)
             return data
             
+    def to_vulnerability(self, data: Dict[str, Any]) -> Vulnerability:
+        """
+        将清理后的RedHat记录转换为通用漏洞模型
+        
+        修复记录本身不带链接，只有勘误编号的记录以勘误页面地址作为补丁，
+        与其他数据源一样保存为{'url', 'source'}形式。
+        
+        Args:
+            data: clean_data返回的数据
+            
+        Returns:
+            漏洞实体
+        """
+        metrics = data.get('metrics') or {}
+        return Vulnerability(
+            id=data['id'],
+            source='RedHat',
+            title=data.get('title'),
+            published_date=self._parse_date(data.get('public_date')),
+            last_modified_date=self._parse_date(data.get('modified_date')),
+            severity=data.get('severity'),
+            cvss_v3=self._to_cvss(metrics.get('cvss_v3')),
+            cvss_v2=self._to_cvss(metrics.get('cvss_v2')),
+            status=data.get('state') or 'unknown',
+            affected_packages=[
+                Package(
+                    name=pkg.get('name'),
+                    ecosystem='redhat',
+                    platform=pkg.get('product')
+                )
+                for pkg in data.get('affected_packages') or [] if pkg.get('name')
+            ],
+            references=[
+                Reference(url=ref['url'], source='RedHat', type=ref.get('type') or 'other')
+                for ref in data.get('references') or [] if ref.get('url')
+            ],
+            patches=[
+                {'url': f"https://access.redhat.com/errata/{fix['ticket']}", 'source': 'RedHat'}
+                for fix in data.get('fixes') or []
+                if str(fix.get('ticket') or '').startswith(_ERRATA_PREFIXES)
+            ],
+            raw_data=self._raw_data(data)
+        )
+        
     def _extract_cvss_v3(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """提取CVSS v3评分信息"""
         cvss3 = data.get('cvss3', {})
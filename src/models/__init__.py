@@ -8,8 +8,9 @@
 """
 
 from .entities import *
-from .nvd import NVDData
+from .nvd import NVDData, iter_nvd_items
 
 __all__ = [
-    'NVDData'
+    'NVDData',
+    'iter_nvd_items'
 ] 
\ No newline at end of file
@@ -8,37 +8,94 @@
 使用SQLAlchemy ORM。
 """
 
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
+import logging
+import orjson
+import pandas as pd
 from sqlalchemy import (
-    create_engine, Column, Integer, String, DateTime, 
-    Float, Boolean, ForeignKey, Table, JSON
+    create_engine, event, Column, Integer, String, DateTime, 
+    Float, Boolean, ForeignKey, Table, JSON, Index, insert, update, delete,
+    select, bindparam, func, literal_column, inspect, text
 )
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker, scoped_session, selectinload, raiseload
+
+from .entities import Vulnerability
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+def _json_dumps(value: Any) -> str:
+    """使用orjson序列化JSON列的值，允许与标准库json一样使用非字符串键"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+# SQLite连接参数：WAL日志模式下提交时不再每次fsync整个日志，
+# 临时表放在内存中，并增大页缓存和内存映射，适合批量写入
+_SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-131072'
+)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """为新建立的SQLite连接设置_SQLITE_PRAGMAS中的参数"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+# PostgreSQL上使用二进制存储的JSONB，读取时无需重新解析文本；其他数据库仍使用JSON
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
 # 多对多关系表
+# 按漏洞查找关联记录的复合索引同时包含关联记录ID，导出查询的关联子查询只读索引即可，
+# 也覆盖了只按漏洞ID的查找，漏洞ID列不再单独建索引
 vulnerability_package = Table(
     'vulnerability_package', Base.metadata,
     Column('vulnerability_id', Integer, ForeignKey('vulnerabilities.id')),
-    Column('package_id', Integer, ForeignKey('packages.id'))
+    Column('package_id', Integer, ForeignKey('packages.id'), index=True),
+    Index('ix_vulnerability_package_vuln_pkg', 'vulnerability_id', 'package_id')
 )
 
 vulnerability_reference = Table(
     'vulnerability_reference', Base.metadata,
     Column('vulnerability_id', Integer, ForeignKey('vulnerabilities.id')),
-    Column('reference_id', Integer, ForeignKey('references.id'))
+    Column('reference_id', Integer, ForeignKey('references.id'), index=True),
+    Index('ix_vulnerability_reference_vuln_ref', 'vulnerability_id', 'reference_id')
 )
 
 class DBVulnerability(Base):
     """漏洞数据库模型"""
     __tablename__ = 'vulnerabilities'
+    __table_args__ = (
+        # get_vulnerabilities按数据源过滤并按发布日期范围查询
+        Index('ix_vuln_source_pubdate', 'source', 'published_date'),
+        # 不限数据源时只按发布日期范围查询
+        Index('ix_vuln_pubdate', 'published_date'),
+        # 按数据源取最新修改时间
+        Index('ix_vuln_source_modified', 'source', 'last_modified_date'),
+        # 按数据源取最近写入时间（数据指纹）
+        Index('ix_vuln_source_updated', 'source', 'updated_at'),
+    )
     
     # 基本信息
     id = Column(Integer, primary_key=True)
-    vuln_id = Column(String(50), unique=True, nullable=False)  # CVE ID等
+    vuln_id = Column(String(50), unique=True, nullable=False, index=True)  # CVE ID等
     source = Column(String(50), nullable=False)
     title = Column(String(500))
     description = Column(String(5000))
@@ -47,11 +104,14 @@ class DBVulnerability(Base):
     published_date = Column(DateTime)
     last_modified_date = Column(DateTime)
     discovered_date = Column(DateTime)
+    # 记录最近一次写入（插入或更新任一字段）的时间，与数据源的修改时间无关
+    updated_at = Column(DateTime)
     
-    # 严重程度
-    severity = Column(String(50))
-    cvss_v3 = Column(JSON)
-    cvss_v2 = Column(JSON)
+    # 严重程度，CVSS v3基础评分从cvss_v3中单独取出，便于按评分范围查询
+    severity = Column(String(50), index=True)
+    base_score_v3 = Column(Float, index=True)
+    cvss_v3 = Column(JSONType)
+    cvss_v2 = Column(JSONType)
     
     # 状态信息
     status = Column(String(50))
@@ -69,10 +129,12 @@ class DBVulnerability(Base):
         back_populates='vulnerabilities'
     )
     
+    # 原始数据单独存放，只能通过Database.get_raw显式读取
+    raw = relationship('DBVulnerabilityRaw', uselist=False, lazy='raise')
+    
     # 其他信息
-    patches = Column(JSON)
-    notes = Column(JSON)
-    raw_data = Column(JSON)
+    patches = Column(JSONType)
+    notes = Column(JSONType)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -95,19 +157,31 @@ class DBVulnerability(Base):
             'notes': self.notes
         }
 
+class DBVulnerabilityRaw(Base):
+    """
+    漏洞原始数据数据库模型
+    
+    原始数据通常是整条数据源记录，体积远大于漏洞表的其他字段，
+    与漏洞表一对一拆分存放，列表查询时不再读取。
+    """
+    __tablename__ = 'vulnerability_raw'
+    
+    vuln_id = Column(String(50), ForeignKey('vulnerabilities.vuln_id'), primary_key=True)
+    raw_data = Column(JSONType)
+
 class DBPackage(Base):
     """软件包数据库模型"""
     __tablename__ = 'packages'
     
     id = Column(Integer, primary_key=True)
-    name = Column(String(200), nullable=False)
+    name = Column(String(200), nullable=False, index=True)
     ecosystem = Column(String(50))
     platform = Column(String(50))
     
     # 版本信息
-    versions = Column(JSON)
-    affected_versions = Column(JSON)
-    fixed_versions = Column(JSON)
+    versions = Column(JSONType)
+    affected_versions = Column(JSONType)
+    fixed_versions = Column(JSONType)
     
     # 关联信息
     vulnerabilities = relationship(
@@ -132,10 +206,10 @@ class DBReference(Base):
     __tablename__ = 'references'
     
     id = Column(Integer, primary_key=True)
-    url = Column(String(500), nullable=False)
+    url = Column(String(500), nullable=False, index=True)
     source = Column(String(100))
     type = Column(String(50))
-    tags = Column(JSON)
+    tags = Column(JSONType)
     
     # 关联信息
     vulnerabilities = relationship(
@@ -153,158 +227,735 @@ class DBReference(Base):
             'tags': self.tags
         }
 
+class DBSyncState(Base):
+    """数据源同步状态数据库模型"""
+    __tablename__ = 'sync_state'
+    
+    source = Column(String(50), primary_key=True)
+    # 已成功写入的记录中最新的修改时间，下次增量采集从这里开始
+    last_sync_at = Column(DateTime, nullable=False)
+
+# 读取漏洞时一次性预加载关联的包和参考链接，每个关系只需一次IN查询；
+# 其余关系禁止隐式懒加载，避免to_dict中逐行触发查询
+_VULN_LOAD_OPTIONS = (
+    selectinload(DBVulnerability.affected_packages),
+    selectinload(DBVulnerability.references),
+    raiseload('*')
+)
+
+# 常用查询语句只构造一次，参数通过bindparam传入，
+# 每次调用不再重新构建查询对象，也总能命中引擎的编译缓存
+_SELECT_VULNERABILITY = (
+    select(DBVulnerability)
+    .options(*_VULN_LOAD_OPTIONS)
+    .where(DBVulnerability.vuln_id == bindparam('vuln_id'))
+    .limit(1)
+)
+
+_SELECT_PACKAGE_ID = (
+    select(DBPackage.id)
+    .where(DBPackage.name == bindparam('package_name'))
+    .limit(1)
+)
+
+_SELECT_PACKAGE_VULNERABILITIES = (
+    select(DBVulnerability)
+    .options(*_VULN_LOAD_OPTIONS)
+    .join(vulnerability_package, vulnerability_package.c.vulnerability_id == DBVulnerability.id)
+    .where(vulnerability_package.c.package_id == bindparam('package_id'))
+)
+
+# 列式查询读取的漏洞标量字段
+_FRAME_COLUMNS = (
+    DBVulnerability.vuln_id.label('id'),
+    DBVulnerability.source,
+    DBVulnerability.published_date,
+    DBVulnerability.last_modified_date,
+    DBVulnerability.severity,
+    DBVulnerability.status,
+    DBVulnerability.base_score_v3,
+    DBVulnerability.cvss_v2
+)
+
+# 驱动层多行INSERT使用的位置参数占位符，其他参数风格回退到executemany
+_POSITIONAL_PLACEHOLDERS = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+
+# 单条多行INSERT语句的绑定参数上限，低于旧版SQLite的999个限制
+_MAX_BOUND_PARAMS = 900
+
+# 影响分析使用的漏洞评分：有CVSS v3评分时取v3，否则取v2
+_IMPACT_SCORE = func.coalesce(
+    DBVulnerability.base_score_v3,
+    DBVulnerability.cvss_v2['base_score'].as_float()
+)
+
+# 各数据库URL的数据版本号，每次提交漏洞写入后递增；
+# 同一进程内连接同一数据库的Database实例共享，读缓存据此判断数据是否已变更
+_DATA_VERSIONS: Dict[str, int] = defaultdict(int)
+
+# 漏洞列表查询的过滤条件，值通过同名的bindparam传入
+_FILTER_CLAUSES = {
+    'source': DBVulnerability.source == bindparam('source'),
+    'start_date': DBVulnerability.published_date >= bindparam('start_date'),
+    'end_date': DBVulnerability.published_date <= bindparam('end_date'),
+    'min_score': DBVulnerability.base_score_v3 >= bindparam('min_score'),
+    'severity': DBVulnerability.severity == bindparam('severity')
+}
+
+@lru_cache(maxsize=None)
+def _select_vulnerabilities(filters: Tuple[str, ...],
+                            columns_only: bool = False,
+                            order_by_id: bool = False):
+    """
+    按过滤条件组合构造并缓存漏洞列表查询语句
+    
+    Args:
+        filters: 启用的过滤条件名，取值为_FILTER_CLAUSES的键
+        columns_only: 是否只查询_FRAME_COLUMNS中的列
+        order_by_id: 是否按漏洞ID排序
+        
+    Returns:
+        带有对应bindparam的查询语句
+    """
+    if columns_only:
+        stmt = select(*_FRAME_COLUMNS)
+    else:
+        stmt = select(DBVulnerability).options(*_VULN_LOAD_OPTIONS)
+    for name in filters:
+        stmt = stmt.where(_FILTER_CLAUSES[name])
+    if order_by_id:
+        stmt = stmt.order_by(DBVulnerability.vuln_id)
+    return stmt
+
+@lru_cache(maxsize=None)
+def _upsert_vulnerabilities(dialect_name: str):
+    """
+    构造按vuln_id插入或更新漏洞记录的语句
+    
+    已存在的记录更新除vuln_id和source以外的字段，与先查询再分别INSERT/UPDATE的结果一致。
+    
+    Args:
+        dialect_name: 数据库方言名称
+        
+    Returns:
+        INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE语句，方言不支持时返回None
+    """
+    table = DBVulnerability.__table__
+    columns = [c.name for c in table.columns if c.name not in ('id', 'vuln_id', 'source')]
+    if dialect_name in ('postgresql', 'sqlite'):
+        stmt = (pg_insert if dialect_name == 'postgresql' else sqlite_insert)(table)
+        return stmt.on_conflict_do_update(
+            index_elements=['vuln_id'],
+            set_={name: stmt.excluded[name] for name in columns}
+        )
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = mysql_insert(table)
+        return stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in columns})
+    return None
+
+# 各数据库中把多行聚合为JSON数组、由键值对构造JSON对象的函数名
+_JSON_FUNCTIONS = {
+    'sqlite': ('json_group_array', 'json_object'),
+    'postgresql': ('json_agg', 'json_build_object'),
+    'mysql': ('json_arrayagg', 'json_object'),
+    'mariadb': ('json_arrayagg', 'json_object')
+}
+
+# 导出数据中漏洞的标量字段
+_EXPORT_COLUMNS = (
+    DBVulnerability.vuln_id,
+    DBVulnerability.source,
+    DBVulnerability.title,
+    DBVulnerability.description,
+    DBVulnerability.published_date,
+    DBVulnerability.last_modified_date,
+    DBVulnerability.severity,
+    DBVulnerability.status,
+    DBVulnerability.cvss_v3,
+    DBVulnerability.cvss_v2
+)
+
+# 导出数据中受影响包和参考链接的字段
+_EXPORT_PACKAGE_FIELDS = ('name', 'ecosystem', 'platform', 'affected_versions', 'fixed_versions')
+_EXPORT_REFERENCE_FIELDS = ('url', 'source', 'type')
+
+def _json_array_subquery(dialect_name: str, model, secondary: Table, key: str, field_names: Tuple[str, ...]):
+    """
+    构造把单个漏洞关联的记录聚合为JSON数组的关联子查询
+    
+    Args:
+        dialect_name: 数据库方言名称
+        model: 关联记录的模型类
+        secondary: 多对多关系表
+        key: 关系表中指向关联记录的外键列名
+        field_names: 数组元素中包含的字段名
+        
+    Returns:
+        返回JSON数组的标量子查询
+    """
+    array_agg, json_object = _JSON_FUNCTIONS[dialect_name]
+    pairs = []
+    for name in field_names:
+        column = getattr(model, name)
+        # SQLite的JSON列按文本存储，需要先转换为JSON值，否则会作为字符串嵌入
+        if dialect_name == 'sqlite' and isinstance(column.type, JSON):
+            column = func.json(column)
+        pairs += [literal_column(f"'{name}'"), column]
+        
+    return (
+        select(getattr(func, array_agg)(getattr(func, json_object)(*pairs), type_=JSON))
+        .select_from(secondary.join(model, secondary.c[key] == model.id))
+        .where(secondary.c.vulnerability_id == DBVulnerability.id)
+        .scalar_subquery()
+    )
+
+@lru_cache(maxsize=None)
+def _select_export_rows(dialect_name: str, filters: Tuple[str, ...]):
+    """
+    构造导出数据查询语句
+    
+    漏洞的标量字段与聚合为JSON数组的受影响包和参考链接在一条查询中返回，
+    不构造ORM对象，也不再为关系单独查询。
+    
+    Args:
+        dialect_name: 数据库方言名称
+        filters: 启用的过滤条件名，取值为_FILTER_CLAUSES的键
+        
+    Returns:
+        查询语句，方言不支持JSON聚合时返回None
+    """
+    if dialect_name not in _JSON_FUNCTIONS:
+        return None
+        
+    stmt = select(
+        *_EXPORT_COLUMNS,
+        _json_array_subquery(dialect_name, DBPackage, vulnerability_package,
+                             'package_id', _EXPORT_PACKAGE_FIELDS),
+        _json_array_subquery(dialect_name, DBReference, vulnerability_reference,
+                             'reference_id', _EXPORT_REFERENCE_FIELDS)
+    )
+    for name in filters:
+        stmt = stmt.where(_FILTER_CLAUSES[name])
+    return stmt
+
+def _export_record(vuln_id: str, source: str, title: Optional[str], description: Optional[str],
+                   published_date: Optional[datetime], last_modified_date: Optional[datetime],
+                   severity: Optional[str], status: Optional[str],
+                   cvss_v3: Optional[Dict[str, Any]], cvss_v2: Optional[Dict[str, Any]],
+                   packages: Optional[List[Dict[str, Any]]],
+                   references: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """由一行导出查询结果构造导出数据字典"""
+    item = {
+        'id': vuln_id,
+        'source': source,
+        'title': title,
+        'description': description,
+        'published_date': published_date.isoformat() if published_date else None,
+        'last_modified_date': last_modified_date.isoformat() if last_modified_date else None,
+        'severity': severity,
+        'status': status
+    }
+    if cvss_v3:
+        item['cvss_v3_score'] = cvss_v3.get('base_score')
+        item['cvss_v3_vector'] = cvss_v3.get('vector_string')
+    if cvss_v2:
+        item['cvss_v2_score'] = cvss_v2.get('base_score')
+        item['cvss_v2_vector'] = cvss_v2.get('vector_string')
+    # 部分数据库对空集合的JSON聚合返回NULL
+    item['affected_packages'] = packages or []
+    item['references'] = references or []
+    return item
+
+def _backfill_base_score_v3(conn) -> None:
+    """从cvss_v3中取出CVSS v3基础评分，回填到新增的base_score_v3列"""
+    table = DBVulnerability.__table__
+    rows = conn.execute(select(table.c.id, table.c.cvss_v3).where(table.c.cvss_v3.is_not(None)))
+    params = [
+        {'b_id': row_id, 'b_score': cvss['base_score']}
+        for row_id, cvss in rows
+        if isinstance(cvss, dict) and cvss.get('base_score') is not None
+    ]
+    if params:
+        conn.execute(
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(base_score_v3=bindparam('b_score')),
+            params
+        )
+
+# 首版表结构之后新增的列，create_all不会修改已存在的表，由create_tables补加
+_ADDED_COLUMNS = (
+    ('vulnerabilities', 'base_score_v3'),
+    ('vulnerabilities', 'updated_at'),
+)
+
+# 新增列的回填函数，在加列的同一个事务中执行
+_COLUMN_BACKFILLS = {
+    ('vulnerabilities', 'base_score_v3'): _backfill_base_score_v3
+}
+
 class Database:
     """数据库管理类"""
     
-    def __init__(self, url: str):
+    def __init__(self, url: str, **engine_options: Any):
         """
         初始化数据库连接
         
         Args:
             url: 数据库连接URL
+            **engine_options: 传给create_engine的其他参数，如pool_size、max_overflow等
         """
-        self.engine = create_engine(url)
-        self.Session = sessionmaker(bind=self.engine)
+        # 从连接池取出连接前先检测连接是否可用
+        engine_options.setdefault('pool_pre_ping', True)
+        # JSON列使用orjson代替标准库json进行序列化和反序列化
+        engine_options.setdefault('json_serializer', _json_dumps)
+        engine_options.setdefault('json_deserializer', orjson.loads)
+        self.engine = create_engine(url, **engine_options)
+        self._url_key = str(url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', _set_sqlite_pragmas)
+        
+        # 线程内复用同一个会话，不必每次调用都重新创建
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        
+    @contextmanager
+    def session_scope(self, session=None):
+        """
+        提供一个事务范围的会话
+        
+        正常退出时提交事务，发生异常时回滚。
+        
+        Args:
+            session: 调用方已有的会话，传入时直接复用，提交和关闭由调用方负责
+            
+        Yields:
+            数据库会话
+        """
+        if session is not None:
+            yield session
+            return
+            
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.Session.remove()
+        
+    @property
+    def data_version(self) -> int:
+        """当前数据库的数据版本号，漏洞数据每次写入提交后递增"""
+        return _DATA_VERSIONS[self._url_key]
+        
+    def _bump_data_version(self) -> None:
+        """标记漏洞数据已变更"""
+        _DATA_VERSIONS[self._url_key] += 1
         
     def create_tables(self):
-        """创建所有表"""
+        """
+        创建所有表
+        
+        已存在的表不会被create_all修改，之后新增的列和索引在这里逐个补建。
+        索引在补加列之后创建，仍缺少所需列的索引（如列未能补加）跳过并记录警告。
+        """
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for index in table.indexes:
+                missing = [column.name for column in index.columns if column.name not in existing]
+                if missing:
+                    logger.warning("跳过索引 %s：表 %s 缺少列 %s", index.name, table.name, missing)
+                    continue
+                index.create(self.engine, checkfirst=True)
+        
+    def _add_missing_columns(self) -> None:
+        """
+        为旧版本创建的表补加之后新增的列，并回填由已有数据派生的列
         
+        加列和回填在同一个事务中完成，中途失败时下次启动会重新执行。
+        """
+        inspector = inspect(self.engine)
+        for table_name, column_name in _ADDED_COLUMNS:
+            existing = {column['name'] for column in inspector.get_columns(table_name)}
+            if column_name in existing:
+                continue
+            column = Base.metadata.tables[table_name].c[column_name]
+            column_type = column.type.compile(dialect=self.engine.dialect)
+            preparer = self.engine.dialect.identifier_preparer
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE {preparer.quote(table_name)} '
+                    f'ADD COLUMN {preparer.quote(column_name)} {column_type}'
+                ))
+                backfill = _COLUMN_BACKFILLS.get((table_name, column_name))
+                if backfill is not None:
+                    backfill(conn)
+    
     def drop_tables(self):
         """删除所有表"""
         Base.metadata.drop_all(self.engine)
         
-    def add_vulnerability(self, vuln: 'Vulnerability') -> None:
+    def _resolve_records(self, session, model, key: str, items: Dict[str, Any], to_row) -> Dict[str, Any]:
         """
-        添加漏洞数据
+        按唯一键批量获取或创建一批关联记录
+        
+        已存在的记录通过一次IN查询取出主键；缺失的记录以字段字典的形式
+        通过一次批量INSERT写入，不逐个构造ORM对象。
         
         Args:
-            vuln: 漏洞实例
+            session: 数据库会话
+            model: 数据库模型类
+            key: 唯一键字段名
+            items: 键到实体实例的映射
+            to_row: 将实体实例转换为字段字典的函数
+            
+        Returns:
+            键到数据库记录主键的映射
         """
-        session = self.Session()
-        try:
-            # 检查是否已存在
-            existing = session.query(DBVulnerability).filter_by(vuln_id=vuln.id).first()
-            if existing:
-                return self.update_vulnerability(vuln)
-            
-            # 创建数据库记录
-            db_vuln = DBVulnerability(
-                vuln_id=vuln.id,
-                source=vuln.source,
-                title=vuln.title,
-                description=vuln.description,
-                published_date=vuln.published_date,
-                last_modified_date=vuln.last_modified_date,
-                discovered_date=vuln.discovered_date,
-                severity=vuln.severity,
-                cvss_v3=vars(vuln.cvss_v3) if vuln.cvss_v3 else None,
-                cvss_v2=vars(vuln.cvss_v2) if vuln.cvss_v2 else None,
-                status=vuln.status,
-                scope=vuln.scope,
-                patches=vuln.patches,
-                notes=vuln.notes,
-                raw_data=vuln.raw_data
-            )
+        if not items:
+            return {}
+            
+        column = getattr(model, key)
+        resolved = {}
+        for value, record_id in session.query(column, model.id).filter(column.in_(items)).order_by(model.id):
+            resolved.setdefault(value, record_id)
             
-            # 添加受影响的包
+        missing = [k for k in items if k not in resolved]
+        if missing:
+            session.execute(insert(model.__table__), [to_row(items[k]) for k in missing])
+            for value, record_id in session.query(column, model.id).filter(column.in_(missing)).order_by(model.id):
+                resolved.setdefault(value, record_id)
+                
+        return resolved
+        
+    def _resolve_batch(self, session, batch: List['Vulnerability']):
+        """
+        解析一批漏洞涉及的全部软件包和参考链接记录
+        
+        Args:
+            session: 数据库会话
+            batch: 漏洞实例列表
+            
+        Returns:
+            (包名到包记录主键的映射, URL到参考链接记录主键的映射)
+        """
+        packages = {}
+        references = {}
+        for vuln in batch:
             for pkg in vuln.affected_packages:
-                db_pkg = session.query(DBPackage).filter_by(name=pkg.name).first()
-                if not db_pkg:
-                    db_pkg = DBPackage(
-                        name=pkg.name,
-                        ecosystem=pkg.ecosystem,
-                        platform=pkg.platform,
-                        versions=[vars(v) for v in pkg.versions],
-                        affected_versions=pkg.affected_versions,
-                        fixed_versions=pkg.fixed_versions
-                    )
-                db_vuln.affected_packages.append(db_pkg)
-            
-            # 添加参考链接
+                packages.setdefault(pkg.name, pkg)
             for ref in vuln.references:
-                db_ref = session.query(DBReference).filter_by(url=ref.url).first()
-                if not db_ref:
-                    db_ref = DBReference(
-                        url=ref.url,
-                        source=ref.source,
-                        type=ref.type,
-                        tags=ref.tags
-                    )
-                db_vuln.references.append(db_ref)
-            
-            session.add(db_vuln)
-            session.commit()
-            
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+                references.setdefault(ref.url, ref)
+                
+        db_packages = self._resolve_records(
+            session, DBPackage, 'name', packages,
+            lambda pkg: {
+                'name': pkg.name,
+                'ecosystem': pkg.ecosystem,
+                'platform': pkg.platform,
+                'versions': [asdict(v) for v in pkg.versions],
+                'affected_versions': pkg.affected_versions,
+                'fixed_versions': pkg.fixed_versions
+            }
+        )
+        db_references = self._resolve_records(
+            session, DBReference, 'url', references,
+            lambda ref: {
+                'url': ref.url,
+                'source': ref.source,
+                'type': ref.type,
+                'tags': ref.tags
+            }
+        )
+        return db_packages, db_references
+        
+    def _vulnerability_row(self, vuln: 'Vulnerability') -> Dict[str, Any]:
+        """
+        将漏洞实例转换为漏洞表的字段字典（不含vuln_id和source）
+        
+        Args:
+            vuln: 漏洞实例
             
-    def update_vulnerability(self, vuln: 'Vulnerability') -> None:
+        Returns:
+            字段名到值的映射
         """
-        更新漏洞数据
+        return {
+            'title': vuln.title,
+            'description': vuln.description,
+            'published_date': vuln.published_date,
+            'last_modified_date': vuln.last_modified_date,
+            'discovered_date': vuln.discovered_date,
+            'severity': vuln.severity,
+            'base_score_v3': vuln.cvss_v3.base_score if vuln.cvss_v3 else None,
+            'cvss_v3': vuln.cvss_v3.to_dict() if vuln.cvss_v3 else None,
+            'cvss_v2': vuln.cvss_v2.to_dict() if vuln.cvss_v2 else None,
+            'status': vuln.status,
+            'scope': vuln.scope,
+            'patches': vuln.patches,
+            'notes': vuln.notes,
+            'updated_at': datetime.now()
+        }
+        
+    def add_vulnerability(self, vuln: 'Vulnerability', session=None) -> None:
+        """
+        添加漏洞数据，已存在时更新
         
         Args:
             vuln: 漏洞实例
+            session: 调用方已有的会话（可选），批量写入时可在同一事务中多次调用
         """
-        session = self.Session()
-        try:
-            db_vuln = session.query(DBVulnerability).filter_by(vuln_id=vuln.id).first()
-            if not db_vuln:
-                return self.add_vulnerability(vuln)
-            
-            # 更新基本信息
-            db_vuln.title = vuln.title
-            db_vuln.description = vuln.description
-            db_vuln.published_date = vuln.published_date
-            db_vuln.last_modified_date = vuln.last_modified_date
-            db_vuln.discovered_date = vuln.discovered_date
-            db_vuln.severity = vuln.severity
-            db_vuln.cvss_v3 = vars(vuln.cvss_v3) if vuln.cvss_v3 else None
-            db_vuln.cvss_v2 = vars(vuln.cvss_v2) if vuln.cvss_v2 else None
-            db_vuln.status = vuln.status
-            db_vuln.scope = vuln.scope
-            db_vuln.patches = vuln.patches
-            db_vuln.notes = vuln.notes
-            db_vuln.raw_data = vuln.raw_data
-            
-            # 更新受影响的包
-            db_vuln.affected_packages = []
-            for pkg in vuln.affected_packages:
-                db_pkg = session.query(DBPackage).filter_by(name=pkg.name).first()
-                if not db_pkg:
-                    db_pkg = DBPackage(
-                        name=pkg.name,
-                        ecosystem=pkg.ecosystem,
-                        platform=pkg.platform,
-                        versions=[vars(v) for v in pkg.versions],
-                        affected_versions=pkg.affected_versions,
-                        fixed_versions=pkg.fixed_versions
-                    )
-                db_vuln.affected_packages.append(db_pkg)
-            
-            # 更新参考链接
-            db_vuln.references = []
-            for ref in vuln.references:
-                db_ref = session.query(DBReference).filter_by(url=ref.url).first()
-                if not db_ref:
-                    db_ref = DBReference(
-                        url=ref.url,
-                        source=ref.source,
-                        type=ref.type,
-                        tags=ref.tags
-                    )
-                db_vuln.references.append(db_ref)
+        with self.session_scope(session) as session:
+            self._stage_batch(session, [vuln])
+        self._bump_data_version()
             
-            session.commit()
+    def _write_batch(self, session, batch: List['Vulnerability']) -> int:
+        """
+        在一个事务中写入一批漏洞数据
+        
+        Args:
+            session: 数据库会话
+            batch: 漏洞实例列表
             
+        Returns:
+            写入的漏洞数量
+        """
+        self._stage_batch(session, batch)
+        session.commit()
+        self._bump_data_version()
+        # 释放已提交批次的对象，避免会话的标识映射随批次增长
+        session.expunge_all()
+        return len(batch)
+        
+    def _insert_or_update(self, session, batch: List['Vulnerability']):
+        """
+        先查询已存在的记录，再分别批量INSERT和UPDATE一批漏洞记录
+        
+        用于不支持INSERT ... ON CONFLICT的数据库。
+        
+        Args:
+            session: 数据库会话
+            batch: 漏洞实例列表
+            
+        Returns:
+            (漏洞ID到记录主键的映射, 被更新记录的主键列表)
+        """
+        # 一次查询出批次内已存在记录的主键
+        vuln_ids = dict(
+            session.query(DBVulnerability.vuln_id, DBVulnerability.id).filter(
+                DBVulnerability.vuln_id.in_({vuln.id for vuln in batch})
+            )
+        )
+        
+        new_rows = []
+        updated_rows = []
+        for vuln in batch:
+            row = self._vulnerability_row(vuln)
+            db_id = vuln_ids.get(vuln.id)
+            if db_id is None:
+                row['vuln_id'] = vuln.id
+                row['source'] = vuln.source
+                new_rows.append(row)
+            else:
+                row['id'] = db_id
+                updated_rows.append(row)
+                
+        if new_rows:
+            session.execute(insert(DBVulnerability), new_rows)
+            vuln_ids.update(
+                session.query(DBVulnerability.vuln_id, DBVulnerability.id).filter(
+                    DBVulnerability.vuln_id.in_([row['vuln_id'] for row in new_rows])
+                )
+            )
+        if updated_rows:
+            # 按主键批量更新
+            session.execute(update(DBVulnerability), updated_rows)
+            
+        return vuln_ids, [row['id'] for row in updated_rows]
+        
+    def _stage_batch(self, session, batch: List['Vulnerability']) -> None:
+        """
+        在会话的当前事务中添加或更新一批漏洞数据，不提交事务
+        
+        漏洞记录和关联表记录均以字段字典的形式批量INSERT/UPDATE，
+        每张表只需一次executemany，不逐条构造ORM对象。
+        单条写入也走这里，关联表记录同样只需一次INSERT。
+        
+        Args:
+            session: 数据库会话
+            batch: 漏洞实例列表
+        """
+        packages, references = self._resolve_batch(session, batch)
+        
+        upsert = _upsert_vulnerabilities(session.get_bind().dialect.name)
+        if upsert is not None:
+            # 一条INSERT ... ON CONFLICT语句完成插入或更新，不必先查询哪些记录已存在
+            session.execute(upsert, [
+                {**self._vulnerability_row(vuln), 'vuln_id': vuln.id, 'source': vuln.source}
+                for vuln in batch
+            ])
+            vuln_ids = dict(
+                session.query(DBVulnerability.vuln_id, DBVulnerability.id).filter(
+                    DBVulnerability.vuln_id.in_([vuln.id for vuln in batch])
+                )
+            )
+            stale_ids = list(vuln_ids.values())
+        else:
+            vuln_ids, stale_ids = self._insert_or_update(session, batch)
+            
+        # 清除已有漏洞的关联记录后重新写入
+        if stale_ids:
+            session.execute(delete(vulnerability_package).where(
+                vulnerability_package.c.vulnerability_id.in_(stale_ids)
+            ))
+            session.execute(delete(vulnerability_reference).where(
+                vulnerability_reference.c.vulnerability_id.in_(stale_ids)
+            ))
+            
+        # 关联表记录去重后一次写入
+        package_links = list(dict.fromkeys(
+            (vuln_ids[vuln.id], packages[pkg.name])
+            for vuln in batch for pkg in vuln.affected_packages
+        ))
+        reference_links = list(dict.fromkeys(
+            (vuln_ids[vuln.id], references[ref.url])
+            for vuln in batch for ref in vuln.references
+        ))
+        # 原始数据整批替换
+        session.execute(delete(DBVulnerabilityRaw).where(
+            DBVulnerabilityRaw.vuln_id.in_([vuln.id for vuln in batch])
+        ))
+        raw_rows = [
+            {'vuln_id': vuln.id, 'raw_data': vuln.raw_data}
+            for vuln in batch if vuln.raw_data
+        ]
+        if raw_rows:
+            session.execute(insert(DBVulnerabilityRaw), raw_rows)
+            
+        if package_links:
+            self._bulk_insert(session, vulnerability_package, package_links)
+        if reference_links:
+            self._bulk_insert(session, vulnerability_reference, reference_links)
+            
+    def _bulk_insert(self, session, table: Table, rows: List[Tuple]) -> None:
+        """
+        以多行VALUES语句批量写入关联表
+        
+        每条INSERT写入多行，绑定参数总数不超过_MAX_BOUND_PARAMS；
+        语句直接交给数据库驱动执行，不经过SQLAlchemy逐个参数的类型处理，
+        因此只用于各列都是整数等无需类型转换的表。
+        驱动不使用位置参数时回退到executemany。
+        
+        Args:
+            session: 数据库会话
+            table: 目标表
+            rows: 按表的列顺序排列的行元组列表
+        """
+        columns = [column.name for column in table.columns]
+        connection = session.connection()
+        dialect = connection.dialect
+        
+        placeholder = _POSITIONAL_PLACEHOLDERS.get(dialect.paramstyle)
+        if placeholder is None:
+            session.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+            return
+            
+        quote = dialect.identifier_preparer.quote
+        prefix = f"INSERT INTO {quote(table.name)} ({', '.join(map(quote, columns))}) VALUES "
+        row_sql = '(' + ', '.join([placeholder] * len(columns)) + ')'
+        chunk_size = max(1, _MAX_BOUND_PARAMS // len(columns))
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            connection.exec_driver_sql(
+                prefix + ', '.join([row_sql] * len(chunk)),
+                tuple(value for row in chunk for value in row)
+            )
+            
+    def add_vulnerabilities(self,
+                          vulns: Iterable['Vulnerability'],
+                          batch_size: int = 10000,
+                          max_retries: int = 3,
+                          session=None) -> int:
+        """
+        批量添加或更新漏洞数据
+        
+        每个批次在同一个会话和事务中写入，避免逐条开启会话和提交事务。
+        批次因锁冲突等临时错误失败时，会被拆分为两半重新排队写入，
+        已成功提交的批次不受影响。
+        输入按批次逐步读取，传入生成器时内存中只保留当前批次的漏洞实例。
+        
+        Args:
+            vulns: 漏洞实例序列，可以是生成器
+            batch_size: 每个事务写入的最大记录数
+            max_retries: 单个批次的最大重试次数
+            session: 调用方已有的会话（可选），传入时不在此处关闭
+            
+        Returns:
+            写入的漏洞数量（按漏洞ID去重后）
+            
+        Raises:
+            OperationalError: 批次重试次数耗尽后仍然失败时抛出
+        """
+        vulns = iter(vulns)
+        pending = deque()
+        written_ids = set()
+        
+        # 所有批次复用同一个会话，每个批次单独提交事务
+        owns_session = session is None
+        if owns_session:
+            session = self.Session()
+        try:
+            while True:
+                if not pending:
+                    # 按需读取下一批；同一漏洞重复出现时只写入最后一次的数据，
+                    # 跨批次重复时后写入的批次覆盖先前的数据，结果与逐条写入一致
+                    batch = list({vuln.id: vuln for vuln in islice(vulns, batch_size)}.values())
+                    if not batch:
+                        break
+                    pending.append((batch, 0))
+                    
+                batch, attempt = pending.popleft()
+                try:
+                    self._write_batch(session, batch)
+                    written_ids.update(vuln.id for vuln in batch)
+                except OperationalError:
+                    session.rollback()
+                    if attempt >= max_retries:
+                        raise
+                        
+                    # 拆分失败的批次，缩小冲突范围后优先重试
+                    if len(batch) > 1:
+                        mid = len(batch) // 2
+                        pending.appendleft((batch[mid:], attempt + 1))
+                        pending.appendleft((batch[:mid], attempt + 1))
+                    else:
+                        pending.appendleft((batch, attempt + 1))
+                        
         except Exception as e:
             session.rollback()
             raise e
         finally:
-            session.close()
+            if owns_session:
+                self.Session.remove()
+            
+        return len(written_ids)
+            
+    def update_vulnerability(self, vuln: 'Vulnerability', session=None) -> None:
+        """
+        更新漏洞数据，不存在时添加
+        
+        Args:
+            vuln: 漏洞实例
+            session: 调用方已有的会话（可选）
+        """
+        with self.session_scope(session) as session:
+            self._stage_batch(session, [vuln])
+        self._bump_data_version()
             
     def get_vulnerability(self, vuln_id: str) -> Optional['Vulnerability']:
         """
@@ -316,21 +967,22 @@ class Database:
         Returns:
             漏洞实例，如果不存在则返回None
         """
-        session = self.Session()
-        try:
-            db_vuln = session.query(DBVulnerability).filter_by(vuln_id=vuln_id).first()
+        with self.session_scope() as session:
+            db_vuln = session.execute(
+                _SELECT_VULNERABILITY, {'vuln_id': vuln_id}
+            ).scalars().first()
             if not db_vuln:
                 return None
                 
             return Vulnerability.from_dict(db_vuln.to_dict())
             
-        finally:
-            session.close()
-            
     def get_vulnerabilities(self, 
                           source: Optional[str] = None,
                           start_date: Optional[datetime] = None,
-                          end_date: Optional[datetime] = None) -> List['Vulnerability']:
+                          end_date: Optional[datetime] = None,
+                          min_score: Optional[float] = None,
+                          severity: Optional[str] = None,
+                          order_by_id: bool = False) -> List['Vulnerability']:
         """
         获取漏洞数据列表
         
@@ -338,26 +990,184 @@ class Database:
             source: 数据源
             start_date: 开始日期
             end_date: 结束日期
+            min_score: CVSS v3基础评分下限（包含）
+            severity: 严重程度
+            order_by_id: 是否按漏洞ID排序返回
             
         Returns:
             漏洞实例列表
         """
-        session = self.Session()
-        try:
-            query = session.query(DBVulnerability)
-            
-            if source:
-                query = query.filter_by(source=source)
-            if start_date:
-                query = query.filter(DBVulnerability.published_date >= start_date)
-            if end_date:
-                query = query.filter(DBVulnerability.published_date <= end_date)
-                
-            return [Vulnerability.from_dict(v.to_dict()) for v in query.all()]
+        params = self._filter_params(source, start_date, end_date, min_score, severity)
+        with self.session_scope() as session:
+            stmt = _select_vulnerabilities(tuple(params), order_by_id=order_by_id)
+            return Vulnerability.from_dicts(
+                v.to_dict() for v in session.execute(stmt, params).scalars()
+            )
+            
+    def iter_vulnerabilities(self,
+                           source: Optional[str] = None,
+                           start_date: Optional[datetime] = None,
+                           end_date: Optional[datetime] = None,
+                           min_score: Optional[float] = None,
+                           severity: Optional[str] = None,
+                           batch_size: int = 1000) -> Iterator['Vulnerability']:
+        """
+        逐条产出漏洞数据
+        
+        查询结果按批次从数据库读取并转换为漏洞实例，会话的标识映射只弱引用
+        未修改的对象，内存中只保留当前批次，适合只需遍历一次的统计场景。
+        迭代期间使用独立的会话，不影响同一线程中的其他数据库调用。
+        
+        Args:
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
+            min_score: CVSS v3基础评分下限（包含）
+            severity: 严重程度
+            batch_size: 每批读取的记录数
             
+        Yields:
+            漏洞实例
+        """
+        params = self._filter_params(source, start_date, end_date, min_score, severity)
+        stmt = _select_vulnerabilities(tuple(params)).execution_options(yield_per=batch_size)
+        session = self.Session.session_factory()
+        try:
+            for partition in session.execute(stmt, params).scalars().partitions():
+                yield from Vulnerability.from_dicts(v.to_dict() for v in partition)
         finally:
             session.close()
             
+    def get_vulnerabilities_frame(self,
+                                source: Optional[str] = None,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None,
+                                min_score: Optional[float] = None,
+                                severity: Optional[str] = None) -> pd.DataFrame:
+        """
+        以列式DataFrame获取漏洞的标量字段
+        
+        只查询所需的列，不构造ORM对象和漏洞实例，每个字段保存为一列，
+        适合统计分析等只需要按日期、严重程度和评分做向量化过滤的场景。
+        
+        Args:
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
+            min_score: CVSS v3基础评分下限（包含）
+            severity: 严重程度
+            
+        Returns:
+            列为id、source、published_date、last_modified_date、severity、
+            status、cvss_v3_score、cvss_v2_score的DataFrame，每行一个漏洞
+        """
+        params = self._filter_params(source, start_date, end_date, min_score, severity)
+        with self.session_scope() as session:
+            stmt = _select_vulnerabilities(tuple(params), columns_only=True)
+            rows = session.execute(stmt, params).all()
+            
+        ids, sources, published, modified, severities, statuses, v3_scores, cvss_v2 = (
+            zip(*rows) if rows else ((),) * len(_FRAME_COLUMNS)
+        )
+        return pd.DataFrame({
+            'id': pd.Series(ids, dtype=object),
+            'source': pd.Categorical(sources),
+            'published_date': pd.to_datetime(pd.Series(published, dtype=object)),
+            'last_modified_date': pd.to_datetime(pd.Series(modified, dtype=object)),
+            'severity': pd.Categorical(severities),
+            'status': pd.Categorical(statuses),
+            'cvss_v3_score': pd.Series(v3_scores, dtype='float32'),
+            'cvss_v2_score': pd.Series(
+                [c.get('base_score') if c else None for c in cvss_v2], dtype='float32'
+            )
+        })
+        
+    def fingerprint(self,
+                    source: Optional[str] = None,
+                    start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None) -> Tuple[int, Optional[datetime]]:
+        """
+        计算查询范围内漏洞数据的指纹
+        
+        由记录数和最近一次写入时间组成，只需一次聚合查询，
+        用于判断自上次读取后范围内的数据是否有新增或更新。
+        写入时间在每次插入或更新时刷新，清洗等原地修改同样会改变指纹，
+        其他连接（包括其他进程）的写入也能据此发现。
+        
+        Args:
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (记录数, 最近写入时间)
+        """
+        params = self._filter_params(source, start_date, end_date)
+        stmt = select(func.count(), func.max(DBVulnerability.updated_at))
+        for name in params:
+            stmt = stmt.where(_FILTER_CLAUSES[name])
+        with self.session_scope() as session:
+            count, updated_at = session.execute(stmt, params).one()
+        return count, updated_at
+        
+    def get_vulnerabilities_prepared(self,
+                                   source: Optional[str] = None,
+                                   start_date: Optional[datetime] = None,
+                                   end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        获取用于导出的漏洞数据
+        
+        受影响包和参考链接在数据库中聚合为JSON数组，与漏洞字段一起由一条查询返回，
+        JSON列由引擎的反序列化函数（orjson）直接解析，不构造ORM对象和漏洞实例。
+        数据库不支持JSON聚合时回退为ORM查询。
+        
+        Args:
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            导出数据字典列表，受影响包包含name、ecosystem、platform、affected_versions、
+            fixed_versions，参考链接包含url、source、type
+        """
+        params = self._filter_params(source, start_date, end_date)
+        with self.session_scope() as session:
+            stmt = _select_export_rows(session.get_bind().dialect.name, tuple(params))
+            if stmt is not None:
+                return [_export_record(*row) for row in session.execute(stmt, params)]
+                
+            db_vulns = session.execute(_select_vulnerabilities(tuple(params)), params).scalars()
+            return [
+                _export_record(
+                    *(getattr(v, c.key) for c in _EXPORT_COLUMNS),
+                    [{name: getattr(p, name) for name in _EXPORT_PACKAGE_FIELDS}
+                     for p in v.affected_packages],
+                    [{name: getattr(r, name) for name in _EXPORT_REFERENCE_FIELDS}
+                     for r in v.references]
+                )
+                for v in db_vulns
+            ]
+            
+    def _filter_params(self,
+                       source: Optional[str] = None,
+                       start_date: Optional[datetime] = None,
+                       end_date: Optional[datetime] = None,
+                       min_score: Optional[float] = None,
+                       severity: Optional[str] = None) -> Dict[str, Any]:
+        """生成漏洞列表查询的bindparam参数，键的顺序固定，可直接作为查询语句的缓存键"""
+        params = {}
+        if source:
+            params['source'] = source
+        if start_date:
+            params['start_date'] = start_date
+        if end_date:
+            params['end_date'] = end_date
+        if min_score is not None:
+            params['min_score'] = min_score
+        if severity:
+            params['severity'] = severity
+        return params
+        
     def get_affected_packages(self, package_name: str) -> List['Vulnerability']:
         """
         获取影响指定包的漏洞列表
@@ -368,13 +1178,149 @@ class Database:
         Returns:
             漏洞实例列表
         """
-        session = self.Session()
-        try:
-            db_pkg = session.query(DBPackage).filter_by(name=package_name).first()
-            if not db_pkg:
+        with self.session_scope() as session:
+            package_id = session.execute(
+                _SELECT_PACKAGE_ID, {'package_name': package_name}
+            ).scalar()
+            if package_id is None:
                 return []
                 
-            return [Vulnerability.from_dict(v.to_dict()) for v in db_pkg.vulnerabilities]
+            return Vulnerability.from_dicts(
+                v.to_dict() for v in session.execute(
+                    _SELECT_PACKAGE_VULNERABILITIES, {'package_id': package_id}
+                ).scalars()
+            )
             
-        finally:
-            session.close() 
\ No newline at end of file
+    def aggregate_impacts(self,
+                          package_name: Optional[str] = None,
+                          ecosystem: Optional[str] = None) -> Dict[str, Any]:
+        """
+        在数据库中汇总受影响漏洞的数量、严重程度分布和评分
+        
+        指定包名时汇总影响该包的漏洞，否则按生态系统筛选，都未指定时汇总全部漏洞。
+        计数和评分由数据库按严重程度分组聚合，只返回每个分组一行；
+        受影响版本和修复版本只统计同时满足包名和生态系统条件的包。
+        
+        Args:
+            package_name: 包名
+            ecosystem: 生态系统
+            
+        Returns:
+            汇总结果，包含total（漏洞数）、severity_distribution（严重程度分布）、
+            scored（有评分的漏洞数）、score_sum（评分之和）、max_score（最高评分）、
+            affected_versions和fixed_versions（各版本出现次数）
+        """
+        result = {
+            'total': 0,
+            'severity_distribution': {},
+            'scored': 0,
+            'score_sum': 0.0,
+            'max_score': 0.0,
+            'affected_versions': {},
+            'fixed_versions': {}
+        }
+        
+        with self.session_scope() as session:
+            # 筛选漏洞，与get_affected_packages一致只取第一个同名包
+            if package_name:
+                package_id = session.execute(
+                    _SELECT_PACKAGE_ID, {'package_name': package_name}
+                ).scalar()
+                if package_id is None:
+                    return result
+                vuln_filter = [DBVulnerability.id.in_(
+                    select(vulnerability_package.c.vulnerability_id)
+                    .where(vulnerability_package.c.package_id == package_id)
+                )]
+            elif ecosystem:
+                vuln_filter = [DBVulnerability.affected_packages.any(DBPackage.ecosystem == ecosystem)]
+            else:
+                vuln_filter = []
+                
+            # 按严重程度分组计数和汇总评分
+            groups = session.execute(
+                select(
+                    DBVulnerability.severity,
+                    func.count(),
+                    func.count(_IMPACT_SCORE),
+                    func.sum(_IMPACT_SCORE),
+                    func.max(_IMPACT_SCORE)
+                )
+                .where(*vuln_filter)
+                .group_by(DBVulnerability.severity)
+            ).all()
+            
+            for severity, count, scored, score_sum, max_score in groups:
+                result['total'] += count
+                if severity:
+                    result['severity_distribution'][severity] = count
+                if scored:
+                    result['scored'] += scored
+                    result['score_sum'] += score_sum
+                    result['max_score'] = max(result['max_score'], max_score)
+                    
+            # 统计受影响版本和修复版本，只读取包的版本列
+            package_filter = list(vuln_filter)
+            if package_name:
+                package_filter.append(DBPackage.name == package_name)
+            if ecosystem:
+                package_filter.append(DBPackage.ecosystem == ecosystem)
+            version_rows = session.execute(
+                select(DBPackage.affected_versions, DBPackage.fixed_versions)
+                .join(vulnerability_package, vulnerability_package.c.package_id == DBPackage.id)
+                .join(DBVulnerability, DBVulnerability.id == vulnerability_package.c.vulnerability_id)
+                .where(*package_filter)
+            )
+            
+            affected_versions = result['affected_versions']
+            fixed_versions = result['fixed_versions']
+            for affected, fixed in version_rows:
+                for version in affected or ():
+                    affected_versions[version] = affected_versions.get(version, 0) + 1
+                for version in fixed or ():
+                    fixed_versions[version] = fixed_versions.get(version, 0) + 1
+                    
+        return result
+        
+    def get_raw(self, vuln_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取漏洞的原始数据
+        
+        Args:
+            vuln_id: 漏洞ID
+            
+        Returns:
+            原始数据，如果不存在则返回None
+        """
+        with self.session_scope() as session:
+            return (
+                session.query(DBVulnerabilityRaw.raw_data)
+                .filter_by(vuln_id=vuln_id)
+                .scalar()
+            )
+            
+    def get_last_sync(self, source: str) -> Optional[datetime]:
+        """
+        获取数据源上次同步到的时间
+        
+        Args:
+            source: 数据源名称
+            
+        Returns:
+            上次同步到的时间，从未同步过时返回None
+        """
+        with self.session_scope() as session:
+            return session.execute(
+                select(DBSyncState.last_sync_at).where(DBSyncState.source == source)
+            ).scalar()
+            
+    def set_last_sync(self, source: str, last_sync_at: datetime) -> None:
+        """
+        记录数据源同步到的时间
+        
+        Args:
+            source: 数据源名称
+            last_sync_at: 同步到的时间
+        """
+        with self.session_scope() as session:
+            session.merge(DBSyncState(source=source, last_sync_at=last_sync_at))
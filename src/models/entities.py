@@ -12,11 +12,168 @@
 - CVSS评分（CVSSMetrics）
 """
 
+import re
+import sys
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+from dataclasses import dataclass, field, fields, asdict
 
-@dataclass
+# Python 3.10+ 使用__slots__存储实体字段，减少每个实例的内存占用并加快属性访问
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# 版本号中的数字段和字母段，分隔符（.-_+~:）本身不参与比较
+_VERSION_TOKEN_RE = re.compile(r'\d+|[A-Za-z]+')
+
+# 预发布标记及其先后顺序，这些标记的版本排在对应的正式版本之前
+_PRE_RELEASE_RANKS = {
+    'dev': 0,
+    'a': 1, 'alpha': 1,
+    'b': 2, 'beta': 2,
+    'c': 3, 'pre': 3, 'preview': 3, 'rc': 3
+}
+
+# 版本比较键中各类段的排序：预发布标记 < 版本结束 < 其他字母段（如1.1.1k） < 数字段
+_PRE_RELEASE, _VERSION_END, _LETTERS, _NUMBER = range(4)
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> Tuple[Tuple[int, int, str], ...]:
+    """
+    将版本字符串转换为可直接比较的元组
+    
+    版本按数字段和字母段切分（"2.0rc1"切分为2、0、rc、1），数字段按整数比较。
+    rc、beta、alpha等预发布标记排在正式版本之前，其他字母段（如OpenSSL的1.1.1k）
+    排在正式版本之后；单字母a、b、c只在后面跟着数字时视为预发布标记。
+    预发布标记和版本结束前多余的0被忽略，1.0与1.0.0相等。
+    同一版本号会被反复比较，转换结果按字符串缓存。
+    
+    示例：
+        >>> version_key('1.1.1k') < version_key('1.1.2')
+        True
+        >>> version_key('2.0rc1') < version_key('2.0') < version_key('2.5.1')
+        True
+        >>> version_key('1.0') == version_key('1.0.0')
+        True
+    
+    Args:
+        version: 版本字符串
+        
+    Returns:
+        版本比较键
+    """
+    tokens = _VERSION_TOKEN_RE.findall(version.lower())
+    key = []
+    for i, token in enumerate(tokens):
+        if token.isdigit():
+            key.append((_NUMBER, int(token), ''))
+            continue
+        rank = _PRE_RELEASE_RANKS.get(token)
+        followed_by_number = i + 1 < len(tokens) and tokens[i + 1].isdigit()
+        if rank is not None and (len(token) > 1 or followed_by_number):
+            segment = (_PRE_RELEASE, rank, token)
+        else:
+            segment = (_LETTERS, 0, token)
+        _strip_trailing_zeros(key)
+        key.append(segment)
+    _strip_trailing_zeros(key)
+    key.append((_VERSION_END, 0, ''))
+    return tuple(key)
+
+def _strip_trailing_zeros(key: List[Tuple[int, int, str]]) -> None:
+    """去掉版本比较键末尾连续的0数字段"""
+    while key and key[-1] == (_NUMBER, 0, ''):
+        key.pop()
+
+# Vulnerability中以ISO 8601字符串序列化的日期字段
+_DATE_FIELDS = ('published_date', 'last_modified_date', 'discovered_date')
+
+@lru_cache(maxsize=65536)
+def _parse_datetime(value: str) -> datetime:
+    """
+    解析ISO 8601格式的日期字符串，忽略末尾的Z
+    
+    批量加载时同一时间戳会在多条记录中重复出现，解析结果按字符串缓存。
+    
+    Args:
+        value: 日期字符串
+        
+    Returns:
+        日期对象
+    """
+    return datetime.fromisoformat(value.rstrip('Z'))
+
+def version_in_range(version: str,
+                     start_including: Optional[str] = None,
+                     start_excluding: Optional[str] = None,
+                     end_including: Optional[str] = None,
+                     end_excluding: Optional[str] = None) -> bool:
+    """
+    检查版本是否落在CPE匹配给出的版本范围内
+    
+    版本按version_key比较。
+    
+    示例：
+        >>> version_in_range('1.1.1k', end_excluding='1.1.2')
+        True
+        >>> version_in_range('1.0', end_excluding='1.0.0')
+        False
+    
+    Args:
+        version: 待检查的版本
+        start_including: 起始版本（包含）
+        start_excluding: 起始版本（不包含）
+        end_including: 结束版本（包含）
+        end_excluding: 结束版本（不包含）
+        
+    Returns:
+        是否在范围内，未给出任何边界时返回True
+    """
+    key = version_key(version)
+    if start_including and key < version_key(start_including):
+        return False
+    if start_excluding and key <= version_key(start_excluding):
+        return False
+    if end_including and key > version_key(end_including):
+        return False
+    if end_excluding and key >= version_key(end_excluding):
+        return False
+    return True
+
+# 版本范围表达式中的单个约束，如">= 1.2.0"，多个约束以逗号分隔（GitHub vulnerableVersionRange格式）
+_RANGE_CONSTRAINT_RE = re.compile(r'^\s*(>=|<=|>|<|=)\s*(\S+)\s*$')
+
+# 比较运算符对应的version_in_range参数名
+_RANGE_BOUNDS = {
+    '>=': 'start_including',
+    '>': 'start_excluding',
+    '<=': 'end_including',
+    '<': 'end_excluding'
+}
+
+@lru_cache(maxsize=16384)
+def _parse_version_range(expression: str) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """
+    解析版本范围表达式
+    
+    Args:
+        expression: 版本范围表达式，如">= 1.0, < 2.0"
+        
+    Returns:
+        (version_in_range参数名, 版本)元组，表达式不是范围（如单个版本号）时返回None
+    """
+    bounds = []
+    for constraint in expression.split(','):
+        match = _RANGE_CONSTRAINT_RE.match(constraint)
+        if match is None:
+            return None
+        operator, version = match.groups()
+        if operator == '=':
+            bounds.extend((('start_including', version), ('end_including', version)))
+        else:
+            bounds.append((_RANGE_BOUNDS[operator], version))
+    return tuple(bounds)
+
+@dataclass(**_SLOTS)
 class Reference:
     """参考链接"""
     url: str
@@ -24,7 +181,7 @@ class Reference:
     type: str = "other"
     tags: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_SLOTS)
 class CVSSMetrics:
     """CVSS评分信息"""
     version: str
@@ -34,8 +191,15 @@ class CVSSMetrics:
     exploitability_score: Optional[float] = None
     impact_score: Optional[float] = None
     status: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {name: getattr(self, name) for name in _CVSS_FIELDS}
+
+# CVSSMetrics的字段名，使用__slots__后实例没有__dict__，不能再用vars()
+_CVSS_FIELDS = tuple(f.name for f in fields(CVSSMetrics))
 
-@dataclass
+@dataclass(**_SLOTS)
 class Version:
     """软件版本"""
     version: str
@@ -44,7 +208,7 @@ class Version:
     status: str = "unknown"  # affected, fixed, unknown
     repositories: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_SLOTS)
 class Package:
     """软件包"""
     name: str
@@ -55,11 +219,34 @@ class Package:
     fixed_versions: List[str] = field(default_factory=list)
     
     def is_affected(self, version: str) -> bool:
-        """检查指定版本是否受影响"""
-        # TODO: 实现版本比较逻辑
-        return version in self.affected_versions
+        """
+        检查指定版本是否受影响
+        
+        affected_versions中的条目可以是具体版本号，也可以是">= 1.0, < 2.0"形式的版本范围，
+        范围按version_key比较，预发布版本排在对应的正式版本之前。
+        
+        示例：
+            >>> pkg = Package(name='demo', affected_versions=['>= 2.0, < 2.5.1'])
+            >>> pkg.is_affected('2.5.1rc1'), pkg.is_affected('2.0rc1'), pkg.is_affected('2.0.0')
+            (True, False, True)
+            >>> Package(name='demo', affected_versions=['< 1.0.0']).is_affected('1.0')
+            False
+        
+        Args:
+            version: 待检查的版本
+            
+        Returns:
+            是否受影响
+        """
+        if version in self.affected_versions:
+            return True
+        for expression in self.affected_versions:
+            bounds = _parse_version_range(expression)
+            if bounds is not None and version_in_range(version, **dict(bounds)):
+                return True
+        return False
 
-@dataclass
+@dataclass(**_SLOTS)
 class Vulnerability:
     """漏洞基础模型"""
     # 基本信息
@@ -105,13 +292,13 @@ class Vulnerability:
             'last_modified_date': self.last_modified_date.isoformat() if self.last_modified_date else None,
             'discovered_date': self.discovered_date.isoformat() if self.discovered_date else None,
             'severity': self.severity,
-            'cvss_v3': vars(self.cvss_v3) if self.cvss_v3 else None,
-            'cvss_v2': vars(self.cvss_v2) if self.cvss_v2 else None,
+            'cvss_v3': self.cvss_v3.to_dict() if self.cvss_v3 else None,
+            'cvss_v2': self.cvss_v2.to_dict() if self.cvss_v2 else None,
             'status': self.status,
             'scope': self.scope,
-            'affected_packages': [vars(pkg) for pkg in self.affected_packages],
+            'affected_packages': [asdict(pkg) for pkg in self.affected_packages],
             'affected_configurations': self.affected_configurations,
-            'references': [vars(ref) for ref in self.references],
+            'references': [asdict(ref) for ref in self.references],
             'patches': self.patches,
             'notes': self.notes
         }
@@ -120,9 +307,10 @@ class Vulnerability:
     def from_dict(cls, data: Dict[str, Any]) -> 'Vulnerability':
         """从字典创建实例"""
         # 处理日期字段
-        for date_field in ['published_date', 'last_modified_date', 'discovered_date']:
-            if data.get(date_field):
-                data[date_field] = datetime.fromisoformat(data[date_field].rstrip('Z'))
+        for date_field in _DATE_FIELDS:
+            value = data.get(date_field)
+            if value and isinstance(value, str):
+                data[date_field] = _parse_datetime(value)
         
         # 处理CVSS评分
         if data.get('cvss_v3'):
@@ -147,6 +335,20 @@ class Vulnerability:
         
         return cls(**data)
     
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict[str, Any]]) -> List['Vulnerability']:
+        """
+        从字典批量创建实例
+        
+        Args:
+            records: 字典序列
+            
+        Returns:
+            实例列表
+        """
+        from_dict = cls.from_dict
+        return [from_dict(data) for data in records]
+    
     def merge(self, other: 'Vulnerability') -> None:
         """合并另一个漏洞实例的信息"""
         # 只合并来自同一个漏洞的信息
@@ -188,9 +390,14 @@ class Vulnerability:
         for other_patch in other.patches:
             if other_patch['url'] not in existing_patches:
                 self.patches.append(other_patch)
+                existing_patches.add(other_patch['url'])
         
-        # 合并注释
-        self.notes.extend([note for note in other.notes if note not in self.notes])
+        # 合并注释，用集合判断是否已存在，避免逐条扫描列表
+        existing_notes = set(self.notes)
+        for note in other.notes:
+            if note not in existing_notes:
+                self.notes.append(note)
+                existing_notes.add(note)
         
         # 保留原始数据
         self.raw_data.update(other.raw_data) 
\ No newline at end of file
@@ -7,15 +7,62 @@ NVD数据模型模块
 定义了NVD（国家漏洞数据库）特有的数据结构和转换方法。
 """
 
+import re
+from functools import lru_cache
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Union
 from dataclasses import dataclass, field
 
 from .entities import (
-    Vulnerability, Package, Version, Reference, CVSSMetrics
+    Vulnerability, Package, Version, Reference, CVSSMetrics, _SLOTS
 )
+from ..utils.jsonstream import ijson_backend as _ijson
 
-@dataclass
+# 补丁链接的URL关键字，预编译为单个不区分大小写的正则，避免逐个关键字扫描和转小写
+_PATCH_RE = re.compile(r'patch|fix|update|resolve|mitigate', re.IGNORECASE)
+
+def is_likely_patch(url: str, tags: List[str]) -> bool:
+    """根据参考链接的URL和标签判断其是否可能是补丁"""
+    return 'Patch' in tags or _PATCH_RE.search(url) is not None
+
+@lru_cache(maxsize=65536)
+def _parse_cpe(cpe: str) -> Optional[Tuple[str, str, str]]:
+    """
+    解析CPE 2.3 URI，只拆分到版本字段
+    
+    同一CPE URI会在大量漏洞中重复出现，解析结果按URI缓存。
+    格式：cpe:2.3:a:vendor:product:version:update:edition:language:sw_edition:target_sw:target_hw:other
+    
+    Args:
+        cpe: CPE 2.3 URI
+        
+    Returns:
+        (平台类型, 包名, 版本)元组，格式无效时返回None
+    """
+    parts = cpe.split(':', 6)
+    if len(parts) < 5:
+        return None
+    version = parts[5] if len(parts) > 5 else '*'
+    return parts[2], f"{parts[3]}/{parts[4]}", version
+
+def iter_nvd_items(file_path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取NVD JSON数据文件
+    
+    逐条解析`vulnerabilities`数组中的条目，峰值内存与单条漏洞数据相当，
+    而不是与整个数据文件大小相当。
+    
+    Args:
+        file_path: NVD API 2.0格式的JSON文件路径
+        
+    Returns:
+        漏洞条目迭代器，每个条目可直接传给NVDData.from_dict
+    """
+    with open(file_path, 'rb') as f:
+        yield from _ijson.items(f, 'vulnerabilities.item', use_float=True)
+
+@dataclass(**_SLOTS)
 class CPEMatch:
     """CPE匹配信息"""
     cpe23Uri: str
@@ -25,7 +72,7 @@ class CPEMatch:
     versionEndIncluding: Optional[str] = None
     versionEndExcluding: Optional[str] = None
 
-@dataclass
+@dataclass(**_SLOTS)
 class Node:
     """配置节点"""
     operator: str  # AND, OR
@@ -33,12 +80,12 @@ class Node:
     cpe_match: List[CPEMatch] = field(default_factory=list)
     children: List['Node'] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_SLOTS)
 class NVDConfiguration:
     """NVD配置信息"""
     nodes: List[Node] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_SLOTS)
 class NVDData:
     """NVD漏洞数据"""
     id: str
@@ -49,29 +96,60 @@ class NVDData:
     metrics: Dict[str, Any]
     references: List[Dict[str, Any]]
     configurations: List[Dict[str, Any]]
+    # 原始API响应数据
+    raw_data: Dict[str, Any] = field(default_factory=dict, repr=False)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'NVDData':
         """从NVD API响应数据创建实例"""
-        cve = data.get('cve', {})
+        cve = data.get('cve') or {}
+        get = cve.get
         return cls(
-            id=cve.get('id'),
-            published=datetime.fromisoformat(cve.get('published')),
-            lastModified=datetime.fromisoformat(cve.get('lastModified')),
-            vulnStatus=cve.get('vulnStatus'),
-            descriptions=cve.get('descriptions', []),
-            metrics=cve.get('metrics', {}),
-            references=cve.get('references', []),
-            configurations=cve.get('configurations', [])
+            id=get('id'),
+            published=datetime.fromisoformat(get('published')),
+            lastModified=datetime.fromisoformat(get('lastModified')),
+            vulnStatus=get('vulnStatus'),
+            descriptions=get('descriptions') or [],
+            metrics=get('metrics') or {},
+            references=get('references') or [],
+            configurations=get('configurations') or [],
+            raw_data=data
         )
     
+    @classmethod
+    def iter_from_file(cls, file_path: Union[str, Path]) -> Iterator['NVDData']:
+        """从NVD JSON数据文件流式创建实例"""
+        for item in iter_nvd_items(file_path):
+            yield cls.from_dict(item)
+    
+    @classmethod
+    def iter_vulnerabilities(cls, file_path: Union[str, Path]) -> Iterator[Vulnerability]:
+        """
+        从NVD JSON数据文件流式转换为通用漏洞模型
+        
+        逐条解析并转换，可直接传给Database.add_vulnerabilities按批次写入，
+        不需要先在内存中构造全部漏洞实例的列表。
+        
+        Args:
+            file_path: NVD API 2.0格式的JSON文件路径
+            
+        Returns:
+            漏洞实例迭代器
+        """
+        for item in iter_nvd_items(file_path):
+            yield cls.from_dict(item).to_vulnerability()
+    
     def to_vulnerability(self) -> Vulnerability:
         """转换为通用漏洞模型"""
-        # 提取描述（优先使用英文）
-        description = next(
-            (desc['value'] for desc in self.descriptions if desc.get('lang') == 'en'),
-            next((desc['value'] for desc in self.descriptions), None)
-        )
+        # 提取描述（优先使用英文，否则使用第一条）
+        description = None
+        for desc in self.descriptions:
+            value = desc.get('value')
+            if desc.get('lang') == 'en':
+                description = value
+                break
+            if description is None:
+                description = value
         
         # 提取CVSS评分
         cvss_v3 = self._extract_cvss_v3()
@@ -80,15 +158,22 @@ class NVDData:
         # 提取受影响的包
         affected_packages = self._extract_affected_packages()
         
-        # 提取参考链接
-        references = [
-            Reference(
-                url=ref.get('url'),
-                source=ref.get('source'),
-                tags=ref.get('tags', [])
-            )
-            for ref in self.references
-        ]
+        # 提取参考链接和补丁信息
+        references = []
+        patches = []
+        append = references.append
+        for ref in self.references:
+            get = ref.get
+            url = get('url')
+            source = get('source')
+            tags = get('tags') or []
+            append(Reference(
+                url=url,
+                source=source,
+                tags=tags
+            ))
+            if url and is_likely_patch(url, tags):
+                patches.append({'url': url, 'source': source})
         
         return Vulnerability(
             id=self.id,
@@ -101,7 +186,8 @@ class NVDData:
             cvss_v2=cvss_v2,
             affected_packages=affected_packages,
             references=references,
-            raw_data={'cve': data}
+            patches=patches,
+            raw_data=self.raw_data
         )
     
     def _extract_cvss_v3(self) -> Optional[CVSSMetrics]:
@@ -140,58 +226,56 @@ class NVDData:
     
     def _extract_affected_packages(self) -> List[Package]:
         """从CPE配置中提取受影响的包信息"""
-        packages = []
+        # 包名到包信息的映射，按首次出现的顺序输出
+        packages: Dict[str, Package] = {}
+        # 已处理的(CPE, 是否受影响)组合，同一CPE在多个节点中重复出现时只处理一次
+        seen_matches = set()
+        # 已添加的(包名, 版本, 状态)组合，不同CPE解析出相同版本时不重复添加
+        seen_versions = set()
         
-        def process_node(node: Dict[str, Any]) -> None:
-            """处理配置节点"""
+        # 用显式栈按深度优先前序遍历配置节点，代替递归调用
+        stack = [
+            node
+            for config in reversed(self.configurations)
+            for node in reversed(config.get('nodes', []))
+        ]
+        while stack:
+            node = stack.pop()
             for cpe_match in node.get('cpeMatch', []):
                 cpe = cpe_match.get('cpe23Uri', '')
                 if not cpe:
                     continue
                     
-                # 解析CPE URI
-                # 格式：cpe:2.3:a:vendor:product:version:update:edition:language:sw_edition:target_sw:target_hw:other
-                parts = cpe.split(':')
-                if len(parts) < 5:
+                match_key = (cpe, cpe_match.get('vulnerable', True))
+                if match_key in seen_matches:
                     continue
+                seen_matches.add(match_key)
                     
-                vendor = parts[3]
-                product = parts[4]
-                version = parts[5] if len(parts) > 5 else '*'
-                
-                # 创建版本范围
-                version_range = {
-                    'start_including': cpe_match.get('versionStartIncluding'),
-                    'start_excluding': cpe_match.get('versionStartExcluding'),
-                    'end_including': cpe_match.get('versionEndIncluding'),
-                    'end_excluding': cpe_match.get('versionEndExcluding')
-                }
+                # 解析CPE URI
+                parsed = _parse_cpe(cpe)
+                if parsed is None:
+                    continue
+                platform, pkg_name, version = parsed
                 
                 # 创建或更新包信息
-                pkg_name = f"{vendor}/{product}"
-                pkg = next((p for p in packages if p.name == pkg_name), None)
+                pkg = packages.get(pkg_name)
                 if not pkg:
                     pkg = Package(
                         name=pkg_name,
                         ecosystem='cpe',
-                        platform=parts[2]  # a=application, o=os, h=hardware
+                        platform=platform  # a=application, o=os, h=hardware
                     )
-                    packages.append(pkg)
+                    packages[pkg_name] = pkg
                 
                 # 添加版本信息
                 if version != '*':
-                    pkg.versions.append(Version(
-                        version=version,
-                        status='affected' if cpe_match.get('vulnerable', True) else 'fixed'
-                    ))
+                    status = 'affected' if match_key[1] else 'fixed'
+                    seen_key = (pkg_name, version, status)
+                    if seen_key not in seen_versions:
+                        seen_versions.add(seen_key)
+                        pkg.versions.append(Version(version=version, status=status))
             
-            # 递归处理子节点
-            for child in node.get('children', []):
-                process_node(child)
-        
-        # 处理所有配置节点
-        for config in self.configurations:
-            for node in config.get('nodes', []):
-                process_node(node)
+            # 子节点逆序入栈，保证按原顺序处理
+            stack.extend(reversed(node.get('children', [])))
         
-        return packages 
\ No newline at end of file
+        return list(packages.values()) 
\ No newline at end of file
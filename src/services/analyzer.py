@@ -12,19 +12,49 @@
 5. 风险评估
 """
 
+import hashlib
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-import networkx as nx
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import normalize
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 
 from ..models.database import Database
 from ..models.entities import Vulnerability, Package
 from ..utils.logger import logger
 
+# CVSS评分区间的上界（含）和对应标签
+_CVSS_BUCKET_BOUNDS = np.array([3.9, 6.9, 8.9])
+_CVSS_BUCKET_LABELS = ('0-3.9', '4.0-6.9', '7.0-8.9', '9.0-10.0')
+
+# 缓存的TF-IDF矩阵数量上限
+_TFIDF_CACHE_SIZE = 4
+
+@lru_cache(maxsize=128)
+def _trend_index(start_date: datetime, end_date: datetime, interval: str) -> pd.DatetimeIndex:
+    """
+    生成趋势分析的时间段标签
+    
+    标签与resample(interval)的分组标签一致，覆盖从开始日期到结束日期的所有时间段。
+    
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        interval: 时间间隔
+        
+    Returns:
+        时间段标签索引
+    """
+    bounds = pd.Series(0, index=pd.DatetimeIndex([start_date, end_date]))
+    return bounds.resample(interval).sum().index
+
 class AnalyzerService:
     """数据分析服务"""
     
@@ -40,11 +70,22 @@ class AnalyzerService:
         """
         self.db = Database(db_url)
         self.min_similarity = min_similarity
-        self.vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=5000,
-            ngram_range=(1, 2)
-        )
+        # 特征哈希代替词表，不需要在内存中构建和保存完整的词汇表；
+        # 分词结果按描述文本缓存，同一描述在多次分析中只分词一次；
+        # 相似度只用于阈值比较，使用float32即可，矩阵内存和乘法开销减半
+        tokenize = HashingVectorizer(stop_words='english', ngram_range=(1, 2)).build_analyzer()
+        self.vectorizer = Pipeline([
+            ('hv', HashingVectorizer(
+                analyzer=lru_cache(maxsize=100_000)(tokenize),
+                n_features=2 ** 18,
+                alternate_sign=False,
+                norm=None,
+                dtype=np.float32
+            )),
+            ('tfidf', TfidfTransformer())
+        ])
+        # 语料摘要到TF-IDF矩阵的缓存，按最近使用顺序淘汰
+        self._tfidf_cache = OrderedDict()
     
     def analyze_trends(self,
                      start_date: datetime,
@@ -63,41 +104,87 @@ class AnalyzerService:
         Returns:
             趋势分析结果
         """
-        # 获取时间范围内的漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
+        # 趋势分析只需要发布日期和严重程度，按列获取，不构造漏洞实例
+        frame = self.db.get_vulnerabilities_frame(source, start_date, end_date)
         
         # 创建时间序列数据
-        dates = [v.published_date for v in vulns if v.published_date]
-        severity_counts = defaultdict(list)
+        dated = frame[frame['published_date'].notna()]
+        with_severity = dated[dated['severity'].notna() & (dated['severity'] != '')]
+        
+        # 覆盖整个查询区间的时间段标签，没有漏洞的时间段（包括区间两端）也计为0
+        periods = _trend_index(start_date, end_date, interval)
+        
+        # 总体趋势：以发布日期为索引按时间段直接求和，不经过value_counts的哈希计数
+        total = (
+            pd.Series(1, index=pd.DatetimeIndex(dated['published_date']))
+            .resample(interval)
+            .sum()
+            .reindex(periods, fill_value=0)
+        )
         
-        # 按严重程度分组
-        for vuln in vulns:
-            if vuln.published_date and vuln.severity:
-                severity_counts[vuln.severity].append(vuln.published_date)
+        # 按时间段×严重程度一次分组计数，得到完整的趋势矩阵
+        by_severity = (
+            with_severity
+            .groupby([pd.Grouper(key='published_date', freq=interval), 'severity'], observed=True)
+            .size()
+            .unstack(fill_value=0)
+        )
+        # 列按严重程度首次出现的顺序排列，行与总体趋势对齐
+        severities = list(with_severity['severity'].unique())
+        by_severity = by_severity.reindex(index=periods, columns=severities, fill_value=0)
         
         # 创建时间序列
-        df = pd.DataFrame()
-        
-        # 总体趋势
-        df['total'] = pd.Series(dates).value_counts().resample(interval).sum()
-        
-        # 按严重程度的趋势
-        for severity, dates in severity_counts.items():
-            df[severity.lower()] = pd.Series(dates).value_counts().resample(interval).sum()
+        df = by_severity.rename(columns=str.lower)
+        df.insert(0, 'total', total)
+        # 严重程度为分类列，转换为普通列名
+        df.columns = list(df.columns)
         
         # 计算统计信息
         stats = {
-            'total_count': len(vulns),
+            'total_count': len(frame),
             'severity_distribution': {
-                severity: len(dates)
-                for severity, dates in severity_counts.items()
+                severity: int(count)
+                for severity, count in by_severity.sum().items()
             },
-            'daily_average': len(vulns) / (end_date - start_date).days,
-            'time_series': df.fillna(0).to_dict()
+            'daily_average': len(frame) / (end_date - start_date).days,
+            'time_series': df.to_dict()
         }
         
         return stats
     
+    def _tfidf_matrix(self, descriptions: List[str]) -> csr_matrix:
+        """
+        计算描述文本的L2归一化TF-IDF矩阵
+        
+        结果按语料内容缓存，时间范围重叠的多次关联分析遇到相同的描述列表时直接复用。
+        
+        Args:
+            descriptions: 描述文本列表
+            
+        Returns:
+            每行一个描述的稀疏矩阵
+        """
+        key = hashlib.blake2b(
+            '\0'.join(descriptions).encode('utf-8'), digest_size=16
+        ).digest()
+        cached = self._tfidf_cache.get(key)
+        if cached is not None:
+            self._tfidf_cache.move_to_end(key)
+            return cached
+            
+        # 同一漏洞常被多个数据源收录，描述完全相同；只对不重复的描述做特征哈希，
+        # 再按下标展开为每个漏洞一行，IDF仍按全部描述计算
+        codes, unique_descriptions = pd.factorize(pd.Series(descriptions))
+        counts = self.vectorizer.named_steps['hv'].transform(unique_descriptions)[codes]
+        tfidf_matrix = normalize(
+            self.vectorizer.named_steps['tfidf'].fit_transform(counts), norm='l2', copy=False
+        )
+        
+        self._tfidf_cache[key] = tfidf_matrix
+        if len(self._tfidf_cache) > _TFIDF_CACHE_SIZE:
+            self._tfidf_cache.popitem(last=False)
+        return tfidf_matrix
+    
     def analyze_correlations(self,
                           start_date: Optional[datetime] = None,
                           end_date: Optional[datetime] = None,
@@ -116,11 +203,12 @@ class AnalyzerService:
         # 获取漏洞数据
         vulns = self.db.get_vulnerabilities(source, start_date, end_date)
         
-        # 创建漏洞描述矩阵
-        descriptions = [
-            v.description for v in vulns 
+        # 创建漏洞描述矩阵，described与descriptions按下标一一对应
+        described = [
+            v for v in vulns
             if v.description and len(v.description.split()) > 3
         ]
+        descriptions = [v.description for v in described]
         
         if not descriptions:
             return {
@@ -130,61 +218,53 @@ class AnalyzerService:
         
         # 计算文本相似度
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(descriptions)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+            tfidf_matrix = self._tfidf_matrix(descriptions)
             
-            # 查找相似的漏洞组
-            similar_groups = []
-            used_indices = set()
+            # 行向量已归一化，稀疏矩阵自乘即为余弦相似度；
+            # 只保留达到阈值的元素，不构造稠密的N×N矩阵
+            similarity_matrix = (tfidf_matrix @ tfidf_matrix.T).tocsr()
+            similarity_matrix.data[similarity_matrix.data < self.min_similarity] = 0
+            similarity_matrix.eliminate_zeros()
             
-            for i in range(len(descriptions)):
-                if i in used_indices:
-                    continue
-                    
-                # 找到相似的漏洞
-                similar_indices = []
-                for j in range(len(descriptions)):
-                    if i != j and similarity_matrix[i][j] >= self.min_similarity:
-                        similar_indices.append(j)
-                        
-                if similar_indices:
-                    group = [vulns[i]] + [vulns[j] for j in similar_indices]
-                    similar_groups.append(group)
-                    used_indices.add(i)
-                    used_indices.update(similar_indices)
+            # 相似度图的每个连通分量为一组，分组结果与遍历顺序无关
+            _, labels = connected_components(similarity_matrix, directed=False)
+            components = defaultdict(list)
+            for index, label in enumerate(labels.tolist()):
+                components[label].append(described[index])
+                
+            # 只包含自身的分量没有相似漏洞
+            similar_groups = [group for group in components.values() if len(group) > 1]
         except Exception as e:
             logger.error(f"Failed to compute text similarity: {str(e)}")
             similar_groups = []
         
-        # 构建包依赖图
-        graph = nx.Graph()
+        # 构建包依赖图：图只用于输出节点和边列表，直接收集即可
+        # 同名节点保留首次出现时的类型
+        nodes: Dict[str, str] = {}
+        edges: Dict[Tuple[str, str], None] = {}
         
-        # 添加节点和边
         for vuln in vulns:
             for pkg in vuln.affected_packages:
-                # 添加包节点
-                if not graph.has_node(pkg.name):
-                    graph.add_node(pkg.name, type='package')
-                
-                # 添加生态系统节点
-                if pkg.ecosystem and not graph.has_node(pkg.ecosystem):
-                    graph.add_node(pkg.ecosystem, type='ecosystem')
-                    graph.add_edge(pkg.name, pkg.ecosystem)
+                # 包节点
+                nodes.setdefault(pkg.name, 'package')
                 
-                # 添加平台节点
-                if pkg.platform and not graph.has_node(pkg.platform):
-                    graph.add_node(pkg.platform, type='platform')
-                    graph.add_edge(pkg.name, pkg.platform)
+                # 生态系统节点和平台节点，每个包都与其相连（无向边，不重复）
+                for neighbor, node_type in ((pkg.ecosystem, 'ecosystem'), (pkg.platform, 'platform')):
+                    if not neighbor:
+                        continue
+                    nodes.setdefault(neighbor, node_type)
+                    if neighbor != pkg.name and (neighbor, pkg.name) not in edges:
+                        edges[(pkg.name, neighbor)] = None
         
         # 转换为可序列化的格式
         graph_data = {
             'nodes': [
-                {'id': node, 'type': graph.nodes[node]['type']}
-                for node in graph.nodes
+                {'id': node, 'type': node_type}
+                for node, node_type in nodes.items()
             ],
             'edges': [
                 {'source': u, 'target': v}
-                for u, v in graph.edges
+                for u, v in edges
             ]
         }
         
@@ -209,18 +289,10 @@ class AnalyzerService:
         Returns:
             影响分析结果
         """
-        # 获取受影响的漏洞
-        if package_name:
-            vulns = self.db.get_affected_packages(package_name)
-        else:
-            vulns = self.db.get_vulnerabilities()
-            if ecosystem:
-                vulns = [
-                    v for v in vulns
-                    if any(p.ecosystem == ecosystem for p in v.affected_packages)
-                ]
+        # 计数、严重程度分布、评分和版本统计都在数据库中汇总，不加载漏洞实例
+        summary = self.db.aggregate_impacts(package_name, ecosystem)
         
-        if not vulns:
+        if not summary['total']:
             return {
                 'total_vulnerabilities': 0,
                 'severity_distribution': {},
@@ -229,45 +301,15 @@ class AnalyzerService:
                 'impact_score': 0
             }
         
-        # 统计严重程度分布
-        severity_counts = Counter(v.severity for v in vulns if v.severity)
-        
-        # 统计受影响的版本
-        affected_versions = defaultdict(int)
-        fixed_versions = defaultdict(int)
-        
-        for vuln in vulns:
-            for pkg in vuln.affected_packages:
-                if package_name and pkg.name != package_name:
-                    continue
-                if ecosystem and pkg.ecosystem != ecosystem:
-                    continue
-                    
-                for version in pkg.affected_versions:
-                    affected_versions[version] += 1
-                for version in pkg.fixed_versions:
-                    fixed_versions[version] += 1
-        
         # 计算影响得分
         # 基于CVSS评分的加权平均
-        total_score = 0
-        count = 0
-        
-        for vuln in vulns:
-            if vuln.cvss_v3:
-                total_score += vuln.cvss_v3.base_score
-                count += 1
-            elif vuln.cvss_v2:
-                total_score += vuln.cvss_v2.base_score
-                count += 1
-                
-        impact_score = total_score / count if count > 0 else 0
+        impact_score = summary['score_sum'] / summary['scored'] if summary['scored'] > 0 else 0
         
         return {
-            'total_vulnerabilities': len(vulns),
-            'severity_distribution': dict(severity_counts),
-            'affected_versions': dict(affected_versions),
-            'fixed_versions': dict(fixed_versions),
+            'total_vulnerabilities': summary['total'],
+            'severity_distribution': summary['severity_distribution'],
+            'affected_versions': summary['affected_versions'],
+            'fixed_versions': summary['fixed_versions'],
             'impact_score': round(impact_score, 2)
         }
     
@@ -284,72 +326,62 @@ class AnalyzerService:
         Returns:
             统计分析结果
         """
-        # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(None, start_date, end_date)
-        
-        if not vulns:
-            return {
-                'total_vulnerabilities': 0,
-                'source_distribution': {},
-                'severity_distribution': {},
-                'ecosystem_distribution': {},
-                'cvss_distribution': {'v2': {}, 'v3': {}},
-                'top_affected_packages': [],
-                'reference_statistics': {}
-            }
-        
-        # 数据源分布
-        source_counts = Counter(v.source for v in vulns)
-        
-        # 严重程度分布
-        severity_counts = Counter(v.severity for v in vulns if v.severity)
-        
-        # 生态系统分布
+        # 数据源、严重程度、生态系统、受影响包、CVSS评分和参考链接的统计
+        # 在一次遍历中同时完成，漏洞数据从数据库分批流式读取，不整体加载到内存
+        total = 0
+        source_counts = Counter()
+        severity_counts = Counter()
         ecosystem_counts = Counter()
-        for v in vulns:
-            for pkg in v.affected_packages:
-                if pkg.ecosystem:
-                    ecosystem_counts[pkg.ecosystem] += 1
-        
-        # CVSS评分分布
+        package_counts = Counter()
+        reference_counts = defaultdict(int)
         cvss_v2_scores = []
         cvss_v3_scores = []
         
-        for v in vulns:
+        for v in self.db.iter_vulnerabilities(None, start_date, end_date):
+            total += 1
+            source_counts[v.source] += 1
+            if v.severity:
+                severity_counts[v.severity] += 1
+                
+            for pkg in v.affected_packages:
+                package_counts[pkg.name] += 1
+                if pkg.ecosystem:
+                    ecosystem_counts[pkg.ecosystem] += 1
+                    
             if v.cvss_v2:
                 cvss_v2_scores.append(v.cvss_v2.base_score)
             if v.cvss_v3:
                 cvss_v3_scores.append(v.cvss_v3.base_score)
-        
-        # 计算CVSS评分区间分布
-        def get_score_distribution(scores: List[float]) -> Dict[str, int]:
-            dist = defaultdict(int)
-            for score in scores:
-                if score <= 3.9:
-                    dist['0-3.9'] += 1
-                elif score <= 6.9:
-                    dist['4.0-6.9'] += 1
-                elif score <= 8.9:
-                    dist['7.0-8.9'] += 1
-                else:
-                    dist['9.0-10.0'] += 1
-            return dict(dist)
-        
-        # 最常受影响的包
-        package_counts = Counter()
-        for v in vulns:
-            for pkg in v.affected_packages:
-                package_counts[pkg.name] += 1
-        
-        # 参考链接统计
-        reference_counts = defaultdict(int)
-        for v in vulns:
+                
             for ref in v.references:
                 if ref.source:
                     reference_counts[ref.source] += 1
         
+        # 计算CVSS评分区间分布（按区间上界分桶，一次向量化计数）
+        def get_score_distribution(scores: List[float]) -> Dict[str, int]:
+            bucket_counts = np.bincount(
+                np.digitize(np.asarray(scores, dtype=np.float64), _CVSS_BUCKET_BOUNDS, right=True),
+                minlength=len(_CVSS_BUCKET_LABELS)
+            )
+            return {
+                label: int(count)
+                for label, count in zip(_CVSS_BUCKET_LABELS, bucket_counts)
+                if count
+            }
+        
+        if not total:
+            return {
+                'total_vulnerabilities': 0,
+                'source_distribution': {},
+                'severity_distribution': {},
+                'ecosystem_distribution': {},
+                'cvss_distribution': {'v2': {}, 'v3': {}},
+                'top_affected_packages': [],
+                'reference_statistics': {}
+            }
+        
         return {
-            'total_vulnerabilities': len(vulns),
+            'total_vulnerabilities': total,
             'source_distribution': dict(source_counts),
             'severity_distribution': dict(severity_counts),
             'ecosystem_distribution': dict(ecosystem_counts),
@@ -390,14 +422,15 @@ class AnalyzerService:
                 'recommendation': 'No known vulnerabilities'
             }
         
-        # 筛选特定版本的漏洞
+        # 筛选特定版本的漏洞，找到一个受影响的同名包即可，不再检查其余的包
         if version:
-            version_vulns = []
-            for vuln in vulns:
-                for pkg in vuln.affected_packages:
-                    if pkg.name == package_name and pkg.is_affected(version):
-                        version_vulns.append(vuln)
-            vulns = version_vulns
+            vulns = [
+                vuln for vuln in vulns
+                if any(
+                    pkg.name == package_name and pkg.is_affected(version)
+                    for pkg in vuln.affected_packages
+                )
+            ]
         
         # 计算风险得分
         total_score = 0
@@ -14,13 +14,60 @@
 
 import re
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Set
-from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from urllib.parse import urlsplit, urlunsplit
 
 from ..models.database import Database
 from ..models.entities import Vulnerability, Package, Version, Reference
 from ..utils.logger import logger
 
+# HTML标签匹配（预编译，避免每次调用都查正则缓存）
+_HTML_RE = re.compile(r'<[^>]+>')
+
+class _PrintableTable(dict):
+    """
+    str.translate使用的映射表
+    
+    不可打印字符映射为None（删除），其余字符映射为自身。
+    字符首次出现时才判断并缓存结果，之后的查表都在C层完成。
+    """
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = codepoint if chr(codepoint).isprintable() else None
+        self[codepoint] = value
+        return value
+
+_PRINTABLE_TABLE = _PrintableTable()
+
+def _canonical_url(url: str) -> str:
+    """
+    规范化参考链接URL
+    
+    协议统一为http/https（缺少或其他协议时使用https），协议和主机名转为小写，
+    去掉路径末尾的'/'，仅这些部分不同的链接规范化后相同。
+    
+    Args:
+        url: 原始URL
+        
+    Returns:
+        规范化后的URL
+    """
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = 'https://' + url.split('://', 1)[-1]
+        
+    parts = urlsplit(url)
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip('/'),
+        parts.query,
+        parts.fragment
+    ))
+
 class CleanerService:
     """数据清洗服务"""
     
@@ -50,14 +97,16 @@ class CleanerService:
         if not desc:
             return None
             
-        # 移除HTML标签
-        desc = re.sub(r'<[^>]+>', '', desc)
+        # 移除HTML标签（不含'<'时跳过正则）
+        if '<' in desc:
+            desc = _HTML_RE.sub('', desc)
         
         # 移除多余的空白字符
         desc = ' '.join(desc.split())
         
-        # 移除不可打印字符
-        desc = ''.join(char for char in desc if char.isprintable())
+        # 移除不可打印字符（整串检查在C层完成，绝大多数描述无需过滤）
+        if not desc.isprintable():
+            desc = desc.translate(_PRINTABLE_TABLE)
         
         return desc
     
@@ -80,14 +129,13 @@ class CleanerService:
                 continue
                 
             # 规范化URL
-            url = ref.url.strip().rstrip('/')
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            url = _canonical_url(ref.url)
                 
-            # 去重
-            if url in seen_urls:
+            # 去重，http和https视为同一链接，保留先出现的一个
+            key = url.split('://', 1)[1]
+            if key in seen_urls:
                 continue
-            seen_urls.add(url)
+            seen_urls.add(key)
             
             # 更新URL
             ref.url = url
@@ -125,11 +173,11 @@ class CleanerService:
                 
         pkg.versions = cleaned_versions
         
-        # 清理受影响的版本
-        pkg.affected_versions = list(set(v.strip() for v in pkg.affected_versions if v.strip()))
+        # 清理受影响的版本（去空、去重，保留原有顺序）
+        pkg.affected_versions = list(dict.fromkeys(filter(None, map(str.strip, pkg.affected_versions))))
         
         # 清理修复版本
-        pkg.fixed_versions = list(set(v.strip() for v in pkg.fixed_versions if v.strip()))
+        pkg.fixed_versions = list(dict.fromkeys(filter(None, map(str.strip, pkg.fixed_versions))))
         
         return pkg
     
@@ -194,6 +242,50 @@ class CleanerService:
         
         return vuln
     
+    def _clean_group(self, group: List[Vulnerability]) -> Tuple[Vulnerability, int]:
+        """
+        清洗同一ID的一组漏洞记录，多条记录时合并为一条
+        
+        Args:
+            group: 同一ID的漏洞记录列表
+            
+        Returns:
+            (清洗后的漏洞记录, 清洗的记录数)
+        """
+        # 清洗每条记录
+        cleaned_group = [self.clean_vulnerability(v) for v in group]
+        
+        # 如果有多条记录，进行合并
+        if len(cleaned_group) > 1:
+            return self.merge_vulnerabilities(cleaned_group), len(cleaned_group)
+        return cleaned_group[0], 1
+    
+    def _iter_cleaned(self,
+                     futures: Dict[Future, str],
+                     stats: Dict[str, int]) -> Iterator[Vulnerability]:
+        """
+        按完成顺序产出清洗结果并累计统计信息
+        
+        Args:
+            futures: 清洗任务到漏洞ID的映射
+            stats: 清洗统计信息，原地更新
+            
+        Returns:
+            清洗后的漏洞记录迭代器
+        """
+        for future in as_completed(futures):
+            try:
+                vuln, count = future.result()
+            except Exception as e:
+                logger.error(f"Failed to clean vulnerability {futures[future]}: {str(e)}")
+                stats['failed'] += 1
+                continue
+                
+            stats['cleaned'] += count
+            if count > 1:
+                stats['merged'] += 1
+            yield vuln
+    
     def clean_all(self,
                 start_date: Optional[datetime] = None,
                 end_date: Optional[datetime] = None,
@@ -217,36 +309,18 @@ class CleanerService:
         }
         
         try:
-            # 获取需要清洗的漏洞数据
-            vulns = self.db.get_vulnerabilities(source, start_date, end_date)
+            # 获取需要清洗的漏洞数据，按ID排序后同一ID的记录相邻
+            vulns = self.db.get_vulnerabilities(source, start_date, end_date, order_by_id=True)
             stats['total'] = len(vulns)
             
-            # 按ID分组
-            vuln_groups: Dict[str, List[Vulnerability]] = {}
-            for vuln in vulns:
-                vuln_groups.setdefault(vuln.id, []).append(vuln)
-            
-            # 清洗和合并每组漏洞
-            for vuln_id, group in vuln_groups.items():
-                try:
-                    # 清洗每条记录
-                    cleaned_group = [self.clean_vulnerability(v) for v in group]
-                    stats['cleaned'] += len(cleaned_group)
-                    
-                    # 如果有多条记录，进行合并
-                    if len(cleaned_group) > 1:
-                        merged = self.merge_vulnerabilities(cleaned_group)
-                        stats['merged'] += 1
-                        
-                        # 更新数据库
-                        self.db.update_vulnerability(merged)
-                    else:
-                        # 更新数据库
-                        self.db.update_vulnerability(cleaned_group[0])
-                        
-                except Exception as e:
-                    logger.error(f"Failed to clean vulnerability {vuln_id}: {str(e)}")
-                    stats['failed'] += 1
+            # 多线程清洗和合并每组漏洞，清洗结果按完成顺序分批写入数据库
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # 按ID分组
+                futures = {
+                    executor.submit(self._clean_group, list(group)): vuln_id
+                    for vuln_id, group in groupby(vulns, key=attrgetter('id'))
+                }
+                self.db.add_vulnerabilities(self._iter_cleaned(futures, stats))
             
             logger.info(f"Cleaning completed: {stats}")
             
@@ -14,11 +14,12 @@
 import os
 import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 
 from ..models.database import Database
+from ..models.entities import Vulnerability
 from ..collectors.base import BaseVulnerabilityCollector
 from ..collectors.nvd import NVDCollector
 from ..collectors.github import GitHubCollector
@@ -33,7 +34,8 @@ class CollectorService:
     def __init__(self,
                 config_path: str = "config/sources.json",
                 db_url: str = "sqlite:///data/vulnerabilities.db",
-                max_workers: int = 4):
+                max_workers: int = 4,
+                batch_size: int = 500):
         """
         初始化采集服务
         
@@ -41,10 +43,12 @@ class CollectorService:
             config_path: 配置文件路径
             db_url: 数据库连接URL
             max_workers: 最大工作线程数
+            batch_size: 每次写入数据库的记录数
         """
         self.config_path = config_path
         self.db = Database(db_url)
         self.max_workers = max_workers
+        self.batch_size = batch_size
         self.collectors: Dict[str, BaseVulnerabilityCollector] = {}
         
         # 加载配置
@@ -78,15 +82,24 @@ class CollectorService:
                                source: str,
                                collector: BaseVulnerabilityCollector,
                                start_date: Optional[datetime] = None,
-                               end_date: Optional[datetime] = None) -> int:
+                               end_date: Optional[datetime] = None,
+                               queue: Optional[asyncio.Queue] = None,
+                               default_start: Optional[datetime] = None) -> int:
         """
         从指定数据源采集数据
         
+        采集器每产出一批数据就交给写入队列，网络请求与数据库写入重叠进行，
+        内存中只保留尚未写入的批次。
+        未指定开始日期时从该数据源上次同步到的时间开始，只采集之后修改过的数据；
+        全部数据写入成功后，把同步时间推进到本次数据中最新的修改时间。
+        
         Args:
             source: 数据源名称
             collector: 采集器实例
-            start_date: 开始日期
+            start_date: 开始日期，优先于上次同步时间
             end_date: 结束日期
+            queue: 数据库写入队列，未指定时直接在线程池中写入
+            default_start: 数据源从未同步过时使用的开始日期
             
         Returns:
             采集的漏洞数量
@@ -94,14 +107,32 @@ class CollectorService:
         try:
             logger.info(f"Collecting vulnerabilities from {source}")
             
-            # 获取漏洞数据
-            vulns = await collector.fetch_data(start_date, end_date)
-            count = len(vulns)
+            if start_date is None:
+                start_date = await asyncio.to_thread(self.db.get_last_sync, source) or default_start
             
-            # 保存到数据库
-            for vuln in vulns:
-                self.db.add_vulnerability(vuln)
-                
+            count = 0
+            latest = None
+            async for records in collector.iter_data(start_date, end_date, batch_size=self.batch_size):
+                # 采集器产出清理后的字典，转换为漏洞实体后再计算同步时间和写入
+                batch = await asyncio.to_thread(self._to_entities, source, collector, records)
+                count += len(batch)
+                modified = [v.last_modified_date for v in batch if v.last_modified_date]
+                if modified:
+                    latest = max(latest, *modified) if latest else max(modified)
+                    
+                if queue is not None:
+                    # 队列已满时等待写入任务消化，限制内存中积压的批次
+                    await queue.put((source, batch, None))
+                else:
+                    await asyncio.to_thread(self.db.add_vulnerabilities, batch)
+                    
+            # 同步时间排在该数据源所有批次之后，由写入任务在批次都写入成功后更新
+            if latest is not None:
+                if queue is not None:
+                    await queue.put((source, None, latest))
+                else:
+                    await asyncio.to_thread(self.db.set_last_sync, source, latest)
+                    
             logger.info(f"Collected {count} vulnerabilities from {source}")
             return count
             
@@ -109,17 +140,70 @@ class CollectorService:
             logger.error(f"Failed to collect from {source}: {str(e)}")
             return 0
     
+    def _to_entities(self,
+                     source: str,
+                     collector: BaseVulnerabilityCollector,
+                     records: List[Dict[str, Any]]) -> List[Vulnerability]:
+        """
+        将一批清理后的记录转换为漏洞实体
+        
+        清理失败时采集器会原样返回原始数据，这类无法转换的记录记录日志后跳过，
+        不影响同批其他记录的写入。
+        
+        Args:
+            source: 数据源名称
+            collector: 采集器实例
+            records: 清理后的漏洞数据
+            
+        Returns:
+            漏洞实体列表
+        """
+        batch = []
+        for record in records:
+            try:
+                batch.append(collector.to_vulnerability(record))
+            except Exception as e:
+                logger.warning(f"Skipping unconvertible record from {source}: {str(e)}")
+        return batch
+    
+    async def _db_writer(self, queue: asyncio.Queue) -> None:
+        """
+        数据库写入任务
+        
+        从队列中逐批取出漏洞数据，在线程池中批量写入数据库；
+        所有数据源共用这一个写入任务，避免并发写入争用数据库锁。
+        队列中的同步时间只在该数据源此前的批次全部写入成功时才记录。
+        
+        Args:
+            queue: 数据库写入队列，元素为(数据源, 漏洞批次, 同步时间)
+        """
+        failed_sources = set()
+        while True:
+            source, batch, last_sync_at = await queue.get()
+            try:
+                if batch:
+                    await asyncio.to_thread(self.db.add_vulnerabilities, batch)
+                if last_sync_at is not None and source not in failed_sources:
+                    await asyncio.to_thread(self.db.set_last_sync, source, last_sync_at)
+            except Exception as e:
+                failed_sources.add(source)
+                logger.error(f"Failed to save vulnerabilities from {source}: {str(e)}")
+            finally:
+                queue.task_done()
+    
     async def collect_all(self,
                        start_date: Optional[datetime] = None,
                        end_date: Optional[datetime] = None,
-                       sources: Optional[List[str]] = None) -> Dict[str, int]:
+                       sources: Optional[List[str]] = None,
+                       default_start: Optional[datetime] = None) -> Dict[str, int]:
         """
         从所有数据源采集数据
         
         Args:
-            start_date: 开始日期
+            start_date: 开始日期，未指定时各数据源从上次同步时间开始
             end_date: 结束日期
             sources: 指定的数据源列表，默认为所有数据源
+            default_start: 数据源从未同步过时使用的开始日期
             
         Returns:
             各数据源采集的漏洞数量
@@ -127,6 +211,10 @@ class CollectorService:
         if sources is None:
             sources = list(self.collectors.keys())
             
+        # 各数据源的采集结果经由有界队列交给同一个写入任务
+        queue = asyncio.Queue(maxsize=2 * self.max_workers)
+        writer = asyncio.create_task(self._db_writer(queue))
+            
         # 创建采集任务
         tasks = []
         for source in sources:
@@ -135,14 +223,23 @@ class CollectorService:
                     source,
                     self.collectors[source],
                     start_date,
-                    end_date
+                    end_date,
+                    queue,
+                    default_start
                 )
                 tasks.append(task)
             else:
                 logger.warning(f"Unknown source: {source}")
         
-        # 并行执行采集任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 并行执行采集任务，等待队列中的数据全部写入后结束写入任务
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await queue.join()
+        finally:
+            writer.cancel()
+            for source in sources:
+                if source in self.collectors:
+                    await self.collectors[source].close()
         
         # 统计结果
         stats = {}
@@ -155,29 +252,52 @@ class CollectorService:
         
         return stats
     
+    async def _run(self,
+                  start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None,
+                  sources: Optional[List[str]] = None,
+                  default_start: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        在新的事件循环中运行采集任务
+        
+        事件循环的默认线程池按max_workers放大，数据库写入等阻塞调用较多时
+        不会因默认线程数不足而排队；线程池随asyncio.run结束一并关闭。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            sources: 指定的数据源列表
+            default_start: 数据源从未同步过时使用的开始日期
+            
+        Returns:
+            各数据源采集的漏洞数量
+        """
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_workers * 4, thread_name_prefix='collector')
+        )
+        return await self.collect_all(start_date, end_date, sources, default_start)
+    
     def run_incremental(self,
                       days: int = 7,
                       sources: Optional[List[str]] = None) -> Dict[str, int]:
         """
         运行增量更新
         
+        各数据源从上次同步到的时间开始采集，从未同步过的数据源采集最近days天的数据。
+        
         Args:
-            days: 更新最近几天的数据
+            days: 数据源没有同步记录时更新最近几天的数据
             sources: 指定的数据源列表
             
         Returns:
             各数据源采集的漏洞数量
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        # 同步时间按不带时区的UTC时间保存，结束时间同样使用UTC，
+        # 否则在UTC以西的时区上次同步时间会晚于结束时间
+        end_date = datetime.now(timezone.utc).replace(tzinfo=None)
         
         # 运行异步采集任务
-        loop = asyncio.get_event_loop()
-        stats = loop.run_until_complete(
-            self.collect_all(start_date, end_date, sources)
-        )
-        
-        return stats
+        return asyncio.run(self._run(None, end_date, sources, end_date - timedelta(days=days)))
     
     def run_full(self,
                start_date: Optional[datetime] = None,
@@ -195,12 +315,7 @@ class CollectorService:
             各数据源采集的漏洞数量
         """
         # 运行异步采集任务
-        loop = asyncio.get_event_loop()
-        stats = loop.run_until_complete(
-            self.collect_all(start_date, end_date, sources)
-        )
-        
-        return stats
+        return asyncio.run(self._run(start_date, end_date, sources))
 
 """
 使用示例：
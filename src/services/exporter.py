@@ -13,25 +13,137 @@
 """
 
 import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterable
 import json
 import pandas as pd
 import jinja2
+import xlsxwriter
 from markdown2 import Markdown
 
 from ..models.database import Database
-from ..models.entities import Vulnerability
 from ..utils.logger import logger
 from ..utils.file import FileHandler, SafeFileHandler
 
+# export_all支持的导出格式
+_EXPORT_FORMATS = ('json', 'csv', 'excel', 'html', 'markdown')
+
+# 初始化时预先加载的默认报告模板
+_DEFAULT_TEMPLATES = ('report.html', 'report.md')
+
+# CSV导出中漏洞的字段
+_CSV_COLUMNS = (
+    'id', 'source', 'title', 'description', 'published_date', 'last_modified_date',
+    'severity', 'status', 'cvss_v3_score', 'cvss_v3_vector', 'cvss_v2_score', 'cvss_v2_vector'
+)
+
+# CSV导出中受影响包的字段及对应的列名
+_CSV_PACKAGE_COLUMNS = {
+    'name': 'package_name',
+    'ecosystem': 'package_ecosystem',
+    'platform': 'package_platform',
+    'affected_versions': 'affected_versions',
+    'fixed_versions': 'fixed_versions'
+}
+
+def _write_sheet(workbook: xlsxwriter.Workbook,
+                 name: str,
+                 header: Tuple[str, ...],
+                 rows: Iterable[Tuple]) -> None:
+    """
+    添加工作表并按行顺序写入表头和数据
+    
+    Args:
+        workbook: xlsxwriter工作簿
+        name: 工作表名称
+        header: 表头
+        rows: 数据行，按行号递增的顺序产出
+    """
+    worksheet = workbook.add_worksheet(name)
+    worksheet.freeze_panes(1, 0)
+    worksheet.write_row(0, 0, header)
+    for row_num, row in enumerate(rows, 1):
+        worksheet.write_row(row_num, 0, row)
+
+def _write_excel(output_file: str, data: List[Dict]) -> None:
+    """
+    把准备好的导出数据写入Excel文件
+    
+    Args:
+        output_file: 输出文件路径
+        data: 准备好的导出数据
+    """
+    # 按行流式写入：constant_memory模式下每写完一行即刷新到临时文件，内存占用与行数无关。
+    # pandas的to_excel按列逐个写入单元格，与该模式不兼容，因此直接使用xlsxwriter逐行写入
+    workbook = xlsxwriter.Workbook(output_file, {
+        'constant_memory': True,
+        'strings_to_urls': False
+    })
+    try:
+        _write_sheet(workbook, 'Vulnerabilities', (
+            'ID', 'Source', 'Title', 'Severity', 'Status', 'Published Date', 'CVSS v3', 'CVSS v2'
+        ), (
+            (item['id'], item['source'], item['title'], item['severity'], item['status'],
+             item['published_date'], item.get('cvss_v3_score'), item.get('cvss_v2_score'))
+            for item in data
+        ))
+        _write_sheet(workbook, 'Affected Packages', (
+            'Vulnerability ID', 'Package Name', 'Ecosystem', 'Platform',
+            'Affected Versions', 'Fixed Versions'
+        ), (
+            (item['id'], pkg['name'], pkg['ecosystem'], pkg['platform'],
+             ', '.join(pkg['affected_versions'] or ()), ', '.join(pkg['fixed_versions'] or ()))
+            for item in data
+            for pkg in item['affected_packages']
+        ))
+        _write_sheet(workbook, 'References', (
+            'Vulnerability ID', 'URL', 'Source', 'Type'
+        ), (
+            (item['id'], ref['url'], ref['source'], ref['type'])
+            for item in data
+            for ref in item['references']
+        ))
+    finally:
+        workbook.close()
+
+def _export_excel_from_db(db_url: str,
+                          output_file: str,
+                          source: Optional[str],
+                          start_date: Optional[datetime],
+                          end_date: Optional[datetime]) -> int:
+    """
+    在子进程中查询漏洞数据并写入Excel文件
+    
+    子进程使用自己的数据库连接读取数据，不必把准备好的数据序列化后传入。
+    
+    Args:
+        db_url: 数据库连接URL
+        output_file: 输出文件路径
+        source: 数据源
+        start_date: 开始日期
+        end_date: 结束日期
+        
+    Returns:
+        导出的漏洞数量
+    """
+    db = Database(db_url)
+    try:
+        data = db.get_vulnerabilities_prepared(source, start_date, end_date)
+        _write_excel(output_file, data)
+        return len(data)
+    finally:
+        db.engine.dispose()
+
 class ExporterService:
     """数据导出服务"""
     
     def __init__(self,
                 db_url: str = "sqlite:///data/vulnerabilities.db",
                 template_dir: str = "templates",
-                output_dir: str = "exports"):
+                output_dir: str = "exports",
+                cache_dir: Optional[str] = ".jinja_cache"):
         """
         初始化导出服务
         
@@ -39,6 +151,7 @@ class ExporterService:
             db_url: 数据库连接URL
             template_dir: 模板目录
             output_dir: 输出目录
+            cache_dir: 模板字节码缓存目录，为None时不缓存
         """
         self.db = Database(db_url)
         self.template_dir = template_dir
@@ -47,74 +160,113 @@ class ExporterService:
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
-        # 初始化模板引擎
+        # 初始化模板引擎：编译结果缓存到磁盘，进程重启后不必重新解析模板；
+        # 导出期间模板不会变化，关闭每次取模板时的修改时间检查
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
         self.jinja_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(template_dir),
-            autoescape=True
+            autoescape=True,
+            auto_reload=False,
+            bytecode_cache=bytecode_cache
         )
         
+        # 预先加载默认模板，模板目录中不存在的跳过
+        self._templates: Dict[str, jinja2.Template] = {}
+        for name in _DEFAULT_TEMPLATES:
+            try:
+                self._templates[name] = self.jinja_env.get_template(name)
+            except jinja2.TemplateNotFound:
+                pass
+        
         # 初始化Markdown转换器
         self.markdown = Markdown(extras=['tables', 'fenced-code-blocks'])
+        
+        # 已准备好的导出数据及读取时数据范围的指纹，按(数据源, 开始日期, 结束日期)索引，
+        # 同一范围导出多种格式时只查询和转换一次
+        self._data_cache: Dict[tuple, Tuple[Tuple[int, Optional[datetime]], List[Dict]]] = {}
+        self._data_version = self.db.data_version
+        
+        # 各导出最近一次的输出文件及当时数据范围的指纹，按(格式, 数据源, 开始日期, 结束日期[, 模板])索引
+        self._last_outputs: Dict[tuple, Tuple[Tuple[int, Optional[datetime]], str]] = {}
+        
+    def invalidate(self) -> None:
+        """清空导出数据缓存，下次导出时重新从数据库读取"""
+        self._data_cache.clear()
+        self._data_version = self.db.data_version
+        
+    def _get_prepared(self,
+                    source: Optional[str],
+                    start_date: Optional[datetime],
+                    end_date: Optional[datetime],
+                    fingerprint: Optional[Tuple[int, Optional[datetime]]] = None) -> List[Dict]:
+        """
+        获取准备好的导出数据，命中缓存时直接返回
+        
+        缓存的数据只在读取时的指纹与当前指纹一致时使用，
+        其他连接或进程写入数据库后（如采集服务入库新数据）同样会重新读取。
+        
+        Args:
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
+            fingerprint: 调用方已计算的当前数据范围指纹，未提供时在这里计算
+            
+        Returns:
+            处理后的数据列表，各导出格式共享，调用方不应修改
+        """
+        if self._data_version != self.db.data_version:
+            self.invalidate()
+            
+        if fingerprint is None:
+            fingerprint = self.db.fingerprint(source, start_date, end_date)
+        key = (source, start_date, end_date)
+        cached = self._data_cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        data = self._prepare_vulnerability_data(source, start_date, end_date)
+        self._data_cache[key] = (fingerprint, data)
+        return data
+    
+    def _previous_output(self,
+                       key: tuple,
+                       fingerprint: Tuple[int, Optional[datetime]]) -> Optional[str]:
+        """
+        查找数据未变化时可以直接复用的上次导出文件
+        
+        Args:
+            key: 导出的格式和参数
+            fingerprint: 当前数据范围的指纹
+            
+        Returns:
+            上次导出的文件路径，数据已变化或文件已不存在时返回None
+        """
+        previous = self._last_outputs.get(key)
+        if previous is None or previous[0] != fingerprint or not os.path.exists(previous[1]):
+            return None
+        logger.info(f"Vulnerabilities unchanged since last export, reusing {previous[1]}")
+        return previous[1]
     
     def _prepare_vulnerability_data(self,
-                                vulns: List[Vulnerability]) -> List[Dict]:
+                                source: Optional[str] = None,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None) -> List[Dict]:
         """
         准备漏洞数据用于导出
         
+        字段的投影和受影响包、参考链接的聚合都在数据库查询中完成。
+        
         Args:
-            vulns: 漏洞列表
+            source: 数据源
+            start_date: 开始日期
+            end_date: 结束日期
             
         Returns:
             处理后的数据列表
         """
-        data = []
-        
-        for vuln in vulns:
-            # 基本信息
-            item = {
-                'id': vuln.id,
-                'source': vuln.source,
-                'title': vuln.title,
-                'description': vuln.description,
-                'published_date': vuln.published_date.isoformat() if vuln.published_date else None,
-                'last_modified_date': vuln.last_modified_date.isoformat() if vuln.last_modified_date else None,
-                'severity': vuln.severity,
-                'status': vuln.status
-            }
-            
-            # CVSS评分
-            if vuln.cvss_v3:
-                item['cvss_v3_score'] = vuln.cvss_v3.base_score
-                item['cvss_v3_vector'] = vuln.cvss_v3.vector_string
-            if vuln.cvss_v2:
-                item['cvss_v2_score'] = vuln.cvss_v2.base_score
-                item['cvss_v2_vector'] = vuln.cvss_v2.vector_string
-            
-            # 受影响的包
-            item['affected_packages'] = []
-            for pkg in vuln.affected_packages:
-                pkg_info = {
-                    'name': pkg.name,
-                    'ecosystem': pkg.ecosystem,
-                    'platform': pkg.platform,
-                    'affected_versions': pkg.affected_versions,
-                    'fixed_versions': pkg.fixed_versions
-                }
-                item['affected_packages'].append(pkg_info)
-            
-            # 参考链接
-            item['references'] = [
-                {
-                    'url': ref.url,
-                    'source': ref.source,
-                    'type': ref.type
-                }
-                for ref in vuln.references
-            ]
-            
-            data.append(item)
-            
-        return data
+        return self.db.get_vulnerabilities_prepared(source, start_date, end_date)
     
     def export_json(self,
                   start_date: Optional[datetime] = None,
@@ -133,9 +285,16 @@ class ExporterService:
         Returns:
             输出文件路径
         """
+        # 数据未变化时直接返回上次导出的文件
+        key = ('json', source, start_date, end_date)
+        fingerprint = self.db.fingerprint(source, start_date, end_date)
+        if not output_file:
+            previous = self._previous_output(key, fingerprint)
+            if previous:
+                return previous
+        
         # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
-        data = self._prepare_vulnerability_data(vulns)
+        data = self._get_prepared(source, start_date, end_date, fingerprint)
         
         # 生成输出文件路径
         if not output_file:
@@ -145,11 +304,12 @@ class ExporterService:
         # 安全写入文件
         SafeFileHandler.safe_write(
             output_file,
-            FileHandler.write_json,
+            FileHandler.write_json_streaming,
             data
         )
         
         logger.info(f"Exported {len(data)} vulnerabilities to {output_file}")
+        self._last_outputs[key] = (fingerprint, output_file)
         return output_file
     
     def export_csv(self,
@@ -169,46 +329,33 @@ class ExporterService:
         Returns:
             输出文件路径
         """
+        # 数据未变化时直接返回上次导出的文件
+        key = ('csv', source, start_date, end_date)
+        fingerprint = self.db.fingerprint(source, start_date, end_date)
+        if not output_file:
+            previous = self._previous_output(key, fingerprint)
+            if previous:
+                return previous
+        
         # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
-        data = self._prepare_vulnerability_data(vulns)
-        
-        # 展平数据结构
-        flattened_data = []
-        for item in data:
-            # 基本字段
-            flat_item = {
-                'id': item['id'],
-                'source': item['source'],
-                'title': item['title'],
-                'description': item['description'],
-                'published_date': item['published_date'],
-                'last_modified_date': item['last_modified_date'],
-                'severity': item['severity'],
-                'status': item['status'],
-                'cvss_v3_score': item.get('cvss_v3_score'),
-                'cvss_v3_vector': item.get('cvss_v3_vector'),
-                'cvss_v2_score': item.get('cvss_v2_score'),
-                'cvss_v2_vector': item.get('cvss_v2_vector')
-            }
-            
-            # 受影响的包
-            packages = item['affected_packages']
-            if packages:
-                flat_item.update({
-                    'package_name': packages[0]['name'],
-                    'package_ecosystem': packages[0]['ecosystem'],
-                    'package_platform': packages[0]['platform'],
-                    'affected_versions': ', '.join(packages[0]['affected_versions']),
-                    'fixed_versions': ', '.join(packages[0]['fixed_versions'])
-                })
-            
-            # 参考链接
-            references = item['references']
-            if references:
-                flat_item['reference_urls'] = ', '.join(ref['url'] for ref in references)
-            
-            flattened_data.append(flat_item)
+        data = self._get_prepared(source, start_date, end_date, fingerprint)
+        
+        # 展平数据结构：每个受影响的包一行，没有受影响包的漏洞保留一行
+        df = pd.DataFrame(data, columns=[*_CSV_COLUMNS, 'affected_packages', 'references'])
+        df['reference_urls'] = [', '.join(ref['url'] for ref in refs) for refs in df.pop('references')]
+        df = df.explode('affected_packages', ignore_index=True)
+        
+        packages = df.pop('affected_packages')
+        has_package = packages.notna()
+        df = df.join(
+            pd.DataFrame(packages[has_package].tolist(),
+                         index=packages.index[has_package],
+                         columns=list(_CSV_PACKAGE_COLUMNS))
+            .rename(columns=_CSV_PACKAGE_COLUMNS)
+        )
+        for column in ('affected_versions', 'fixed_versions'):
+            df[column] = df[column].astype(object).str.join(', ')
+        df = df[[*_CSV_COLUMNS, *_CSV_PACKAGE_COLUMNS.values(), 'reference_urls']]
         
         # 生成输出文件路径
         if not output_file:
@@ -216,13 +363,10 @@ class ExporterService:
             output_file = os.path.join(self.output_dir, f'vulnerabilities_{timestamp}.csv')
         
         # 安全写入文件
-        SafeFileHandler.safe_write(
-            output_file,
-            FileHandler.write_csv,
-            flattened_data
-        )
+        SafeFileHandler.safe_write(output_file, df.to_csv, index=False)
         
         logger.info(f"Exported {len(data)} vulnerabilities to {output_file}")
+        self._last_outputs[key] = (fingerprint, output_file)
         return output_file
     
     def export_excel(self,
@@ -242,65 +386,26 @@ class ExporterService:
         Returns:
             输出文件路径
         """
+        # 数据未变化时直接返回上次导出的文件
+        key = ('excel', source, start_date, end_date)
+        fingerprint = self.db.fingerprint(source, start_date, end_date)
+        if not output_file:
+            previous = self._previous_output(key, fingerprint)
+            if previous:
+                return previous
+        
         # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
-        data = self._prepare_vulnerability_data(vulns)
+        data = self._get_prepared(source, start_date, end_date, fingerprint)
         
-        # 创建Excel writer
+        # 生成输出文件路径
         if not output_file:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_file = os.path.join(self.output_dir, f'vulnerabilities_{timestamp}.xlsx')
         
-        # 创建数据框
-        df_vulns = pd.DataFrame([
-            {
-                'ID': item['id'],
-                'Source': item['source'],
-                'Title': item['title'],
-                'Severity': item['severity'],
-                'Status': item['status'],
-                'Published Date': item['published_date'],
-                'CVSS v3': item.get('cvss_v3_score'),
-                'CVSS v2': item.get('cvss_v2_score')
-            }
-            for item in data
-        ])
-        
-        # 创建受影响包的数据框
-        packages_data = []
-        for item in data:
-            vuln_id = item['id']
-            for pkg in item['affected_packages']:
-                packages_data.append({
-                    'Vulnerability ID': vuln_id,
-                    'Package Name': pkg['name'],
-                    'Ecosystem': pkg['ecosystem'],
-                    'Platform': pkg['platform'],
-                    'Affected Versions': ', '.join(pkg['affected_versions']),
-                    'Fixed Versions': ', '.join(pkg['fixed_versions'])
-                })
-        df_packages = pd.DataFrame(packages_data)
-        
-        # 创建参考链接的数据框
-        references_data = []
-        for item in data:
-            vuln_id = item['id']
-            for ref in item['references']:
-                references_data.append({
-                    'Vulnerability ID': vuln_id,
-                    'URL': ref['url'],
-                    'Source': ref['source'],
-                    'Type': ref['type']
-                })
-        df_references = pd.DataFrame(references_data)
-        
-        # 写入Excel文件
-        with pd.ExcelWriter(output_file) as writer:
-            df_vulns.to_excel(writer, sheet_name='Vulnerabilities', index=False)
-            df_packages.to_excel(writer, sheet_name='Affected Packages', index=False)
-            df_references.to_excel(writer, sheet_name='References', index=False)
+        _write_excel(output_file, data)
         
         logger.info(f"Exported {len(data)} vulnerabilities to {output_file}")
+        self._last_outputs[key] = (fingerprint, output_file)
         return output_file
     
     def export_html(self,
@@ -322,9 +427,16 @@ class ExporterService:
         Returns:
             输出文件路径
         """
+        # 数据未变化时直接返回上次导出的文件
+        key = ('html', source, start_date, end_date, template)
+        fingerprint = self.db.fingerprint(source, start_date, end_date)
+        if not output_file:
+            previous = self._previous_output(key, fingerprint)
+            if previous:
+                return previous
+        
         # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
-        data = self._prepare_vulnerability_data(vulns)
+        data = self._get_prepared(source, start_date, end_date, fingerprint)
         
         # 生成输出文件路径
         if not output_file:
@@ -333,10 +445,10 @@ class ExporterService:
         
         try:
             # 加载模板
-            template = self.jinja_env.get_template(template)
+            template = self._templates.get(template) or self.jinja_env.get_template(template)
             
-            # 渲染HTML
-            html = template.render(
+            # 流式渲染HTML，边生成边写入文件，不在内存中拼接完整的报告
+            chunks = template.generate(
                 vulnerabilities=data,
                 generated_at=datetime.now().isoformat(),
                 total_count=len(data)
@@ -345,11 +457,12 @@ class ExporterService:
             # 写入文件
             SafeFileHandler.safe_write(
                 output_file,
-                FileHandler.write_text,
-                html
+                FileHandler.write_stream,
+                chunks
             )
             
             logger.info(f"Exported HTML report to {output_file}")
+            self._last_outputs[key] = (fingerprint, output_file)
             return output_file
             
         except Exception as e:
@@ -375,9 +488,16 @@ class ExporterService:
         Returns:
             输出文件路径
         """
+        # 数据未变化时直接返回上次导出的文件
+        key = ('markdown', source, start_date, end_date, template)
+        fingerprint = self.db.fingerprint(source, start_date, end_date)
+        if not output_file:
+            previous = self._previous_output(key, fingerprint)
+            if previous:
+                return previous
+        
         # 获取漏洞数据
-        vulns = self.db.get_vulnerabilities(source, start_date, end_date)
-        data = self._prepare_vulnerability_data(vulns)
+        data = self._get_prepared(source, start_date, end_date, fingerprint)
         
         # 生成输出文件路径
         if not output_file:
@@ -386,10 +506,10 @@ class ExporterService:
         
         try:
             # 加载模板
-            template = self.jinja_env.get_template(template)
+            template = self._templates.get(template) or self.jinja_env.get_template(template)
             
-            # 渲染Markdown
-            markdown = template.render(
+            # 流式渲染Markdown，边生成边写入文件，不在内存中拼接完整的报告
+            chunks = template.generate(
                 vulnerabilities=data,
                 generated_at=datetime.now().isoformat(),
                 total_count=len(data)
@@ -398,16 +518,224 @@ class ExporterService:
             # 写入文件
             SafeFileHandler.safe_write(
                 output_file,
-                FileHandler.write_text,
-                markdown
+                FileHandler.write_stream,
+                chunks
             )
             
             logger.info(f"Exported Markdown report to {output_file}")
+            self._last_outputs[key] = (fingerprint, output_file)
             return output_file
             
         except Exception as e:
             logger.error(f"Failed to generate Markdown report: {str(e)}")
             raise
+    
+    async def export_json_async(self,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None,
+                                source: Optional[str] = None,
+                                output_file: Optional[str] = None) -> str:
+        """
+        导出为JSON格式的协程版本
+        
+        数据查询、格式转换和文件写入都在默认线程池中执行，不阻塞事件循环。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        return await asyncio.to_thread(
+            self.export_json, start_date, end_date, source, output_file
+        )
+    
+    async def export_csv_async(self,
+                               start_date: Optional[datetime] = None,
+                               end_date: Optional[datetime] = None,
+                               source: Optional[str] = None,
+                               output_file: Optional[str] = None) -> str:
+        """
+        导出为CSV格式的协程版本
+        
+        数据查询、格式转换和文件写入都在默认线程池中执行，不阻塞事件循环。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        return await asyncio.to_thread(
+            self.export_csv, start_date, end_date, source, output_file
+        )
+    
+    async def export_excel_async(self,
+                                 start_date: Optional[datetime] = None,
+                                 end_date: Optional[datetime] = None,
+                                 source: Optional[str] = None,
+                                 output_file: Optional[str] = None) -> str:
+        """
+        导出为Excel格式的协程版本
+        
+        数据查询、格式转换和文件写入都在默认线程池中执行，不阻塞事件循环。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        return await asyncio.to_thread(
+            self.export_excel, start_date, end_date, source, output_file
+        )
+    
+    async def export_html_async(self,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None,
+                                source: Optional[str] = None,
+                                template: str = "report.html",
+                                output_file: Optional[str] = None) -> str:
+        """
+        导出为HTML报告的协程版本
+        
+        数据查询、格式转换和文件写入都在默认线程池中执行，不阻塞事件循环。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            template: 模板文件名
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        return await asyncio.to_thread(
+            self.export_html, start_date, end_date, source, template, output_file
+        )
+    
+    async def export_markdown_async(self,
+                                    start_date: Optional[datetime] = None,
+                                    end_date: Optional[datetime] = None,
+                                    source: Optional[str] = None,
+                                    template: str = "report.md",
+                                    output_file: Optional[str] = None) -> str:
+        """
+        导出为Markdown报告的协程版本
+        
+        数据查询、格式转换和文件写入都在默认线程池中执行，不阻塞事件循环。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            template: 模板文件名
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        return await asyncio.to_thread(
+            self.export_markdown, start_date, end_date, source, template, output_file
+        )
+
+    
+    async def export_all_async(self,
+                               formats: Iterable[str] = _EXPORT_FORMATS,
+                               start_date: Optional[datetime] = None,
+                               end_date: Optional[datetime] = None,
+                               source: Optional[str] = None) -> Dict[str, str]:
+        """
+        同时导出多种格式
+        
+        JSON、CSV和报告在线程池中并发导出，共享同一份缓存的漏洞数据；
+        Excel的逐行写入是纯Python的CPU密集操作，在单独的进程中自行查询数据并写入，
+        不与其他格式争用GIL，也不必把准备好的数据序列化传给子进程。
+        
+        Args:
+            formats: 导出格式，可选json、csv、excel、html、markdown
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            
+        Returns:
+            格式到输出文件路径的映射
+            
+        Raises:
+            ValueError: 格式不受支持时抛出
+        """
+        formats = list(dict.fromkeys(formats))
+        unsupported = set(formats).difference(_EXPORT_FORMATS)
+        if unsupported:
+            raise ValueError(f"Unsupported export formats: {sorted(unsupported)}")
+            
+        loop = asyncio.get_running_loop()
+        db_url = self.db.engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            # 先提交Excel任务：提交时即创建子进程，须在本次导出启动其他线程之前完成。
+            # 随后在本进程中准备一次数据，其余格式直接命中缓存
+            tasks = {}
+            if 'excel' in formats:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                output_file = os.path.join(self.output_dir, f'vulnerabilities_{timestamp}.xlsx')
+                future = loop.run_in_executor(
+                    pool, _export_excel_from_db, db_url, output_file, source, start_date, end_date
+                )
+                tasks['excel'] = self._await_export(future, output_file)
+            await asyncio.to_thread(self._get_prepared, source, start_date, end_date)
+            
+            for fmt in formats:
+                if fmt != 'excel':
+                    tasks[fmt] = asyncio.to_thread(
+                        getattr(self, f'export_{fmt}'), start_date, end_date, source
+                    )
+            output_files = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+            
+        return {fmt: output_files[fmt] for fmt in formats}
+    
+    async def _await_export(self, future: asyncio.Future, output_file: str) -> str:
+        """
+        等待子进程中的导出完成并记录日志
+        
+        Args:
+            future: 返回导出数量的子进程任务
+            output_file: 输出文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        count = await future
+        logger.info(f"Exported {count} vulnerabilities to {output_file}")
+        return output_file
+    
+    def export_all(self,
+                  formats: Iterable[str] = _EXPORT_FORMATS,
+                  start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None,
+                  source: Optional[str] = None) -> Dict[str, str]:
+        """
+        同时导出多种格式，export_all_async的同步版本
+        
+        Args:
+            formats: 导出格式，可选json、csv、excel、html、markdown
+            start_date: 开始日期
+            end_date: 结束日期
+            source: 数据源
+            
+        Returns:
+            格式到输出文件路径的映射
+        """
+        return asyncio.run(self.export_all_async(formats, start_date, end_date, source))
 
 """
 使用示例：
@@ -439,7 +767,14 @@ html_file = exporter.export_html(template='custom_report.html')
 # 指定输出文件
 md_file = exporter.export_markdown(output_file='vulnerability_report.md')
 
-6. 模板示例:
+6. 异步导出:
+# 在事件循环中导出，不阻塞其他协程
+json_file = await exporter.export_json_async(start_date, end_date)
+
+7. 同时导出多种格式:
+files = exporter.export_all(['json', 'csv', 'excel'], start_date, end_date)
+
+8. 模板示例:
 
 HTML模板 (templates/report.html):
 <!DOCTYPE html>
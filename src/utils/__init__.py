@@ -8,10 +8,10 @@
 """
 
 from .logger import setup_logger
-from .http import make_request, handle_rate_limit
+from .http import HTTPClient, handle_rate_limit
 
 __all__ = [
     'setup_logger',
-    'make_request',
+    'HTTPClient',
     'handle_rate_limit'
 ] 
\ No newline at end of file
@@ -13,19 +13,165 @@
 """
 
 import os
-import json
+import math
 import csv
 import yaml
-import gzip
+import orjson
+import pandas as pd
 import shutil
 import tempfile
-from typing import Dict, List, Any, Union, Optional, TextIO
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, List, Any, Union, Optional, TextIO, Iterable, Iterator
 from pathlib import Path
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    FileSystemEventHandler, FileCreatedEvent, DirCreatedEvent, FileDeletedEvent, DirDeletedEvent,
+    FileModifiedEvent, DirModifiedEvent, FileMovedEvent, DirMovedEvent, FileOpenedEvent,
+    FileClosedEvent, FileClosedNoWriteEvent
+)
 
 from .logger import logger
 
+# 优先使用基于Intel ISA-L的igzip（CRC和LZ77匹配使用SIMD指令），未安装isal时回退到标准库gzip；
+# ISA-L的压缩级别为0-3，级别2的压缩率与zlib的级别6相近，速度快得多
+try:
+    from isal import igzip as _gzip, igzip_threaded as _gzip_threaded
+    _DEFAULT_COMPRESSLEVEL = 2
+except ImportError:
+    import gzip as _gzip
+    _gzip_threaded = None
+    _DEFAULT_COMPRESSLEVEL = 6
+
+# 优先使用基于libyaml的C实现，未编译libyaml时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# 按块复制、压缩和读取文件时的块大小，较大的块可以减少系统调用和zlib调用的次数
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+# 不小于该大小的文件使用多线程的igzip压缩和解压，小文件创建线程和队列的开销得不偿失
+_PARALLEL_GZIP_THRESHOLD = 16 * 1024 * 1024
+
+def _gzip_open(file_path: Union[str, Path], mode: str, size: int, **kwargs) -> Any:
+    """
+    按数据大小选择单线程或多线程的gzip实现打开文件
+    
+    多线程压缩时按块并行压缩，使用所有CPU；解压只能顺序进行，
+    多线程模式下由一个后台线程解压，与写出数据重叠执行。
+    
+    Args:
+        file_path: gzip文件路径
+        mode: 打开模式，'rb'或'wb'
+        size: 数据量（字节），压缩时为源文件大小，解压时为gzip文件大小
+        **kwargs: 传给open的其他参数，如compresslevel
+        
+    Returns:
+        gzip文件对象
+    """
+    if _gzip_threaded is not None and size >= _PARALLEL_GZIP_THRESHOLD:
+        threads = -1 if 'w' in mode else 1
+        return _gzip_threaded.open(file_path, mode, threads=threads,
+                                   block_size=_COPY_BUFFER_SIZE, **kwargs)
+    return _gzip.open(file_path, mode, **kwargs)
+
+# 已确认存在的目录，写文件时不再为同一目录重复调用os.makedirs
+_ensured_dirs = set()
+
+def _open_for_write(file_path: Union[str, Path], mode: str, **kwargs) -> Any:
+    """
+    打开文件用于写入，必要时创建父目录
+    
+    Args:
+        file_path: 文件路径
+        mode: 打开模式
+        **kwargs: open()的其他参数
+        
+    Returns:
+        文件对象
+    """
+    directory = os.path.dirname(file_path)
+    if not directory:
+        return open(file_path, mode, **kwargs)
+    if directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+        return open(file_path, mode, **kwargs)
+    try:
+        return open(file_path, mode, **kwargs)
+    except FileNotFoundError:
+        # 目录在确认之后被删除，重新创建后再试一次
+        os.makedirs(directory, exist_ok=True)
+        return open(file_path, mode, **kwargs)
+
+def _is_json_native(value: Any) -> bool:
+    """判断数据是否只由JSON原生类型组成，即经JSON序列化后读回不会改变"""
+    if value is None or isinstance(value, (str, bool)):
+        return True
+    if isinstance(value, float):
+        # NaN和无穷大会被序列化为null
+        return math.isfinite(value)
+    if isinstance(value, int):
+        # orjson只支持64位整数
+        return -2**63 <= value < 2**64
+    if isinstance(value, list):
+        return all(_is_json_native(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json_native(item) for key, item in value.items())
+    return False
+
+def _read_yaml_cache(cache_path: str, signature: List[int]) -> Optional[Dict]:
+    """
+    读取YAML解析结果缓存
+    
+    Args:
+        cache_path: 缓存文件路径
+        signature: 源文件的[修改时间(纳秒), 大小]
+        
+    Returns:
+        与源文件匹配的缓存内容，缓存不存在、已损坏或已过期时返回None
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict) or cached.get('signature') != signature or 'data' not in cached:
+        return None
+    return cached
+
+def _csv_rows(data: List[Dict], fieldnames: List[str], restval: Any = '',
+              extrasaction: str = 'raise') -> List[Any]:
+    """
+    按字段顺序把字典行展开为列表行，语义与csv.DictWriter一致
+    
+    Args:
+        data: CSV数据列表
+        fieldnames: 字段名列表
+        restval: 缺失字段的填充值
+        extrasaction: 出现多余字段时的处理方式，'raise'或'ignore'
+        
+    Returns:
+        展开后的行列表
+    """
+    fieldset = set(fieldnames)
+    # 键集合与字段完全一致的行（绝大多数情况）由itemgetter在C层一次取出
+    getter = itemgetter(*fieldnames) if len(fieldnames) > 1 else (lambda row: (row[fieldnames[0]],))
+    rows = []
+    for row in data:
+        if row.keys() == fieldset:
+            rows.append(getter(row))
+            continue
+        if extrasaction == 'raise':
+            extra = row.keys() - fieldset
+            if extra:
+                raise ValueError("dict contains fields not in fieldnames: "
+                                 + ", ".join(repr(key) for key in extra))
+        rows.append([row.get(key, restval) for key in fieldnames])
+    return rows
+
 class FileHandler:
     """文件处理类"""
     
@@ -48,9 +194,50 @@ class FileHandler:
             logger.error(f"Failed to read file {file_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def read_bytes(file_path: Union[str, Path]) -> bytes:
+        """
+        读取二进制文件，不经过文本解码
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            文件内容
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            logger.error(f"Failed to read file {file_path}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def iter_lines(file_path: Union[str, Path], encoding: str = 'utf-8') -> Iterator[str]:
+        """
+        逐行读取文本文件
+        
+        通过1 MiB的读缓冲区按块读取，内存中只保留当前块，
+        适合扫描大的日志或SBOM文件，不必像read_text一样读入整个文件。
+        
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码
+            
+        Yields:
+            文件中的每一行，保留原有的换行符
+        """
+        try:
+            with open(file_path, 'r', encoding=encoding, newline='',
+                      buffering=_COPY_BUFFER_SIZE) as f:
+                yield from f
+        except Exception as e:
+            logger.error(f"Failed to read file {file_path}: {str(e)}")
+            raise
+    
     @staticmethod
     def write_text(file_path: Union[str, Path],
-                  content: str,
+                  content: Union[str, bytes, bytearray, memoryview],
                   encoding: str = 'utf-8',
                   append: bool = False) -> None:
         """
@@ -58,34 +245,79 @@ class FileHandler:
         
         Args:
             file_path: 文件路径
-            content: 文件内容
+            content: 文件内容，已编码的字节内容直接按二进制写入
             encoding: 文件编码
             append: 是否追加模式
         """
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            FileHandler.write_bytes(file_path, content, append)
+            return
         mode = 'a' if append else 'w'
         try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, mode, encoding=encoding) as f:
+            with _open_for_write(file_path, mode, encoding=encoding) as f:
                 f.write(content)
         except Exception as e:
             logger.error(f"Failed to write file {file_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def write_bytes(file_path: Union[str, Path],
+                   content: Union[bytes, bytearray, memoryview],
+                   append: bool = False) -> None:
+        """
+        写入二进制文件，不经过文本编码
+        
+        Args:
+            file_path: 文件路径
+            content: 文件内容
+            append: 是否追加模式
+        """
+        mode = 'ab' if append else 'wb'
+        try:
+            with _open_for_write(file_path, mode) as f:
+                f.write(content)
+        except Exception as e:
+            logger.error(f"Failed to write file {file_path}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def write_stream(file_path: Union[str, Path],
+                    chunks: Iterable[str],
+                    encoding: str = 'utf-8') -> None:
+        """
+        逐块写入文本文件
+        
+        分块产出的内容（如模板的流式渲染结果）边生成边写入，不拼接为完整字符串。
+        
+        Args:
+            file_path: 文件路径
+            chunks: 文本块序列，可以是生成器
+            encoding: 文件编码
+        """
+        try:
+            with _open_for_write(file_path, 'w', encoding=encoding) as f:
+                f.writelines(chunks)
+        except Exception as e:
+            logger.error(f"Failed to write file {file_path}: {str(e)}")
+            raise
+    
     @staticmethod
     def read_json(file_path: Union[str, Path], encoding: str = 'utf-8') -> Dict:
         """
         读取JSON文件
         
+        使用orjson直接解析文件的字节内容，不经过文本解码。
+        
         Args:
             file_path: 文件路径
-            encoding: 文件编码
+            encoding: 文件编码，orjson只支持UTF-8，保留该参数以兼容旧的调用
             
         Returns:
             JSON数据
         """
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
         except Exception as e:
             logger.error(f"Failed to read JSON file {file_path}: {str(e)}")
             raise
@@ -98,35 +330,110 @@ class FileHandler:
         """
         写入JSON文件
         
+        使用orjson序列化为UTF-8字节串后写入，非ASCII字符原样输出。
+        
         Args:
             file_path: 文件路径
             data: JSON数据
-            encoding: 文件编码
-            indent: 缩进空格数
+            encoding: 文件编码，orjson只输出UTF-8，保留该参数以兼容旧的调用
+            indent: 是否缩进，orjson只支持2个空格的缩进，非0时按2个空格缩进
         """
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
         try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding=encoding) as f:
-                json.dump(data, f, ensure_ascii=False, indent=indent)
+            with _open_for_write(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=option))
         except Exception as e:
             logger.error(f"Failed to write JSON file {file_path}: {str(e)}")
             raise
     
     @staticmethod
-    def read_yaml(file_path: Union[str, Path], encoding: str = 'utf-8') -> Dict:
+    def write_json_streaming(file_path: Union[str, Path],
+                            items: Iterable[Any],
+                            indent: bool = True,
+                            chunk_size: int = 1000) -> None:
+        """
+        使用orjson分块写入JSON数组文件
+        
+        每次只序列化chunk_size个元素并立即写入，内存中不保留整个文件的字节串；
+        输出与write_json一次性序列化整个列表的结果逐字节相同。
+        
+        Args:
+            file_path: 文件路径
+            items: 数组元素序列，可以是生成器
+            indent: 是否缩进输出
+            chunk_size: 每次序列化的元素数
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # 缩进输出时数组以"[\n"开头、"\n]"结尾，元素之间以",\n"分隔
+        head, sep, tail = (b'[\n', b',\n', b'\n]') if indent else (b'[', b',', b']')
+        
+        items = iter(items)
+        try:
+            with _open_for_write(file_path, 'wb') as f:
+                written = False
+                while True:
+                    chunk = list(islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    # 序列化一段子数组后去掉首尾的括号，拼接结果与整体序列化一致
+                    f.write(sep if written else head)
+                    f.write(orjson.dumps(chunk, option=option)[len(head):-len(tail)])
+                    written = True
+                f.write(tail if written else b'[]')
+        except Exception as e:
+            logger.error(f"Failed to write JSON file {file_path}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def read_yaml(file_path: Union[str, Path],
+                 encoding: str = 'utf-8',
+                 use_cache: bool = True) -> Dict:
         """
         读取YAML文件
         
+        解析结果缓存在同目录的"<文件名>.cache.json"中，并记录源文件的修改时间和大小，
+        源文件未变化时直接读取缓存，不再解析YAML。缓存使用JSON而不是pickle，
+        读取缓存不会执行任何代码；只有全部由JSON原生类型组成的数据才会缓存，
+        含有日期等YAML特有类型时每次仍然解析源文件。
+        
         Args:
             file_path: 文件路径
             encoding: 文件编码
+            use_cache: 是否使用解析结果缓存
             
         Returns:
             YAML数据
         """
         try:
+            if not use_cache:
+                with open(file_path, 'r', encoding=encoding) as f:
+                    return yaml.load(f, Loader=SafeLoader)
+                    
+            cache_path = f'{file_path}.cache.json'
+            stat = os.stat(file_path)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            cached = _read_yaml_cache(cache_path, signature)
+            if cached is not None:
+                return cached['data']
+                
             with open(file_path, 'r', encoding=encoding) as f:
-                return yaml.safe_load(f)
+                data = yaml.load(f, Loader=SafeLoader)
+            if _is_json_native(data):
+                try:
+                    SafeFileHandler.safe_write(
+                        cache_path,
+                        FileHandler.write_json,
+                        {'signature': signature, 'data': data},
+                        indent=0
+                    )
+                except OSError as e:
+                    # 目录不可写等情况下只是不缓存，不影响读取
+                    logger.debug(f"Failed to cache YAML file {file_path}: {str(e)}")
+            return data
         except Exception as e:
             logger.error(f"Failed to read YAML file {file_path}: {str(e)}")
             raise
@@ -144,9 +451,8 @@ class FileHandler:
             encoding: 文件编码
         """
         try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding=encoding) as f:
-                yaml.safe_dump(data, f, allow_unicode=True)
+            with _open_for_write(file_path, 'w', encoding=encoding) as f:
+                yaml.dump(data, f, Dumper=SafeDumper, allow_unicode=True)
         except Exception as e:
             logger.error(f"Failed to write YAML file {file_path}: {str(e)}")
             raise
@@ -176,6 +482,34 @@ class FileHandler:
             logger.error(f"Failed to read CSV file {file_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def read_csv_frame(file_path: Union[str, Path],
+                      encoding: str = 'utf-8',
+                      delimiter: str = ',',
+                      **kwargs) -> pd.DataFrame:
+        """
+        以列式DataFrame读取CSV文件
+        
+        由pandas的C解析器按列读取，不为每行构造字典，适合大文件和后续的向量化处理。
+        与read_csv一致，所有值都按字符串读取，空字段为空字符串而不是NaN。
+        
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码
+            delimiter: 分隔符
+            **kwargs: 传给pandas.read_csv的其他参数
+            
+        Returns:
+            每列一个字段的DataFrame
+        """
+        kwargs.setdefault('dtype', str)
+        kwargs.setdefault('keep_default_na', False)
+        try:
+            return pd.read_csv(file_path, encoding=encoding, sep=delimiter, **kwargs)
+        except Exception as e:
+            logger.error(f"Failed to read CSV file {file_path}: {str(e)}")
+            raise
+    
     @staticmethod
     def write_csv(file_path: Union[str, Path],
                  data: List[Dict],
@@ -195,37 +529,45 @@ class FileHandler:
             **kwargs: 其他CSV写入参数
         """
         try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding=encoding, newline='') as f:
+            with _open_for_write(file_path, 'w', encoding=encoding, newline='') as f:
                 if not fieldnames and data:
                     fieldnames = list(data[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter, **kwargs)
-                writer.writeheader()
-                writer.writerows(data)
+                restval = kwargs.pop('restval', '')
+                extrasaction = kwargs.pop('extrasaction', 'raise')
+                # 先一次性展开为列表行，再交给csv.writer批量写入，省去DictWriter逐行逐字段的字典查找
+                writer = csv.writer(f, delimiter=delimiter, **kwargs)
+                if fieldnames:
+                    writer.writerow(fieldnames)
+                    writer.writerows(_csv_rows(data, fieldnames, restval, extrasaction))
         except Exception as e:
             logger.error(f"Failed to write CSV file {file_path}: {str(e)}")
             raise
     
     @staticmethod
     def compress_file(file_path: Union[str, Path],
-                    output_path: Optional[Union[str, Path]] = None) -> str:
+                    output_path: Optional[Union[str, Path]] = None,
+                    compresslevel: Optional[int] = None) -> str:
         """
         压缩文件
         
         Args:
             file_path: 源文件路径
             output_path: 输出文件路径，默认为源文件路径加.gz后缀
+            compresslevel: gzip压缩级别，默认按所用的实现取速度和压缩率较均衡的级别
             
         Returns:
             压缩后的文件路径
         """
         if output_path is None:
             output_path = str(file_path) + '.gz'
+        if compresslevel is None:
+            compresslevel = _DEFAULT_COMPRESSLEVEL
             
         try:
             with open(file_path, 'rb') as f_in:
-                with gzip.open(output_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                size = os.fstat(f_in.fileno()).st_size
+                with _gzip_open(output_path, 'wb', size, compresslevel=compresslevel) as f_out:
+                    shutil.copyfileobj(f_in, f_out, _COPY_BUFFER_SIZE)
             return output_path
         except Exception as e:
             logger.error(f"Failed to compress file {file_path}: {str(e)}")
@@ -245,17 +587,48 @@ class FileHandler:
             解压后的文件路径
         """
         if output_path is None:
-            output_path = str(file_path).rstrip('.gz')
+            output_path = str(file_path).removesuffix('.gz')
             
         try:
-            with gzip.open(file_path, 'rb') as f_in:
+            with _gzip_open(file_path, 'rb', os.path.getsize(file_path)) as f_in:
                 with open(output_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                    shutil.copyfileobj(f_in, f_out, _COPY_BUFFER_SIZE)
             return output_path
         except Exception as e:
             logger.error(f"Failed to decompress file {file_path}: {str(e)}")
             raise
 
+# 事件处理方法对应的事件类型，用于把inotify的监听掩码收窄到处理器实际实现的事件
+_HANDLER_EVENTS = {
+    'on_created': (FileCreatedEvent, DirCreatedEvent),
+    'on_deleted': (FileDeletedEvent, DirDeletedEvent),
+    'on_modified': (FileModifiedEvent, DirModifiedEvent),
+    'on_moved': (FileMovedEvent, DirMovedEvent),
+    'on_opened': (FileOpenedEvent,),
+    'on_closed': (FileClosedEvent,),
+    'on_closed_no_write': (FileClosedNoWriteEvent,)
+}
+
+def _handler_event_filter(handler: FileSystemEventHandler) -> Optional[List[type]]:
+    """
+    根据处理器重写的事件方法推断需要监听的事件类型
+    
+    Args:
+        handler: 事件处理器
+        
+    Returns:
+        事件类型列表，处理器重写了dispatch或on_any_event时返回None，表示监听全部事件
+    """
+    handler_class = type(handler)
+    if (handler_class.dispatch is not FileSystemEventHandler.dispatch
+            or handler_class.on_any_event is not FileSystemEventHandler.on_any_event):
+        return None
+    event_filter = []
+    for method, event_types in _HANDLER_EVENTS.items():
+        if getattr(handler_class, method) is not getattr(FileSystemEventHandler, method):
+            event_filter.extend(event_types)
+    return event_filter
+
 class FileWatcher:
     """文件监控类"""
     
@@ -272,15 +645,21 @@ class FileWatcher:
         self.observer = Observer()
         self.handlers = []
         
-    def add_handler(self, handler: FileSystemEventHandler):
+    def add_handler(self, handler: FileSystemEventHandler,
+                    event_filter: Optional[List[type]] = None):
         """
         添加事件处理器
         
+        只监听处理器实现了的事件，Linux下inotify不再为目录内文件的每次打开和只读关闭唤醒监控线程。
+        
         Args:
             handler: 事件处理器
+            event_filter: 需要监听的事件类型，默认根据处理器重写的on_*方法推断
         """
+        if event_filter is None:
+            event_filter = _handler_event_filter(handler)
         self.handlers.append(handler)
-        self.observer.schedule(handler, self.path, recursive=self.recursive)
+        self.observer.schedule(handler, self.path, recursive=self.recursive, event_filter=event_filter)
         
     def start(self):
         """启动监控"""
@@ -323,12 +702,48 @@ class SafeFileHandler:
             # 写入临时文件
             write_func(temp_path, *args, **kwargs)
             
-            # 在Windows上，需要先删除目标文件
-            if os.name == 'nt' and os.path.exists(file_path):
-                os.remove(file_path)
-                
+            # 原子性地替换文件，os.replace在Windows上也会覆盖已存在的目标文件
+            os.replace(temp_path, file_path)
+            
+        except Exception:
+            # 清理临时文件
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @staticmethod
+    def safe_write_fd(file_path: Union[str, Path],
+                      write_func: callable,
+                      *args,
+                      mode: str = 'wb',
+                      **kwargs) -> None:
+        """
+        安全写入文件，直接向写入函数传入已打开的临时文件对象
+        
+        与safe_write相同，但复用mkstemp打开的文件描述符，省去写入函数按路径再次打开临时文件。
+        
+        Args:
+            file_path: 目标文件路径
+            write_func: 写入函数，第一个参数为文件对象
+            *args: 写入函数的位置参数
+            mode: 临时文件的打开模式，'wb'或'w'（文本模式使用UTF-8编码）
+            **kwargs: 写入函数的关键字参数
+        """
+        # 创建临时文件
+        temp_fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path),
+            prefix=os.path.basename(file_path) + '.',
+            suffix='.tmp'
+        )
+        
+        try:
+            # 写入临时文件，关闭文件对象时一并关闭文件描述符
+            encoding = None if 'b' in mode else 'utf-8'
+            with os.fdopen(temp_fd, mode, encoding=encoding) as f:
+                write_func(f, *args, **kwargs)
+            
             # 原子性地替换文件
-            os.rename(temp_path, file_path)
+            os.replace(temp_path, file_path)
             
         except Exception:
             # 清理临时文件
@@ -346,6 +761,10 @@ from utils.file import FileHandler
 content = FileHandler.read_text('config.txt')
 FileHandler.write_text('output.txt', 'Hello, World!')
 
+# 读写二进制文件，write_text收到字节内容时同样直接写入
+raw = FileHandler.read_bytes('data.bin')
+FileHandler.write_bytes('copy.bin', raw)
+
 # 读写JSON文件
 data = FileHandler.read_json('config.json')
 FileHandler.write_json('output.json', {'name': 'test'})
@@ -386,4 +805,7 @@ SafeFileHandler.safe_write(
     FileHandler.write_json,
     {'critical': 'data'}
 )
+
+# 写入函数直接接收文件对象
+SafeFileHandler.safe_write_fd('important.bin', lambda f, data: f.write(data), b'payload')
 """ 
\ No newline at end of file
@@ -14,17 +14,22 @@ HTTP请求工具模块
 """
 
 import time
-import json
 import asyncio
-from typing import Dict, Any, Optional, Union
-from datetime import datetime, timedelta
+import logging
+import threading
+import orjson
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Union, Hashable
 import aiohttp
 import requests
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from urllib3.util.retry import Retry
 from cachetools import TTLCache
 
-from .logger import logger
+from .logger import logger, lazy_log
 
 class RateLimiter:
     """请求限速器"""
@@ -39,26 +44,233 @@ class RateLimiter:
         """
         self.calls = calls
         self.period = period
-        self.timestamps = []
+        # 最近calls次请求的单调时钟时间，最早的在左端
+        self.timestamps = deque(maxlen=calls)
         
     async def acquire(self):
         """获取请求许可"""
-        now = datetime.now()
+        while True:
+            now = time.monotonic()
+            
+            # 清理过期的时间戳
+            while self.timestamps and now - self.timestamps[0] >= self.period:
+                self.timestamps.popleft()
+            
+            # 检查是否超过限制
+            if len(self.timestamps) < self.calls:
+                break
+            
+            # 等到最早的请求移出时间窗口后重新检查，期间其他协程可能已占用名额
+            wait_time = self.period - (now - self.timestamps[0])
+            lazy_log(logging.DEBUG, "Rate limit reached, waiting %.2f seconds", wait_time)
+            await asyncio.sleep(wait_time)
         
-        # 清理过期的时间戳
-        self.timestamps = [ts for ts in self.timestamps 
-                         if now - ts < timedelta(seconds=self.period)]
+        # 添加新的时间戳
+        self.timestamps.append(time.monotonic())
+
+class TokenBucket:
+    """同步令牌桶限速器"""
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        初始化令牌桶
         
-        # 检查是否超过限制
-        if len(self.timestamps) >= self.calls:
-            # 计算需要等待的时间
-            wait_time = (self.timestamps[0] + timedelta(seconds=self.period) - now).total_seconds()
+        Args:
+            rate: 每秒补充的令牌数，不大于0时不限速
+            capacity: 令牌桶容量，即允许的突发请求数
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        
+    def _refill(self, now: float) -> None:
+        """按经过的时间补充令牌"""
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = max(self.paused_until - now, 0.0)
+            if self.rate > 0:
+                self._refill(now)
+                if self.tokens < 1:
+                    wait_time = max(wait_time, (1 - self.tokens) / self.rate)
             if wait_time > 0:
-                logger.debug(f"Rate limit reached, waiting {wait_time:.2f} seconds")
-                await asyncio.sleep(wait_time)
+                lazy_log(logging.DEBUG, "Rate limit reached, waiting %.2f seconds", wait_time)
+                time.sleep(wait_time)
+                self._refill(time.monotonic())
+            self.tokens = max(self.tokens - 1, 0.0)
+            
+    def pause(self, seconds: float) -> None:
+        """在指定秒数内暂停发放令牌"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            
+    def adjust_rate(self, rate: float) -> None:
+        """调整补充速率，不超过初始配置的速率"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(rate, self.base_rate) if self.base_rate > 0 else rate
+
+def handle_rate_limit(response: Union[requests.Response, aiohttp.ClientResponse],
+                      bucket: Optional[TokenBucket] = None) -> None:
+    """
+    根据响应头处理服务端限流
+    
+    支持Retry-After以及X-RateLimit-Remaining/X-RateLimit-Reset响应头。
+    配额即将耗尽时降低令牌桶速率，配额耗尽或服务端要求重试等待时暂停请求。
+    
+    Args:
+        response: requests或aiohttp的响应对象
+        bucket: 采集器的令牌桶，为None时直接阻塞等待（异步调用方应始终传入）
+    """
+    headers = response.headers
+    wait_time = 0.0
+    
+    retry_after = headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        wait_time = float(retry_after)
         
-        # 添加新的时间戳
-        self.timestamps.append(now)
+    remaining = headers.get('X-RateLimit-Remaining')
+    reset = headers.get('X-RateLimit-Reset')
+    if remaining is not None and remaining.isdigit() and reset and reset.isdigit():
+        # X-RateLimit-Reset为配额重置的Unix时间戳
+        until_reset = max(float(reset) - time.time(), 0.0)
+        if int(remaining) == 0:
+            wait_time = max(wait_time, until_reset)
+        elif bucket is not None and until_reset > 0:
+            bucket.adjust_rate(int(remaining) / until_reset)
+            
+    if wait_time <= 0:
+        return
+        
+    logger.warning(f"Server rate limit hit, pausing requests for {wait_time:.0f} seconds")
+    if bucket is not None:
+        bucket.pause(wait_time)
+    else:
+        time.sleep(wait_time)
+
+def create_session(max_retries: int = 3,
+                   backoff_factor: float = 0.3,
+                   pool_maxsize: int = 10) -> requests.Session:
+    """
+    创建带重试策略和连接池的会话
+    
+    Args:
+        max_retries: 最大重试次数
+        backoff_factor: 重试延迟因子
+        pool_maxsize: 每个主机保留的最大连接数
+        
+    Returns:
+        会话对象
+    """
+    # 配置重试策略
+    retry_strategy = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# 进程内共享的会话，按重试配置区分
+_shared_sessions: Dict[tuple, requests.Session] = {}
+_shared_sessions_lock = threading.Lock()
+
+def get_shared_session(max_retries: int = 3, backoff_factor: float = 0.3) -> requests.Session:
+    """
+    获取进程内共享的会话
+    
+    多个客户端共用同一个连接池，访问同一主机时复用已建立的TCP/TLS连接。
+    
+    Args:
+        max_retries: 最大重试次数
+        backoff_factor: 重试延迟因子
+        
+    Returns:
+        共享的会话对象
+    """
+    key = (max_retries, backoff_factor)
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(key)
+        if session is None:
+            session = create_session(max_retries, backoff_factor, pool_maxsize=64)
+            _shared_sessions[key] = session
+        return session
+
+def _freeze(value: Any) -> Hashable:
+    """把请求参数递归转换为可哈希的值，用作缓存键"""
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+@lru_cache(maxsize=1024)
+def _join_url(base_url: str, endpoint: str) -> str:
+    """拼接基础URL和请求端点，同一客户端反复请求的端点有限，结果可以缓存"""
+    if base_url and not endpoint.startswith(('http://', 'https://')):
+        return f"{base_url}/{endpoint.lstrip('/')}"
+    return endpoint
+
+class OrjsonClientResponse(aiohttp.ClientResponse):
+    """JSON响应体默认用orjson解析的aiohttp响应，作为ClientSession的response_class使用"""
+    
+    async def json(self, *, encoding: Optional[str] = None, loads=orjson.loads,
+                   content_type: Optional[str] = 'application/json') -> Any:
+        return await super().json(encoding=encoding, loads=loads, content_type=content_type)
+
+@dataclass
+class CachedResponse:
+    """
+    缓存的响应内容
+    
+    只保存状态码、响应头和响应体，不持有连接或会话。异步读取接口与aiohttp.ClientResponse一致，
+    同步请求命中缓存时通过to_requests()还原为requests.Response。
+    """
+    url: str
+    status: int
+    headers: CaseInsensitiveDict
+    body: bytes
+    encoding: Optional[str] = None
+    
+    def raise_for_status(self) -> None:
+        """只缓存成功的响应，无需检查"""
+    
+    async def read(self) -> bytes:
+        """读取响应体"""
+        return self.body
+    
+    async def text(self, encoding: Optional[str] = None) -> str:
+        """按指定编码或响应编码解码响应体"""
+        return self.body.decode(encoding or self.encoding or 'utf-8')
+    
+    async def json(self, **kwargs) -> Any:
+        """解析JSON响应体"""
+        return orjson.loads(self.body)
+    
+    def to_requests(self) -> requests.Response:
+        """转换为requests.Response"""
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response._content = self.body
+        return response
 
 class HTTPClient:
     """HTTP客户端"""
@@ -73,7 +285,9 @@ class HTTPClient:
                 rate_limit_period: Optional[float] = None,
                 proxy: Optional[str] = None,
                 verify_ssl: bool = True,
-                cache_ttl: Optional[int] = None):
+                cache_ttl: Optional[int] = None,
+                pool_maxsize: int = 10,
+                session: Optional[requests.Session] = None):
         """
         初始化HTTP客户端
         
@@ -88,6 +302,9 @@ class HTTPClient:
             proxy: 代理服务器
             verify_ssl: 是否验证SSL证书
             cache_ttl: 缓存过期时间(秒)
+            pool_maxsize: 每个主机保留的最大连接数，多线程共用客户端时应不小于线程数
+            session: 外部提供的会话（如get_shared_session()），提供时忽略重试和连接池参数，
+                且close()不会关闭该会话
         """
         self.base_url = base_url.rstrip('/')
         self.headers = headers or {}
@@ -95,18 +312,9 @@ class HTTPClient:
         self.proxy = proxy
         self.verify_ssl = verify_ssl
         
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        
         # 创建会话
-        self.session = requests.Session()
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        self._owns_session = session is None
+        self.session = session or create_session(max_retries, backoff_factor, pool_maxsize)
         
         # 配置限速器
         self.rate_limiter = None
@@ -117,23 +325,38 @@ class HTTPClient:
         self.cache = None
         if cache_ttl:
             self.cache = TTLCache(maxsize=100, ttl=cache_ttl)
+        
+        # 异步会话在首次异步请求时创建，之后的请求复用其连接池、DNS缓存和TLS会话
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._async_session_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def _build_url(self, endpoint: str) -> str:
         """构建完整的URL"""
-        if self.base_url and not endpoint.startswith(('http://', 'https://')):
-            return f"{self.base_url}/{endpoint.lstrip('/')}"
-        return endpoint
+        return _join_url(self.base_url, endpoint)
     
-    def _get_cache_key(self, method: str, url: str, **kwargs) -> str:
+    def _get_cache_key(self, method: str, url: str, **kwargs) -> tuple:
         """生成缓存键"""
-        cache_dict = {
-            'method': method,
-            'url': url,
-            'params': kwargs.get('params'),
-            'data': kwargs.get('data'),
-            'json': kwargs.get('json')
-        }
-        return json.dumps(cache_dict, sort_keys=True)
+        return (
+            method,
+            url,
+            _freeze(kwargs.get('params')),
+            _freeze(kwargs.get('data')),
+            _freeze(kwargs.get('json'))
+        )
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取异步会话，会话已关闭或属于其他事件循环时重新创建"""
+        loop = asyncio.get_running_loop()
+        session = self._async_session
+        if session is None or session.closed or self._async_session_loop is not loop:
+            session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+                response_class=OrjsonClientResponse
+            )
+            self._async_session = session
+            self._async_session_loop = loop
+        return session
     
     async def _wait_for_rate_limit(self):
         """等待速率限制"""
@@ -158,11 +381,12 @@ class HTTPClient:
         url = self._build_url(endpoint)
         
         # 检查缓存
-        if self.cache and method.upper() == 'GET':
+        if self.cache is not None and method.upper() == 'GET':
             cache_key = self._get_cache_key(method, url, **kwargs)
-            if cache_key in self.cache:
-                logger.debug(f"Cache hit for {url}")
-                return self.cache[cache_key]
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                lazy_log(logging.DEBUG, "Cache hit for %s", url)
+                return cached.to_requests()
         
         # 合并请求头
         headers = {**self.headers, **kwargs.pop('headers', {})}
@@ -187,8 +411,14 @@ class HTTPClient:
             response.raise_for_status()
             
             # 缓存响应
-            if self.cache and method.upper() == 'GET':
-                self.cache[cache_key] = response
+            if self.cache is not None and method.upper() == 'GET':
+                self.cache[cache_key] = CachedResponse(
+                    url=response.url,
+                    status=response.status_code,
+                    headers=CaseInsensitiveDict(response.headers),
+                    body=response.content,
+                    encoding=response.encoding
+                )
             
             return response
             
@@ -199,7 +429,7 @@ class HTTPClient:
     async def arequest(self,
                      method: str,
                      endpoint: str,
-                     **kwargs) -> aiohttp.ClientResponse:
+                     **kwargs) -> Union[aiohttp.ClientResponse, CachedResponse]:
         """
         发送异步HTTP请求
         
@@ -209,7 +439,7 @@ class HTTPClient:
             **kwargs: 其他请求参数
             
         Returns:
-            响应对象
+            响应对象，命中缓存时为CachedResponse
         """
         url = self._build_url(endpoint)
         
@@ -217,38 +447,64 @@ class HTTPClient:
         await self._wait_for_rate_limit()
         
         # 检查缓存
-        if self.cache and method.upper() == 'GET':
+        if self.cache is not None and method.upper() == 'GET':
             cache_key = self._get_cache_key(method, url, **kwargs)
-            if cache_key in self.cache:
-                logger.debug(f"Cache hit for {url}")
-                return self.cache[cache_key]
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                lazy_log(logging.DEBUG, "Cache hit for %s", url)
+                return cached
         
-        # 合并请求头
-        headers = {**self.headers, **kwargs.pop('headers', {})}
+        # 会话已带有默认请求头，这里只传入本次请求额外的请求头，由aiohttp合并
+        headers = kwargs.pop('headers', None)
+        session = await self._get_session()
         
-        # 创建客户端会话
-        async with aiohttp.ClientSession(headers=headers) as session:
-            try:
-                async with session.request(
-                    method,
-                    url,
-                    ssl=self.verify_ssl,
-                    proxy=self.proxy,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout),
-                    **kwargs
-                ) as response:
-                    await response.read()
-                    response.raise_for_status()
-                    
-                    # 缓存响应
-                    if self.cache and method.upper() == 'GET':
-                        self.cache[cache_key] = response
-                    
-                    return response
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"Async request failed: {str(e)}")
-                raise
+        try:
+            async with session.request(
+                method,
+                url,
+                headers=headers,
+                ssl=self.verify_ssl,
+                proxy=self.proxy,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                **kwargs
+            ) as response:
+                body = await response.read()
+                response.raise_for_status()
+                
+                # 缓存响应
+                if self.cache is not None and method.upper() == 'GET':
+                    self.cache[cache_key] = CachedResponse(
+                        url=str(response.url),
+                        status=response.status,
+                        headers=CaseInsensitiveDict(response.headers),
+                        body=body,
+                        encoding=response.charset
+                    )
+                
+                return response
+                
+        except aiohttp.ClientError as e:
+            logger.error(f"Async request failed: {str(e)}")
+            raise
+    
+    def close(self) -> None:
+        """关闭会话并释放连接池，外部提供的会话由其所有者关闭"""
+        if self._owns_session:
+            self.session.close()
+    
+    async def aclose(self) -> None:
+        """关闭异步会话，并按close()的规则关闭同步会话"""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_session_loop = None
+        self.close()
+    
+    async def __aenter__(self) -> 'HTTPClient':
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
     
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         """发送GET请求"""
@@ -266,7 +522,7 @@ class HTTPClient:
         """发送DELETE请求"""
         return self.request('DELETE', endpoint, **kwargs)
     
-    async def aget(self, endpoint: str, **kwargs) -> aiohttp.ClientResponse:
+    async def aget(self, endpoint: str, **kwargs) -> Union[aiohttp.ClientResponse, CachedResponse]:
         """发送异步GET请求"""
         return await self.arequest('GET', endpoint, **kwargs)
     
@@ -324,4 +580,10 @@ async def bulk_fetch():
     for i in range(200):
         response = await client.aget(f"/items/{i}")
         # 自动处理速率限制
+
+4. 复用异步连接:
+async def main():
+    # 同一客户端的异步请求共用一个会话，退出时关闭
+    async with HTTPClient(base_url="https://api.example.com") as client:
+        responses = await asyncio.gather(*(client.aget(f"/items/{i}") for i in range(10)))
 """ 
\ No newline at end of file
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JSON流式解析工具模块
+
+统一选择ijson的解析后端，供按条流式读取大JSON文件和响应体的模块共用。
+"""
+
+import ijson
+
+# 优先使用基于yajl2的C后端，未编译C扩展时回退到ijson默认后端
+try:
+    ijson_backend = ijson.get_backend('yajl2_c')
+except ImportError:
+    ijson_backend = ijson
+
+"""
+使用示例：
+
+from utils.jsonstream import ijson_backend
+
+with open('nvdcve.json', 'rb') as f:
+    for item in ijson_backend.items(f, 'vulnerabilities.item', use_float=True):
+        print(item['cve']['id'])
+"""
@@ -14,6 +14,7 @@
 
 import os
 import sys
+import logging
 from datetime import datetime
 from typing import Optional
 from loguru import logger
@@ -139,9 +140,29 @@ class Logger:
         """
         logger.enable(name)
 
+# 默认日志记录器实例，由setup_logger()首次调用时创建
+default_logger: Optional[Logger] = None
+
+def setup_logger(**kwargs):
+    """
+    初始化默认日志记录器
+    
+    只在首次调用时配置处理器，之后的调用直接返回已配置的日志记录器，
+    避免模块被重复导入或多处调用时反复移除和添加处理器。
+    
+    Args:
+        **kwargs: 传给Logger的配置参数，仅首次调用时生效
+        
+    Returns:
+        日志记录器实例
+    """
+    global default_logger
+    if default_logger is None:
+        default_logger = Logger(**kwargs)
+    return default_logger.get_logger()
+
 # 创建默认日志记录器实例
-default_logger = Logger()
-logger = default_logger.get_logger()
+logger = setup_logger()
 
 # 导出常用的日志记录函数
 debug = logger.debug
@@ -150,6 +171,28 @@ warning = logger.warning
 error = logger.error
 critical = logger.critical
 
+# 热路径（如每次请求、每行数据）的调试日志走标准库logging：未启用的级别在格式化消息前直接返回，
+# 也不经过loguru的记录构造和DEBUG文件处理器。默认不输出，需要时为"sbom"记录器添加处理器；
+# 把FAST_PATH设为False则改回写入loguru
+FAST_PATH = True
+fast_logger = logging.getLogger('sbom')
+fast_logger.addHandler(logging.NullHandler())
+
+def lazy_log(level: int, msg: str, *args) -> None:
+    """
+    记录热路径日志，消息使用printf风格的占位符，只在级别启用时才格式化
+    
+    Args:
+        level: 标准库日志级别，如logging.DEBUG
+        msg: 日志消息
+        *args: 消息参数
+    """
+    if FAST_PATH:
+        if fast_logger.isEnabledFor(level):
+            fast_logger.log(level, msg, *args, stacklevel=2)
+    else:
+        logger.opt(depth=1).log(logging.getLevelName(level), msg % args if args else msg)
+
 """
 使用示例：
 
@@ -171,7 +214,16 @@ logger = custom_logger.get_logger("custom")
 
 logger.info("这是一条自定义日志")
 
-3. 禁用/启用特定模块的日志:
+3. 热路径调试日志:
+import logging
+from utils.logger import lazy_log, fast_logger
+
+lazy_log(logging.DEBUG, "Cache hit for %s", url)
+# 需要查看时为标准库记录器添加处理器
+fast_logger.addHandler(logging.StreamHandler())
+fast_logger.setLevel(logging.DEBUG)
+
+4. 禁用/启用特定模块的日志:
 from utils.logger import Logger
 
 Logger.disable("noisy_module")